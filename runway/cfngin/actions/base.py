@@ -3,11 +3,15 @@ import logging
 import os
 import sys
 import threading
+import time
 
 import botocore.exceptions
 
 from ..dag import ThreadedWalker, UnlimitedSemaphore, walk
-from ..exceptions import PlanFailed
+from ..exceptions import PlanFailed, StackDoesNotExist
+from ..lookups.handlers.output import deconstruct
+from ..lookups.handlers.rxref import RxrefLookup
+from ..lookups.handlers.xref import XrefLookup
 from ..plan import Step, build_graph, build_plan
 from ..session_cache import get_session
 from ..status import COMPLETE
@@ -93,6 +97,37 @@ def plan(description, stack_action, context, tail=None, reverse=False):
         reverse=reverse)
 
 
+def get_output_references(stack, context):
+    """Find the stacks referenced by the ``xref``/``rxref`` lookups of a stack.
+
+    Only lookups whose data can be determined without resolving other
+    lookups are considered.
+
+    Args:
+        stack (:class:`runway.cfngin.stack.Stack`): Stack to inspect.
+        context (:class:`runway.cfngin.context.Context`): Used to expand the
+            stack names of ``rxref`` lookups.
+
+    Returns:
+        Set[str]: Fully qualified names of the referenced stacks.
+
+    """
+    fqns = set()
+    for variable in stack.variables:
+        for lookup in variable.lookups:
+            if lookup.handler not in (RxrefLookup, XrefLookup) or \
+                    not lookup.lookup_data.resolved:
+                continue
+            try:
+                stack_name = deconstruct(lookup.lookup_data.value).stack_name
+            except ValueError:
+                continue  # raised again when the lookup is resolved
+            if lookup.handler is RxrefLookup:
+                stack_name = context.get_fqn(stack_name)
+            fqns.add(stack_name)
+    return fqns
+
+
 def stack_template_url(bucket_name, blueprint, endpoint):
     """Produce an s3 url for a given blueprint.
 
@@ -239,6 +274,67 @@ class BaseAction(object):
         return self.provider_builder.build(region=stack.region,
                                            profile=stack.profile)
 
+    def prefetch_outputs(self, concurrency=0, use_default_provider=False):
+        """Fetch the outputs of stacks referenced by ``xref``/``rxref``.
+
+        References are collected from every stack before any stack is
+        executed and the outputs are fetched in parallel. The results are
+        kept by the provider so lookups do not need to call the API.
+
+        Args:
+            concurrency (int): Maximum number of outputs to fetch at one time.
+                ``0`` fetches all of them at once.
+            use_default_provider (bool): Fetch all outputs using the
+                provider of the default region, matching how the stacks are
+                resolved by the action. If ``False``, the provider of the
+                stack containing the lookup is used.
+
+        """
+        references = set()
+        for stack in self.context.get_stacks():
+            fqns = get_output_references(stack, self.context)
+            if not fqns:
+                continue
+            if use_default_provider:
+                stack_provider = self.provider
+            else:
+                stack_provider = self.build_provider(stack)
+            references.update((stack_provider, fqn) for fqn in fqns)
+        if not references:
+            return
+
+        semaphore = UnlimitedSemaphore()
+        if concurrency > 0:
+            semaphore = threading.Semaphore(concurrency)
+
+        def _fetch(stack_provider, fqn):
+            """Fetch the outputs of a single stack."""
+            semaphore.acquire()
+            try:
+                start_time = time.time()
+                stack_provider.get_outputs(fqn)
+                LOGGER.debug("prefetched outputs of %s in %.2fs",
+                             fqn, time.time() - start_time)
+            except StackDoesNotExist:
+                LOGGER.debug("unable to prefetch outputs; stack %s does "
+                             "not exist", fqn)
+            except Exception:  # pylint: disable=broad-except
+                # raised again when the lookup is resolved
+                LOGGER.debug("unable to prefetch outputs of %s", fqn,
+                             exc_info=True)
+            finally:
+                semaphore.release()
+
+        LOGGER.debug("prefetching outputs of stacks: %s",
+                     ", ".join(sorted(fqn for _, fqn in references)))
+        threads = [threading.Thread(target=_fetch, args=reference,
+                                    name=reference[1])
+                   for reference in references]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
     @property
     def provider(self):
         """Return a generic provider using the default region.
@@ -411,6 +411,8 @@ class Action(BaseAction):
         if not outline and not dump:
             action_plan.outline(logging.DEBUG)
             LOGGER.debug("Launching stacks: %s", ", ".join(action_plan.keys()))
+            self.prefetch_outputs(concurrency=kwargs.get('concurrency', 0),
+                                  use_default_provider=True)
             walker = build_walker(kwargs.get('concurrency', 0))
             action_plan.execute(walker)
         else:
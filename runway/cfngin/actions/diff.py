@@ -193,6 +193,7 @@ class Action(build.Action):
             LOGGER.info("Diffing stacks: %s", ", ".join(action_plan.keys()))
         else:
             LOGGER.warning('WARNING: No stacks detected (error in config?)')
+        self.prefetch_outputs(concurrency=kwargs.get('concurrency', 0))
         walker = build_walker(kwargs.get('concurrency', 0))
         action_plan.execute(walker)
 
@@ -11,6 +11,7 @@ from ...variables import Variable
 from ..exceptions import (InvalidUserdataPlaceholder, MissingVariable,
                           UnresolvedVariable, UnresolvedVariables,
                           ValidatorError, VariableTypeRequired)
+from ..tokenize_userdata import template_tokenize
 from ..util import read_value_from_path
 from .variables.types import CFNType, TroposphereType
 
@@ -264,19 +265,21 @@ def parse_user_data(variables, raw_user_data, blueprint_name):
         else:
             variable_values[key] = value
 
-    template = string.Template(raw_user_data)
-
-    res = ""
+    tokens = template_tokenize(raw_user_data)
 
     try:
-        res = template.substitute(variable_values)
+        if tokens is None:
+            # let string.Template produce the error for invalid placeholders
+            return string.Template(raw_user_data).substitute(variable_values)
+        return "".join(
+            '%s' % (variable_values[value],) if is_placeholder else value
+            for is_placeholder, value in tokens
+        )
     except ValueError as err:
         raise InvalidUserdataPlaceholder(blueprint_name, err.args[0])
     except KeyError as err:
         raise MissingVariable(blueprint_name, err)
 
-    return res
-
 
 class Blueprint(object):
     """Base implementation for rendering a troposphere template."""
@@ -3,7 +3,8 @@ import logging
 
 from .... import __version__
 from ... import session_cache
-from ...config import render_parse_load as load_config
+from ...actions.base import get_output_references
+from ...config import merge_configs, render_parse_load as load_config
 from ...context import Context
 from ...providers.aws import default
 from .base import BaseCommand
@@ -16,6 +17,38 @@ from .info import Info
 LOGGER = logging.getLogger(__name__)
 
 
+def add_config_references(context, configs):
+    """Make stacks depend on the stacks of other configs they reference.
+
+    The stacks of merged configs can already name stacks from any of the
+    configs in ``requires``. This adds stacks referenced by the ``xref`` or
+    ``rxref`` lookups of a stack when they are defined by a different config.
+
+    Args:
+        context (:class:`runway.cfngin.context.Context`): Context of the
+            merged config.
+        configs (List[:class:`runway.cfngin.config.Config`]): The configs
+            that were merged.
+
+    """
+    config_index = {}
+    for index, config in enumerate(configs):
+        for stack_def in config.stacks:
+            config_index[stack_def.name] = index
+    stacks_by_fqn = context.get_stacks_dict()
+    for stack in context.get_stacks():
+        for fqn in sorted(get_output_references(stack, context)):
+            required = stacks_by_fqn.get(fqn)
+            if not required or required.name == stack.name or \
+                    config_index[required.name] == config_index[stack.name]:
+                continue
+            requires = stack.definition.requires or []
+            if required.name not in requires:
+                LOGGER.debug("%s requires %s from another config",
+                             stack.name, required.name)
+                stack.definition.requires = requires + [required.name]
+
+
 class Stacker(BaseCommand):
     """Stacker command."""
 
@@ -26,11 +59,15 @@ class Stacker(BaseCommand):
         """Configure CLI command."""
         session_cache.default_profile = options.profile
 
-        self.config = load_config(
-            options.config.read(),
-            environment=options.environment,
-            validate=True,
-        )
+        configs = [
+            load_config(
+                config_file.read(),
+                environment=options.environment,
+                validate=True,
+            )
+            for config_file in [options.config] + options.merge_configs
+        ]
+        self.config = merge_configs(configs)
 
         options.provider_builder = default.ProviderBuilder(
             region=options.region,
@@ -47,6 +84,8 @@ class Stacker(BaseCommand):
             # that it wants.
             **options.get_context_kwargs(options)
         )
+        if len(configs) > 1:
+            add_config_references(options.context, configs)
 
         super(Stacker, self).configure(options)
         if options.interactive:
@@ -184,6 +184,14 @@ class BaseCommand(object):
             help="The config file where stack configuration is located. Must "
                  "be in yaml format. If `-` is provided, then the config will "
                  "be read from stdin.")
+        parser.add_argument(
+            "--merge-config", dest="merge_configs", action="append",
+            type=argparse.FileType(), default=[], metavar="CONFIG",
+            help="Additional config file to load into the same plan as the "
+                 "config file. Can be specified more than once. Stacks may "
+                 "depend on stacks from any of the files and dependencies "
+                 "are also inferred from \"xref\" and \"rxref\" lookups "
+                 "between files.")
         parser.add_argument(
             "-i", "--interactive", action="store_true",
             help="Enable interactive mode. If specified, this will use the "
@@ -1,5 +1,6 @@
 """CFNgin config."""
 import copy
+import hashlib
 import logging
 import sys
 from io import StringIO
@@ -13,6 +14,8 @@ from schematics.types import (BaseType, BooleanType, DictType, ListType,
                               ModelType, StringType)
 from six import text_type
 
+from ... import __version__
+from ...util import LRUCache
 from .. import exceptions
 from ..lookups import register_lookup_handler
 from ..util import SourceProcessor, merge_map, yaml_to_ordered_dict
@@ -20,10 +23,18 @@ from .translators import *  # noqa pylint: disable=wildcard-import
 
 LOGGER = logging.getLogger(__name__)
 
+# Results of parsing (and validating) a rendered config keyed by a hash of
+# the rendered config and the version of runway. Rendered configs can contain
+# secrets from the environment so they are only cached in memory.
+CONFIG_CACHE = LRUCache(maxsize=100)
+
 
 def render_parse_load(raw_config, environment=None, validate=True):
     """Encapsulate the render -> parse -> validate -> load process.
 
+    The result of parsing and validating the rendered config is cached so
+    the same config is only parsed and validated once per process.
+
     Args:
         raw_config (str): The raw CFNgin configuration string.
         environment (Optional[Dict[str, Any]]): Any environment values that
@@ -39,7 +50,15 @@ def render_parse_load(raw_config, environment=None, validate=True):
 
     rendered = process_remote_sources(pre_rendered, environment)
 
-    config = parse(rendered)
+    cache_key = _get_config_cache_key(rendered, environment)
+    cached = CONFIG_CACHE.get(cache_key)
+    if cached:
+        # a copy is used so the cached config is not modified
+        config_dict, validated = copy.deepcopy(cached)
+    else:
+        config_dict, validated = parse_to_dict(rendered), False
+
+    config = _dict_to_config(config_dict)
 
     # For backwards compatibility, if the config doesn't specify a namespace,
     # we fall back to fetching it from the environment, if provided.
@@ -53,12 +72,35 @@ def render_parse_load(raw_config, environment=None, validate=True):
                            "for more info.")
             config.namespace = namespace
 
-    if validate:
+    if validate and not validated:
         config.validate()
+        validated = True
+        cached = None
+
+    if not cached:
+        CONFIG_CACHE[cache_key] = (copy.deepcopy(config_dict), validated)
 
     return load(config)
 
 
+def _get_config_cache_key(rendered, environment=None):
+    """Get the key used to cache a rendered config.
+
+    Args:
+        rendered (str): The rendered CFNgin configuration string.
+        environment (Optional[Dict[str, Any]]): Environment values passed to
+            the config. The namespace can be provided by the environment.
+
+    Returns:
+        str: Cache key.
+
+    """
+    namespace = (environment or {}).get('namespace') or ''
+    return hashlib.sha256(
+        '\n'.join([__version__, namespace, rendered]).encode('utf-8')
+    ).hexdigest()
+
+
 def render(raw_config, environment=None):
     """Render a config, using it as a template with the environment.
 
@@ -101,6 +143,19 @@ def parse(raw_config):
     Returns:
         :class:`Config`: The parsed CFNgin config.
 
+    """
+    return _dict_to_config(parse_to_dict(raw_config))
+
+
+def parse_to_dict(raw_config):
+    """Parse a raw yaml formatted CFNgin config into a dict.
+
+    Args:
+        raw_config (str): The raw CFNgin configuration string in yaml format.
+
+    Returns:
+        Optional[OrderedDict]: The CFNgin config as a dict.
+
     """
     # Convert any applicable dictionaries back into lists
     # This is necessary due to the move from lists for these top level config
@@ -119,7 +174,19 @@ def parse(raw_config):
                         tmp_dict['name'] = key
                     tmp_list.append(tmp_dict)
                 config_dict[top_level_key] = tmp_list
+    return config_dict
+
+
+def _dict_to_config(config_dict):
+    """Create a :class:`Config` from a parsed config dict.
+
+    Args:
+        config_dict (Optional[Dict[str, Any]]): The CFNgin config as a dict.
 
+    Returns:
+        :class:`Config`: The parsed CFNgin config.
+
+    """
     # Top-level excess keys are removed by Config._convert, so enabling strict
     # mode is fine here.
     try:
@@ -149,6 +216,62 @@ def load(config):
     return config
 
 
+def merge_configs(configs):
+    """Merge loaded CFNgin configs into a single config.
+
+    Values that apply to the config as a whole (e.g. ``namespace``) must be
+    the same in every config. Stacks, targets and hooks are combined in the
+    order the configs are provided. ``lookups`` & ``mappings`` are combined
+    as long as a key is not given different values.
+
+    Args:
+        configs (List[:class:`Config`]): Loaded CFNgin configs.
+
+    Returns:
+        :class:`Config`: The merged CFNgin config.
+
+    Raises:
+        :class:`runway.cfngin.exceptions.InvalidConfig`: Configs can't be
+            merged or the result is not a valid config.
+
+    """
+    first = configs[0]
+    if len(configs) == 1:
+        return first
+
+    merged = Config()
+    errors = []
+    for field in ['cfngin_bucket', 'cfngin_bucket_region', 'namespace',
+                  'namespace_delimiter', 'service_role', 'tags',
+                  'template_indent']:
+        values = [config[field] for config in configs]
+        if any(value != values[0] for value in values[1:]):
+            errors.append('%s must be the same in all merged configs' %
+                          field)
+        merged[field] = values[0]
+    for field in ['lookups', 'mappings']:
+        value = {}
+        for config in configs:
+            for key, val in (config[field] or {}).items():
+                if value.setdefault(key, val) != val:
+                    errors.append('%s.%s has different values in merged '
+                                  'configs' % (field, key))
+        merged[field] = value or None
+    for field in ['post_build', 'post_destroy', 'pre_build', 'pre_destroy',
+                  'stacks', 'targets']:
+        value = []
+        for config in configs:
+            value.extend(config[field] or [])
+        merged[field] = value if value or field == 'stacks' else None
+    for field in ['cfngin_cache_dir', 'log_formats', 'package_sources',
+                  'sys_path']:
+        merged[field] = first[field]
+    if errors:
+        raise exceptions.InvalidConfig(errors)
+    merged.validate()
+    return merged
+
+
 def dump(config):
     """Dump a CFNgin Config object as yaml.
 
@@ -231,6 +354,9 @@ class GitPackageSource(Model):
         commit (StringType): Commit hash.
         configs (ListType): List of CFNgin config paths to execute.
         paths (ListType): List of paths to append to ``sys.path``.
+        shallow (BooleanType): Only fetch the commit being checked out from
+            the local mirror of the repo.
+        sparse (BooleanType): Only checkout ``paths`` and ``configs``.
         tag (StringType): Git tag.
         uri (StringType): Remote git repo URI.
 
@@ -240,6 +366,8 @@ class GitPackageSource(Model):
     commit = StringType(serialize_when_none=False)
     configs = ListType(StringType, serialize_when_none=False)
     paths = ListType(StringType, serialize_when_none=False)
+    shallow = BooleanType(serialize_when_none=False)
+    sparse = BooleanType(serialize_when_none=False)
     tag = StringType(serialize_when_none=False)
     uri = StringType(required=True)
 
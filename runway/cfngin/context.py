@@ -58,6 +58,8 @@ class Context(object):
         self.force_stacks = force_stacks or []
         self.hook_data = {}
         self._stacks = []
+        self._stacks_by_fqn = {}
+        self._stacks_by_name = {}
         self._targets = []
 
     @property
@@ -168,6 +170,8 @@ class Context(object):
         """
         if not self._stacks:
             stacks = []
+            self._stacks_by_fqn = {}
+            self._stacks_by_name = {}
             definitions = self._get_stack_definitions()
             for stack_def in definitions:
                 stack = Stack(
@@ -180,6 +184,9 @@ class Context(object):
                     protected=stack_def.protected,
                 )
                 stacks.append(stack)
+                # first stack wins if a name is duplicated
+                self._stacks_by_name.setdefault(stack.name, stack)
+                self._stacks_by_fqn[stack.fqn] = stack
             self._stacks = stacks
         return self._stacks
 
@@ -190,14 +197,13 @@ class Context(object):
             name (str): Name of a stack to retrieve.
 
         """
-        for stack in self.get_stacks():
-            if stack.name == name:
-                return stack
-        return None
+        self.get_stacks()
+        return self._stacks_by_name.get(name)
 
     def get_stacks_dict(self):
         """Construct a dict of {stack.fqn: stack} for easy access to stacks."""
-        return dict((stack.fqn, stack) for stack in self.get_stacks())
+        self.get_stacks()
+        return dict(self._stacks_by_fqn)
 
     def get_fqn(self, name=None):
         """Return the fully qualified name of an object within this context.
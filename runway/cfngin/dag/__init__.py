@@ -2,7 +2,7 @@
 import collections
 import logging
 from collections import OrderedDict, deque
-from copy import copy, deepcopy
+from copy import copy
 from threading import Thread
 
 LOGGER = logging.getLogger(__name__)
@@ -99,15 +99,36 @@ class DAG(object):
             raise KeyError('independent node %s does not exist' % ind_node)
         if dep_node not in graph:
             raise KeyError('dependent node %s does not exist' % dep_node)
-        test_graph = deepcopy(graph)
-        test_graph[ind_node].add(dep_node)
-        test_dag = DAG()
-        test_dag.graph = test_graph
-        is_valid, message = test_dag.validate()
-        if is_valid:
-            graph[ind_node].add(dep_node)
-        else:
-            raise DAGValidationError(message)
+        # the new edge creates a cycle if ind_node can already be reached
+        # from dep_node. checking this avoids copying and sorting the whole
+        # graph for every edge that is added.
+        if self._is_reachable(dep_node, ind_node):
+            raise DAGValidationError('graph is not acyclic')
+        graph[ind_node].add(dep_node)
+
+    def _is_reachable(self, start_node, end_node):
+        """Determine if a node can be reached by following edges from another.
+
+        Args:
+            start_node (str): The node to start from.
+            end_node (str): The node to look for.
+
+        Returns:
+            bool
+
+        """
+        graph = self.graph
+        nodes = [start_node]
+        nodes_seen = set(nodes)
+        while nodes:
+            node = nodes.pop()
+            if node == end_node:
+                return True
+            for downstream_node in graph[node]:
+                if downstream_node not in nodes_seen:
+                    nodes_seen.add(downstream_node)
+                    nodes.append(downstream_node)
+        return False
 
     def delete_edge(self, ind_node, dep_node):
         """Delete an edge from the graph.
@@ -1,21 +1,29 @@
 """File lookup."""
 # pylint: disable=arguments-differ,unused-argument
 import base64
+import copy
+import hashlib
 import json
 import re
 
+import six
 import yaml
 from six import string_types
 from six.moves.collections_abc import Mapping, Sequence  # pylint: disable=E
 from troposphere import Base64, GenericHelperFn
 
 from ....lookups.handlers.base import LookupHandler
+from ....util import LRUCache
 from ...util import read_value_from_path
 
 TYPE_NAME = "file"
 
 _PARAMETER_PATTERN = re.compile(r'{{([::|\w]+)}}')
 
+# Codec results keyed by (codec, content hash) so identical files referenced by
+# many stacks are only parsed once.
+CODEC_CACHE = LRUCache(maxsize=256)
+
 
 class FileLookup(LookupHandler):
     """File lookup."""
@@ -154,7 +162,19 @@ class FileLookup(LookupHandler):
 
         value = read_value_from_path(path)
 
-        return CODECS[codec](value)
+        if not isinstance(value, string_types):
+            return CODECS[codec](value)
+
+        cache_key = (codec, hashlib.md5(
+            six.ensure_binary(value, encoding='utf-8')
+        ).hexdigest())
+        result = CODEC_CACHE.get(cache_key)
+        if result is None:
+            result = CODECS[codec](value)
+            CODEC_CACHE[cache_key] = result
+        # a copy is returned so a blueprint modifying the result does not
+        # change the value given to other stacks
+        return copy.deepcopy(result)
 
 
 def _parameterize_string(raw):
@@ -2,6 +2,7 @@
 # pylint: disable=too-many-lines
 import json
 import logging
+import os
 import sys
 import time
 # thread safe, memoize, provider builder.
@@ -50,6 +51,13 @@ GET_EVENTS_SLEEP = 1
 DEFAULT_CAPABILITIES = ["CAPABILITY_NAMED_IAM",
                         "CAPABILITY_AUTO_EXPAND"]
 
+# Stack outputs shared by every provider built for the same credentials,
+# profile + region. Keyed as "<profile>-<region>-<access key id>" since the
+# credentials of deployments using assume_role are passed through the
+# environment instead of a profile.
+OUTPUT_STORES = {}
+OUTPUT_STORES_LOCK = Lock()
+
 
 def get_cloudformation_client(session):
     """Get CloudFormaiton boto3 client."""
@@ -84,6 +92,94 @@ def get_output_dict(stack):
     return outputs
 
 
+def get_output_store(region=None, profile=None, access_key=None):
+    """Get or create the shared output store for a region and credentials.
+
+    Args:
+        region (Optional[str]): AWS region of the store.
+        profile (Optional[str]): AWS profile of the store.
+        access_key (Optional[str]): AWS access key ID of the credentials
+            used when there is no profile (e.g. ``AWS_ACCESS_KEY_ID``).
+
+    Returns:
+        OutputStore: The store shared by all providers of the
+        region/profile/credentials.
+
+    """
+    key = "{}-{}-{}".format(profile, region, access_key)
+    with OUTPUT_STORES_LOCK:
+        if key not in OUTPUT_STORES:
+            OUTPUT_STORES[key] = OutputStore()
+        return OUTPUT_STORES[key]
+
+
+class OutputStore(object):
+    """Thread safe cache of CloudFormation stack outputs.
+
+    Each stack has its own lock so that concurrent requests for the outputs
+    of the same stack result in a single ``describe_stacks`` call while
+    requests for different stacks do not block each other.
+
+    """
+
+    def __init__(self):
+        """Instantiate class."""
+        self._lock = Lock()
+        self._stack_locks = {}
+        self._outputs = {}
+
+    def _get_stack_lock(self, stack_name):
+        """Get the lock of a single stack."""
+        with self._lock:
+            if stack_name not in self._stack_locks:
+                self._stack_locks[stack_name] = Lock()
+            return self._stack_locks[stack_name]
+
+    def fetch(self, stack_name, func):
+        """Get the outputs of a stack, calling ``func`` on a cache miss.
+
+        Args:
+            stack_name (str): Name of the stack.
+            func (Callable[[str], Dict[str, str]]): Used to retrieve the
+                outputs of the stack if they are not already stored.
+
+        Returns:
+            Dict[str, str]: Outputs of the stack.
+
+        """
+        with self._get_stack_lock(stack_name):
+            if stack_name in self._outputs:
+                return self._outputs[stack_name]
+            outputs = func(stack_name)
+            # empty outputs are not stored; the stack may not exist yet
+            if outputs:
+                self._outputs[stack_name] = outputs
+            return outputs
+
+    def clear(self):
+        """Remove all stored outputs."""
+        with self._lock:
+            self._outputs.clear()
+
+    def pop(self, stack_name, default=None):
+        """Remove the outputs of a stack from the store."""
+        with self._get_stack_lock(stack_name):
+            return self._outputs.pop(stack_name, default)
+
+    def __contains__(self, stack_name):
+        """Check if the outputs of a stack are stored."""
+        return stack_name in self._outputs
+
+    def __getitem__(self, stack_name):
+        """Get the stored outputs of a stack."""
+        return self._outputs[stack_name]
+
+    def __setitem__(self, stack_name, outputs):
+        """Store the outputs of a stack."""
+        with self._get_stack_lock(stack_name):
+            self._outputs[stack_name] = outputs
+
+
 def s3_fallback(fqn, template, parameters, tags, method,
                 change_set_name=None, service_role=None):
     """Falling back to legacy stacker S3 bucket region for templates."""
@@ -532,6 +628,9 @@ class ProviderBuilder(object):  # pylint: disable=too-few-public-methods
                 self.providers[key] = Provider(
                     get_session(region=region, profile=profile),
                     region=region,
+                    output_store=get_output_store(
+                        region, profile, os.environ.get('AWS_ACCESS_KEY_ID')
+                    ),
                     **self.kwargs
                 )
                 provider = self.providers[key]
@@ -585,9 +684,11 @@ class Provider(BaseProvider):
 
     def __init__(self, session, region=None, interactive=False,
                  replacements_only=False, recreate_failed=False,
-                 service_role=None):
+                 service_role=None, output_store=None):
         """Instantiate class."""
-        self._outputs = {}
+        if output_store is None:
+            output_store = OutputStore()
+        self._outputs = output_store
         self.region = region
         self.cloudformation = get_cloudformation_client(session)
         self.interactive = interactive
@@ -743,6 +844,7 @@ class Provider(BaseProvider):
             args["RoleARN"] = self.service_role
 
         self.cloudformation.delete_stack(**args)
+        self._outputs.pop(self.get_stack_name(stack))
         return True
 
     def create_stack(self, fqn,  # pylint: disable=arguments-differ
@@ -801,6 +903,7 @@ class Provider(BaseProvider):
                                 self.service_role)
                 else:
                     raise
+        self._outputs.pop(fqn)
 
     def select_update_method(self, force_interactive, force_change_set):
         """Select the correct update method when updating a stack.
@@ -925,8 +1028,9 @@ class Provider(BaseProvider):
         update_method = self.select_update_method(force_interactive,
                                                   force_change_set)
 
-        return update_method(fqn, template, old_parameters, parameters,
-                             stack_policy=stack_policy, tags=tags, **kwargs)
+        update_method(fqn, template, old_parameters, parameters,
+                      stack_policy=stack_policy, tags=tags, **kwargs)
+        self._outputs.pop(fqn)
 
     def deal_with_changeset_stack_policy(self, fqn, stack_policy):
         """Set a stack policy when using changesets.
@@ -1097,11 +1201,15 @@ class Provider(BaseProvider):
         return stack['Tags']
 
     def get_outputs(self, stack_name, *args, **kwargs):
-        """Get stack outputs."""
-        if not self._outputs.get(stack_name):
-            stack = self.get_stack(stack_name)
-            self._outputs[stack_name] = get_output_dict(stack)
-        return self._outputs[stack_name]
+        """Get stack outputs.
+
+        Outputs are kept in an :class:`OutputStore` that may be shared with
+        other providers of the same region and profile.
+
+        """
+        return self._outputs.fetch(
+            stack_name, lambda name: get_output_dict(self.get_stack(name))
+        )
 
     @staticmethod
     def get_output_dict(stack):
@@ -1200,8 +1308,9 @@ class Provider(BaseProvider):
             ChangeSetName=change_set_id
         )
 
-        # ensure current stack outputs are loaded
-        self.get_outputs(stack.fqn)
+        # ensure current stack outputs are loaded. a copy is modified so
+        # readers of the shared output store never see a partial update.
+        outputs = dict(self.get_outputs(stack.fqn))
 
         # infer which outputs may have changed
         refs_to_invalidate = []
@@ -1219,15 +1328,15 @@ class Provider(BaseProvider):
         # invalidate cached outputs with inferred changes
         for output, props in old_template.get('Outputs', {}).items():
             if any(r in str(props['Value']) for r in refs_to_invalidate):
-                self._outputs[stack.fqn].pop(output)
+                outputs.pop(output)
                 LOGGER.debug('Removed %s from the outputs of %s',
                              output, stack.fqn)
 
         # push values for new + invalidated outputs to outputs
         for output_name, output_params in \
                 stack.blueprint.get_output_definitions().items():
-            if output_name not in self._outputs[stack.fqn]:
-                self._outputs[stack.fqn][output_name] = (
+            if output_name not in outputs:
+                outputs[output_name] = (
                     '<inferred-change: {}.{}={}>'.format(
                         stack.fqn, output_name,
                         str(output_params['Value'])
@@ -1248,7 +1357,8 @@ class Provider(BaseProvider):
                 # not an issue if the stack was already cleaned up
                 LOGGER.debug('Stack does not exist: %s', stack.fqn)
 
-        return self.get_outputs(stack.fqn)
+        self._outputs[stack.fqn] = outputs
+        return outputs
 
     @staticmethod
     def params_as_dict(parameters_list):
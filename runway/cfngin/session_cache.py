@@ -1,5 +1,6 @@
 """CFNgin session caching."""
 import logging
+import threading
 
 import boto3
 
@@ -15,6 +16,32 @@ CREDENTIAL_CACHE = {}
 
 DEFAULT_PROFILE = None
 
+# botocore data loader shared by every session so service models, endpoints
+# and paginator definitions are only read from disk and parsed once per process.
+DATA_LOADER = None
+DATA_LOADER_LOCK = threading.Lock()
+
+
+def _share_data_loader(session):
+    """Make a session use the process wide botocore data loader.
+
+    The first session to be passed in provides the loader (which already
+    includes the boto3 resource data path) for all that follow.
+
+    Args:
+        session (:class:`boto3.session.Session`): Session to update.
+
+    """
+    global DATA_LOADER  # pylint: disable=global-statement
+    with DATA_LOADER_LOCK:
+        if DATA_LOADER is None:
+            DATA_LOADER = session._session.get_component('data_loader')
+            return
+    session._session.register_component('data_loader', DATA_LOADER)
+    # boto3 reads resource models from this attribute; it has no public
+    # setter
+    session._loader = DATA_LOADER  # pylint: disable=protected-access
+
 
 def get_session(region, profile=None):
     """Create a boto3 session or get a matching session from the cache.
@@ -37,6 +64,7 @@ def get_session(region, profile=None):
                  profile, region)
 
     session = boto3.Session(region_name=region, profile_name=profile)
+    _share_data_loader(session)
     cred_provider = session._session.get_component('credential_provider')
     provider = cred_provider.get_provider('assume-role')
     provider.cache = CREDENTIAL_CACHE
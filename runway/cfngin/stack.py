@@ -87,6 +87,7 @@ class Stack(object):
         self.outputs = None
         self.in_progress_behavior = definition.in_progress_behavior
         self._blueprint = None
+        self._requires = None
         self._stack_policy = None
 
     @property
@@ -103,9 +104,23 @@ class Stack(object):
     def requires(self):
         """Return a list of stack names this stack depends on.
 
+        The result is calculated the first time this is accessed and reused
+        after that.
+
         Returns:
             List[str]
 
+        """
+        if self._requires is None:
+            self._requires = self._get_requires()
+        return self._requires
+
+    def _get_requires(self):
+        """Calculate the stack names this stack depends on.
+
+        Returns:
+            Set[str]
+
         """
         requires = set(self.definition.requires or [])
 
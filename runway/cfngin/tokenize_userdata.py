@@ -1,8 +1,14 @@
 """Resources to tokenize userdata."""
+import copy
+import hashlib
 import re
+import string
 
+import six
 from troposphere import GetAtt, Ref
 
+from ..util import LRUCache
+
 HELPERS = {
     "Ref": Ref,
     "Fn::GetAtt": GetAtt
@@ -11,9 +17,48 @@ HELPERS = {
 SPLIT_STRING = "(" + "|".join([r"%s\([^)]+\)" % h for h in HELPERS]) + ")"
 REPLACE_STRING = \
     r"(?P<helper>%s)\((?P<args>['\"]?[^)]+['\"]?)+\)" % '|'.join(HELPERS)
+TOKEN_STRING = r"(?P<helper>%s)\((?P<args>[^)]+)\)" % '|'.join(HELPERS)
 
 SPLIT_RE = re.compile(SPLIT_STRING)
 REPLACE_RE = re.compile(REPLACE_STRING)
+TOKEN_RE = re.compile(TOKEN_STRING)
+
+# Tokenized userdata keyed by a hash of the raw userdata so identical
+# userdata is only tokenized once per run.
+CF_TOKENIZE_CACHE = LRUCache(maxsize=256)
+TEMPLATE_TOKENIZE_CACHE = LRUCache(maxsize=256)
+# cached template tokens may be None
+_MISSING = object()
+
+
+def _hash(raw_userdata):
+    """Hash userdata for use as a cache key."""
+    return hashlib.md5(
+        six.ensure_binary(raw_userdata, encoding='utf-8')
+    ).hexdigest()
+
+
+def iter_cf_tokens(raw_userdata):
+    """Iterate over the parts of UserData containing helper functions.
+
+    The string is scanned once. Literal parts are yielded as slices of the
+    original string between each recognized function (see ``HELPERS``
+    global variable) and the helper function data in place of those.
+
+    Args:
+        raw_userdata (str): Unparsed userdata data string.
+
+    Yields:
+        Union[str, Dict[str, Any]]: Literal string or helper function data.
+
+    """
+    start = 0
+    for match in TOKEN_RE.finditer(raw_userdata):
+        yield raw_userdata[start:match.start()]
+        args = [a.strip("'\" ") for a in match.group("args").split(",")]
+        yield HELPERS[match.group("helper")](*args).data
+        start = match.end()
+    yield raw_userdata[start:]
 
 
 def cf_tokenize(raw_userdata):
@@ -27,7 +72,7 @@ def cf_tokenize(raw_userdata):
 
     It breaks apart the given string at each recognized function (see
     ``HELPERS`` global variable) and instantiates the helper function objects
-    in place of those.
+    in place of those. The result is cached by the hash of the userdata.
 
     Args:
         raw_userdata (str): Unparsed userdata data string.
@@ -43,13 +88,50 @@ def cf_tokenize(raw_userdata):
             Base64(Join('', cf_tokenize(userdata_string)))
 
     """
-    result = []
-    parts = SPLIT_RE.split(raw_userdata)
-    for part in parts:
-        cf_func = REPLACE_RE.search(part)
-        if cf_func:
-            args = [a.strip("'\" ") for a in cf_func.group("args").split(",")]
-            result.append(HELPERS[cf_func.group("helper")](*args).data)
+    cache_key = _hash(raw_userdata)
+    tokens = CF_TOKENIZE_CACHE.get(cache_key)
+    if tokens is None:
+        tokens = list(iter_cf_tokens(raw_userdata))
+        CF_TOKENIZE_CACHE[cache_key] = tokens
+    # helper function data is mutable so it is not shared between callers
+    return copy.deepcopy(tokens)
+
+
+def template_tokenize(raw_userdata):
+    """Split userdata into literals and :class:`string.Template` placeholders.
+
+    The result is cached by the hash of the userdata.
+
+    Args:
+        raw_userdata (str): Unparsed userdata data string.
+
+    Returns:
+        Optional[Tuple[Tuple[bool, str], ...]]: Pairs of
+        ``(is_placeholder, value)`` where value is either a literal string
+        or the name of a placeholder. ``None`` is returned if the userdata
+        contains an invalid placeholder.
+
+    """
+    cache_key = _hash(raw_userdata)
+    tokens = TEMPLATE_TOKENIZE_CACHE.get(cache_key, _MISSING)
+    if tokens is not _MISSING:
+        return tokens
+
+    tokens = []
+    start = 0
+    for match in string.Template.pattern.finditer(raw_userdata):
+        if match.group('invalid') is not None:
+            tokens = None
+            break
+        tokens.append((False, raw_userdata[start:match.start()]))
+        if match.group('escaped') is not None:
+            tokens.append((False, string.Template.delimiter))
         else:
-            result.append(part)
-    return result
+            tokens.append((True, match.group('named') or
+                           match.group('braced')))
+        start = match.end()
+    else:
+        tokens.append((False, raw_userdata[start:]))
+        tokens = tuple(tokens)
+    TEMPLATE_TOKENIZE_CACHE[cache_key] = tokens
+    return tokens
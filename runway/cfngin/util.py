@@ -1,5 +1,7 @@
 """CFNgin utilities."""
 import copy
+import hashlib
+import json
 import logging
 import os
 import re
@@ -8,22 +10,37 @@ import subprocess
 import sys
 import tarfile
 import tempfile
+import threading
+import time
 import uuid
 import zipfile
 from collections import OrderedDict
 
+import boto3.s3.transfer
 import botocore.client
 import botocore.exceptions
-import dateutil
 import yaml
 from yaml.constructor import ConstructorError
 from yaml.nodes import MappingNode
 
+from ..sources.git import checkout_from_mirror, resolve_git_ref
+from ..util import LRUCache
 from .awscli_yamlhelper import yaml_parse
 from .session_cache import get_session
 
+if sys.version_info[0] > 2:
+    import concurrent.futures
+
 LOGGER = logging.getLogger(__name__)
 
+# Number of package sources staged at the same time
+MAX_PACKAGE_SOURCE_WORKERS = 8
+
+# Contents of the files most recently read by read_value_from_path keyed by
+# path. Each value is a tuple of ((mtime, size), contents) used to detect
+# changes to the file.
+FILE_CONTENT_CACHE = LRUCache(maxsize=128)
+
 
 def camel_to_snake(name):
     """Convert CamelCase to snake_case.
@@ -221,18 +238,24 @@ def merge_map(a, b):
     return a
 
 
-def yaml_to_ordered_dict(stream, loader=yaml.SafeLoader):
-    """yaml.load alternative with preserved dictionary order.
+# libyaml based loader when available; both produce the same results
+FAST_SAFE_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+ORDERED_UNIQUE_LOADERS = {}
+
+
+def _get_ordered_unique_loader(loader):
+    """Get a loader that preserves order and checks for duplicate keys.
 
     Args:
-        stream (str): YAML string to load.
-        loader (:class:`yaml.loader`): PyYAML loader class. Defaults to safe
-            load.
+        loader (:class:`yaml.loader`): PyYAML loader class to subclass.
 
     Returns:
-        OrderedDict: Parsed YAML.
+        :class:`yaml.loader`: Subclass of the provided loader.
 
     """
+    if loader in ORDERED_UNIQUE_LOADERS:
+        return ORDERED_UNIQUE_LOADERS[loader]
+
     class OrderedUniqueLoader(loader):
         """Subclasses the given pyYAML `loader` class.
 
@@ -307,7 +330,25 @@ def yaml_to_ordered_dict(stream, loader=yaml.SafeLoader):
     OrderedUniqueLoader.add_constructor(
         u'tag:yaml.org,2002:map', OrderedUniqueLoader.construct_yaml_map,
     )
-    return yaml.load(stream, OrderedUniqueLoader)
+    ORDERED_UNIQUE_LOADERS[loader] = OrderedUniqueLoader
+    return OrderedUniqueLoader
+
+
+def yaml_to_ordered_dict(stream, loader=None):
+    """yaml.load alternative with preserved dictionary order.
+
+    Args:
+        stream (str): YAML string to load.
+        loader (Optional[:class:`yaml.loader`]): PyYAML loader class.
+            Defaults to the libyaml safe loader if it is available, otherwise
+            the pure Python safe loader.
+
+    Returns:
+        OrderedDict: Parsed YAML.
+
+    """
+    return yaml.load(stream,
+                     _get_ordered_unique_loader(loader or FAST_SAFE_LOADER))
 
 
 def uppercase_first_letter(string_):
@@ -355,8 +396,17 @@ def read_value_from_path(value):
         path = value.split('file://', 1)[1]
         config_directory = get_config_directory()
         relative_path = os.path.join(config_directory, path)
+        try:
+            stat = os.stat(relative_path)
+            file_id = (stat.st_mtime, stat.st_size)
+        except OSError:
+            file_id = None  # let open() raise the appropriate error
+        cached = FILE_CONTENT_CACHE.get(relative_path)
+        if file_id and cached and cached[0] == file_id:
+            return cached[1]
         with open(relative_path) as read_file:
             value = read_file.read()
+        FILE_CONTENT_CACHE[relative_path] = (file_id, value)
     return value
 
 
@@ -455,6 +505,41 @@ def parse_cloudformation_template(template):
     return yaml_parse(template)
 
 
+class _HashingReader(object):
+    """Wrap a file object to hash everything read from it."""
+
+    def __init__(self, fileobj):
+        """Instantiate class.
+
+        Args:
+            fileobj (Any): Object with a ``read`` method.
+
+        """
+        self._fileobj = fileobj
+        self._hash = hashlib.sha256()
+
+    def read(self, *args):
+        """Read from the wrapped file object."""
+        data = self._fileobj.read(*args)
+        self._hash.update(data)
+        return data
+
+    def hexdigest(self):
+        """Read the remainder of the file object and return its hash."""
+        while self.read(1024 * 1024):
+            pass
+        return self._hash.hexdigest()
+
+
+def _file_sha256(path):
+    """Calculate the SHA256 hash of a file."""
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as file_:
+        for chunk in iter(lambda: file_.read(1024 * 1024), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
 class Extractor(object):
     """Base class for extractors."""
 
@@ -481,24 +566,53 @@ class Extractor(object):
         """Serve as placeholder; override this in subclasses."""
         return ''
 
+    # whether the archive can be extracted from a non-seekable stream
+    streamable = False
+
+    def extract_stream(self, fileobj, destination):
+        """Extract the archive from a file object that is read sequentially.
+
+        Args:
+            fileobj (Any): Object with a ``read`` method.
+            destination (str): Directory to extract the archive to.
+
+        """
+        raise NotImplementedError
+
 
 class TarExtractor(Extractor):
     """Extracts tar archives."""
 
+    streamable = True
+    stream_mode = 'r|'
+
     def extract(self, destination):
         """Extract the archive."""
         with tarfile.open(self.archive, 'r:') as tar:
             tar.extractall(path=destination)
 
+    def extract_stream(self, fileobj, destination):
+        """Extract the archive from a file object that is read sequentially.
+
+        Args:
+            fileobj (Any): Object with a ``read`` method.
+            destination (str): Directory to extract the archive to.
+
+        """
+        with tarfile.open(fileobj=fileobj, mode=self.stream_mode) as tar:
+            tar.extractall(path=destination)
+
     @staticmethod
     def extension():
         """Return archive extension."""
         return '.tar'
 
 
-class TarGzipExtractor(Extractor):
+class TarGzipExtractor(TarExtractor):
     """Extracts compressed tar archives."""
 
+    stream_mode = 'r|gz'
+
     def extract(self, destination):
         """Extract the archive."""
         with tarfile.open(self.archive, 'r:gz') as tar:
@@ -518,6 +632,23 @@ class ZipExtractor(Extractor):
         with zipfile.ZipFile(self.archive, 'r') as zip_ref:
             zip_ref.extractall(destination)
 
+    def extract_stream(self, fileobj, destination):
+        """Extract the archive from a file object that is read sequentially.
+
+        Zip archives can't be read sequentially so the stream is spooled to
+        a temporary file first.
+
+        Args:
+            fileobj (Any): Object with a ``read`` method.
+            destination (str): Directory to extract the archive to.
+
+        """
+        with tempfile.TemporaryFile() as archive:
+            shutil.copyfileobj(fileobj, archive)
+            archive.seek(0)
+            with zipfile.ZipFile(archive, 'r') as zip_ref:
+                zip_ref.extractall(destination)
+
     @staticmethod
     def extension():
         """Return archive extension."""
@@ -528,6 +659,10 @@ class SourceProcessor(object):
     """Makes remote python package sources available in current environment."""
 
     ISO8601_FORMAT = '%Y%m%dT%H%M%SZ'
+    # archives smaller than this are extracted while they are downloaded
+    S3_STREAM_THRESHOLD = 64 * 1024 * 1024
+    S3_CHUNK_SIZE = 8 * 1024 * 1024
+    S3_MAX_CONCURRENCY = 10
 
     def __init__(self, sources, cfngin_cache_dir=None):
         """Process a config's defined package sources.
@@ -547,6 +682,8 @@ class SourceProcessor(object):
         self.sources = sources
         self.configs_to_merge = []
         self.create_cache_directories()
+        self._locks = {}
+        self._locks_lock = threading.Lock()
 
     def create_cache_directories(self):
         """Ensure that SourceProcessor cache directories exist."""
@@ -556,16 +693,67 @@ class SourceProcessor(object):
             os.mkdir(self.package_cache_dir)
 
     def get_package_sources(self):
-        """Make remote python packages available for local use."""
-        # Checkout local modules
-        for config in self.sources.get('local', []):
-            self.fetch_local_package(config=config)
-        # Checkout S3 repositories specified in config
-        for config in self.sources.get('s3', []):
-            self.fetch_s3_package(config=config)
-        # Checkout git repositories specified in config
-        for config in self.sources.get('git', []):
-            self.fetch_git_package(config=config)
+        """Make remote python packages available for local use.
+
+        Sources are staged concurrently on python 3 (up to
+        ``MAX_PACKAGE_SOURCE_WORKERS`` at a time). ``sys.path`` and
+        ``configs_to_merge`` are then updated in the order the sources are
+        defined (local, S3, then git).
+
+        """
+        tasks = (
+            [(self.stage_local_package, config['source'], config)
+             for config in self.sources.get('local', [])] +
+            [(self.stage_s3_package,
+              's3://%s/%s' % (config['bucket'], config['key']), config)
+             for config in self.sources.get('s3', [])] +
+            [(self.stage_git_package, config['uri'], config)
+             for config in self.sources.get('git', [])]
+        )
+        results = [None] * len(tasks)
+        errors = [None] * len(tasks)
+
+        def _stage(index, func, name, config):
+            """Stage a package source, storing the result or error."""
+            start = time.time()
+            try:
+                results[index] = func(config=config)
+            except BaseException as err:  # pylint: disable=broad-except
+                errors[index] = err
+            LOGGER.debug("Staging package source %s took %.2fs",
+                         name, time.time() - start)
+
+        if sys.version_info[0] > 2 and len(tasks) > 1:
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=MAX_PACKAGE_SOURCE_WORKERS
+            ) as executor:
+                for index, (func, name, config) in enumerate(tasks):
+                    executor.submit(_stage, index, func, name, config)
+        else:
+            for index, (func, name, config) in enumerate(tasks):
+                _stage(index, func, name, config)
+
+        for index, (_, _, config) in enumerate(tasks):
+            if errors[index] is not None:
+                raise errors[index]  # pylint: disable=raising-bad-type
+            pkg_dir_name, pkg_cache_dir = results[index]
+            # Update sys.path & merge in remote configs (if necessary)
+            self.update_paths_and_config(config=config,
+                                         pkg_dir_name=pkg_dir_name,
+                                         pkg_cache_dir=pkg_cache_dir)
+
+    def _get_lock(self, dir_name):
+        """Get the lock used while staging a package to a directory.
+
+        Args:
+            dir_name (str): Name of the package directory in the cache.
+
+        Returns:
+            threading.Lock: Lock for the directory.
+
+        """
+        with self._locks_lock:
+            return self._locks.setdefault(dir_name, threading.Lock())
 
     def fetch_local_package(self, config):
         """Make a local path available to current CFNgin config.
@@ -574,10 +762,25 @@ class SourceProcessor(object):
             config (Dict[str, Any]): 'local' path config dictionary.
 
         """
+        pkg_dir_name, pkg_cache_dir = self.stage_local_package(config)
         # Update sys.path & merge in remote configs (if necessary)
         self.update_paths_and_config(config=config,
-                                     pkg_dir_name=config['source'],
-                                     pkg_cache_dir=os.getcwd())
+                                     pkg_dir_name=pkg_dir_name,
+                                     pkg_cache_dir=pkg_cache_dir)
+
+    @staticmethod
+    def stage_local_package(config):
+        """Determine the location of a local path.
+
+        Args:
+            config (Dict[str, Any]): 'local' path config dictionary.
+
+        Returns:
+            Tuple[str, Optional[str]]: Directory name of the package and the
+            directory containing it.
+
+        """
+        return config['source'], os.getcwd()
 
     def fetch_s3_package(self, config):
         """Make a remote S3 archive available for local use.
@@ -585,6 +788,23 @@ class SourceProcessor(object):
         Args:
             config (Dict[str, Any]): git config dictionary.
 
+        """
+        pkg_dir_name, pkg_cache_dir = self.stage_s3_package(config)
+        # Update sys.path & merge in remote configs (if necessary)
+        self.update_paths_and_config(config=config,
+                                     pkg_dir_name=pkg_dir_name,
+                                     pkg_cache_dir=pkg_cache_dir)
+
+    def stage_s3_package(self, config):
+        """Download and extract a remote S3 archive to the cache.
+
+        Args:
+            config (Dict[str, Any]): s3 config dictionary.
+
+        Returns:
+            Tuple[str, Optional[str]]: Directory name of the package and the
+            directory containing it.
+
         """
         extractor_map = {'.tar.gz': TarGzipExtractor,
                          '.tar': TarExtractor,
@@ -615,67 +835,131 @@ class SourceProcessor(object):
         if config.get('requester_pays', False):
             extra_s3_args['RequestPayer'] = 'requester'
 
-        # We can skip downloading the archive if it's already been cached
-        if config.get('use_latest', True):
-            try:
-                # LastModified should always be returned in UTC, but it doesn't
-                # hurt to explicitly convert it to UTC again just in case
-                modified_date = session.client('s3').head_object(
-                    Bucket=config['bucket'],
-                    Key=config['key'],
-                    **extra_s3_args
-                )['LastModified'].astimezone(dateutil.tz.tzutc())
-            except botocore.exceptions.ClientError as client_error:
-                LOGGER.error("Error checking modified date of "
-                             "s3://%s/%s : %s",
+        with self._get_lock(dir_name):
+            self._download_s3_package(config, session, extractor,
+                                      dir_name, extra_s3_args)
+        return dir_name, None
+
+    def _download_s3_package(self, config, session, extractor, dir_name,
+                             extra_s3_args):
+        """Download and extract a remote S3 archive if not already cached.
+
+        The ETag and a SHA256 hash of each downloaded archive are stored
+        next to the extracted package. When ``use_latest`` is enabled, the
+        archive is only downloaded again if its ETag has changed and only
+        extracted again if its content has changed.
+
+        Args:
+            config (Dict[str, Any]): s3 config dictionary.
+            session (:class:`boto3.Session`): Session used to download.
+            extractor (:class:`Extractor`): Extractor for the archive type.
+            dir_name (str): Name of the package directory in the cache.
+            extra_s3_args (Dict[str, str]): Extra arguments for S3 requests.
+
+        """
+        cached_dir_path = os.path.join(self.package_cache_dir, dir_name)
+        metadata_path = cached_dir_path + '.json'
+        metadata = {}
+        if os.path.isdir(cached_dir_path):
+            if not config.get('use_latest', True):
+                LOGGER.debug("Remote package s3://%s/%s appears to have "
+                             "been previously downloaded to %s -- bypassing "
+                             "download",
                              config['bucket'],
                              config['key'],
-                             client_error)
-                sys.exit(1)
-            dir_name += "-%s" % modified_date.strftime(self.ISO8601_FORMAT)
-        cached_dir_path = os.path.join(self.package_cache_dir, dir_name)
-        if not os.path.isdir(cached_dir_path):
-            LOGGER.debug("Remote package s3://%s/%s does not appear to have "
-                         "been previously downloaded - starting download and "
-                         "extraction to %s",
+                             cached_dir_path)
+                return
+            try:
+                with open(metadata_path) as metadata_file:
+                    metadata = json.load(metadata_file)
+            except (IOError, OSError, ValueError):
+                metadata = {}
+
+        client = session.client('s3')
+        try:
+            head = client.head_object(Bucket=config['bucket'],
+                                      Key=config['key'],
+                                      **extra_s3_args)
+        except botocore.exceptions.ClientError as client_error:
+            LOGGER.error("Error checking ETag of s3://%s/%s : %s",
                          config['bucket'],
                          config['key'],
+                         client_error)
+            sys.exit(1)
+        if metadata and metadata.get('etag') == head['ETag']:
+            LOGGER.debug("Remote package s3://%s/%s with ETag %s appears to "
+                         "have been previously downloaded to %s -- bypassing "
+                         "download",
+                         config['bucket'],
+                         config['key'],
+                         head['ETag'],
                          cached_dir_path)
-            tmp_dir = tempfile.mkdtemp(prefix='cfngin')
-            tmp_package_path = os.path.join(tmp_dir, dir_name)
-            try:
+            return
+
+        LOGGER.debug("Remote package s3://%s/%s with ETag %s has not been "
+                     "downloaded - starting download and extraction to %s",
+                     config['bucket'],
+                     config['key'],
+                     head['ETag'],
+                     cached_dir_path)
+        tmp_dir = tempfile.mkdtemp(prefix='cfngin',
+                                   dir=self.package_cache_dir)
+        tmp_package_path = os.path.join(tmp_dir, dir_name)
+        try:
+            if (extractor.streamable and
+                    head['ContentLength'] < self.S3_STREAM_THRESHOLD):
+                LOGGER.debug("Streaming remote package from S3 with extra S3 "
+                             "options \"%s\"", str(extra_s3_args))
+                body = _HashingReader(client.get_object(
+                    Bucket=config['bucket'],
+                    Key=config['key'],
+                    IfMatch=head['ETag'],
+                    **extra_s3_args
+                )['Body'])
+                extractor.extract_stream(body, tmp_package_path)
+                content_hash = body.hexdigest()
+            else:
                 extractor.set_archive(os.path.join(tmp_dir, dir_name))
-                LOGGER.debug("Starting remote package download from S3 to %s "
-                             "with extra S3 options \"%s\"",
+                LOGGER.debug("Starting remote package download from S3 to "
+                             "%s with extra S3 options \"%s\"",
                              extractor.archive,
                              str(extra_s3_args))
-                session.resource('s3').Bucket(config['bucket']).download_file(
+                # large objects are downloaded using concurrent ranged gets
+                client.download_file(
+                    config['bucket'],
                     config['key'],
                     extractor.archive,
-                    ExtraArgs=extra_s3_args
+                    ExtraArgs=extra_s3_args,
+                    Config=boto3.s3.transfer.TransferConfig(
+                        multipart_chunksize=self.S3_CHUNK_SIZE,
+                        max_concurrency=self.S3_MAX_CONCURRENCY
+                    )
                 )
+                content_hash = _file_sha256(extractor.archive)
                 LOGGER.debug("Download complete; extracting downloaded "
                              "package to %s",
                              tmp_package_path)
                 extractor.extract(tmp_package_path)
+
+            if metadata.get('sha256') == content_hash:
+                LOGGER.debug("Content of remote package s3://%s/%s has not "
+                             "changed -- keeping %s",
+                             config['bucket'],
+                             config['key'],
+                             cached_dir_path)
+            else:
                 LOGGER.debug("Moving extracted package directory %s to the "
                              "CFNgin cache at %s",
                              dir_name,
                              self.package_cache_dir)
+                if os.path.isdir(cached_dir_path):
+                    shutil.rmtree(cached_dir_path)
                 shutil.move(tmp_package_path, self.package_cache_dir)
-            finally:
-                shutil.rmtree(tmp_dir)
-        else:
-            LOGGER.debug("Remote package s3://%s/%s appears to have "
-                         "been previously downloaded to %s -- bypassing "
-                         "download",
-                         config['bucket'],
-                         config['key'],
-                         cached_dir_path)
-
-        # Update sys.path & merge in remote configs (if necessary)
-        self.update_paths_and_config(config=config,
-                                     pkg_dir_name=dir_name)
+            with open(metadata_path, 'w') as metadata_file:
+                json.dump({'etag': head['ETag'], 'sha256': content_hash},
+                          metadata_file)
+        finally:
+            shutil.rmtree(tmp_dir)
 
     def fetch_git_package(self, config):
         """Make a remote git repository available for local use.
@@ -684,38 +968,58 @@ class SourceProcessor(object):
             config (Dict[str, Any]): git config dictionary.
 
         """
-        # only loading git here when needed to avoid load errors on systems
-        # without git installed
-        from git import Repo
+        pkg_dir_name, pkg_cache_dir = self.stage_git_package(config)
+        # Update sys.path & merge in remote configs (if necessary)
+        self.update_paths_and_config(config=config,
+                                     pkg_dir_name=pkg_dir_name,
+                                     pkg_cache_dir=pkg_cache_dir)
 
+    def stage_git_package(self, config):
+        """Clone a remote git repository to the cache.
+
+        Args:
+            config (Dict[str, Any]): git config dictionary.
+
+        Returns:
+            Tuple[str, Optional[str]]: Directory name of the package and the
+            directory containing it.
+
+        """
         ref = self.determine_git_ref(config)
         dir_name = self.sanitize_git_path(uri=config['uri'], ref=ref)
+        sparse_paths = None
+        if config.get('sparse') and config.get('paths'):
+            sparse_paths = list(config['paths']) + list(config.get('configs')
+                                                        or [])
+            dir_name += '-sparse-%s' % hashlib.md5(
+                '\n'.join(sparse_paths).encode('utf-8')
+            ).hexdigest()[:8]
         cached_dir_path = os.path.join(self.package_cache_dir, dir_name)
 
         # We can skip cloning the repo if it's already been cached
-        if not os.path.isdir(cached_dir_path):
-            LOGGER.debug("Remote repo %s does not appear to have been "
-                         "previously downloaded - starting clone to %s",
-                         config['uri'],
-                         cached_dir_path)
-            tmp_dir = tempfile.mkdtemp(prefix='cfngin')
-            try:
-                tmp_repo_path = os.path.join(tmp_dir, dir_name)
-                with Repo.clone_from(config['uri'], tmp_repo_path) as repo:
-                    repo.head.reference = ref
-                    repo.head.reset(index=True, working_tree=True)
-                shutil.move(tmp_repo_path, self.package_cache_dir)
-            finally:
-                shutil.rmtree(tmp_dir)
-        else:
-            LOGGER.debug("Remote repo %s appears to have been previously "
-                         "cloned to %s -- bypassing download",
-                         config['uri'],
-                         cached_dir_path)
-
-        # Update sys.path & merge in remote configs (if necessary)
-        self.update_paths_and_config(config=config,
-                                     pkg_dir_name=dir_name)
+        with self._get_lock(dir_name):
+            if not os.path.isdir(cached_dir_path):
+                LOGGER.debug("Remote repo %s does not appear to have been "
+                             "previously downloaded - starting checkout to "
+                             "%s",
+                             config['uri'],
+                             cached_dir_path)
+                tmp_dir = tempfile.mkdtemp(prefix='cfngin')
+                try:
+                    tmp_repo_path = os.path.join(tmp_dir, dir_name)
+                    checkout_from_mirror(config['uri'], ref, tmp_repo_path,
+                                         self.cfngin_cache_dir,
+                                         shallow=bool(config.get('shallow')),
+                                         sparse_paths=sparse_paths)
+                    shutil.move(tmp_repo_path, self.package_cache_dir)
+                finally:
+                    shutil.rmtree(tmp_dir)
+            else:
+                LOGGER.debug("Remote repo %s appears to have been previously "
+                             "cloned to %s -- bypassing download",
+                             config['uri'],
+                             cached_dir_path)
+        return dir_name, None
 
     def update_paths_and_config(self, config, pkg_dir_name,
                                 pkg_cache_dir=None):
@@ -821,10 +1125,10 @@ class SourceProcessor(object):
         else:
             # Since a specific commit/tag point in time has not been specified,
             # check the remote repo for the commit id to use
-            ref = self.git_ls_remote(
-                config['uri'],
-                self.determine_git_ls_remote_ref(config)
-            )
+            ref = resolve_git_ref(config['uri'],
+                                  self.determine_git_ls_remote_ref(config),
+                                  self.cfngin_cache_dir,
+                                  self.git_ls_remote)
         if sys.version_info[0] > 2 and isinstance(ref, bytes):
             return ref.decode()
         return ref
@@ -0,0 +1,296 @@
+"""Schedule the modules of deployments as a graph."""
+import copy
+import logging
+import sys
+from distutils.util import strtobool  # noqa pylint: disable=no-name-in-module,import-error
+
+from ..cfngin.dag import DAG, DAGValidationError
+from ..util import merge_dicts, merge_nested_environment_dicts
+from .worker_pool import WorkerPool
+
+if sys.version_info[0] > 2:
+    import concurrent.futures
+
+LOGGER = logging.getLogger('runway')
+
+# Process modules concurrently without the CI environment variable.
+PARALLEL_ENV_VAR = 'RUNWAY_PARALLEL'
+
+
+def reverse_deployments(deployments=None):
+    """Reverse deployments and the modules/regions in them."""
+    if deployments is None:
+        deployments = []
+
+    for deployment in deployments:
+        deployment.reverse()
+
+    deployments.reverse()
+    return deployments
+
+
+def parallel_enabled(env_vars):
+    """Determine if modules and regions can be processed concurrently.
+
+    Requires Python 3 and either the ``CI`` or ``RUNWAY_PARALLEL``
+    environment variable to be set.
+
+    Args:
+        env_vars (Dict[str, str]): Environment variables.
+
+    Returns:
+        bool
+
+    """
+    if sys.version_info[0] < 3:
+        return False
+    return bool(env_vars.get('CI') or
+                strtobool(env_vars.get(PARALLEL_ENV_VAR) or 'false'))
+
+
+def parallel_disabled_reason():
+    """Explain why modules are being processed sequentially."""
+    if sys.version_info[0] > 2:
+        return 'Not running in CI mode (or with %s set)' % PARALLEL_ENV_VAR
+    return 'Parallel execution requires Python 3+'
+
+
+def run_module_graph(graph, tasks, executor=None):
+    """Run the nodes of a module graph once their dependencies are done.
+
+    When an executor is not provided, nodes are run one at a time in the
+    order they were added to the graph. Otherwise, each node is submitted
+    to the executor as soon as all of the nodes it depends on have finished.
+    If a node fails, no more nodes are started and the error is raised
+    once the running nodes have finished.
+
+    Args:
+        graph (:class:`runway.cfngin.dag.DAG`): Graph of the nodes to run.
+            An edge from one node to another means the second node depends
+            on the first.
+        tasks (Dict[str, Tuple[Callable[..., None], Tuple[Any, ...]]]):
+            Function and arguments used to run each node.
+        executor (Optional[:class:`runway.commands.worker_pool.WorkerPool`]):
+            Pool (or any object with a compatible ``submit`` method) used
+            to run nodes concurrently.
+
+    """
+    remaining = dict((node, set(graph.predecessors(node)))
+                     for node in graph.graph)
+    order = list(graph.graph)
+    running = {}
+    error = None
+
+    def ready_nodes():
+        """Nodes not yet started whose dependencies are done."""
+        return [node for node in order
+                if node in remaining and not remaining[node]]
+
+    def complete(node):
+        """Mark a node as done."""
+        for deps in remaining.values():
+            deps.discard(node)
+
+    while remaining or running:
+        if error is None:
+            for node in ready_nodes():
+                del remaining[node]
+                func, args = tasks[node]
+                if executor is None:
+                    func(*args)
+                    complete(node)
+                    break
+                if isinstance(executor, WorkerPool):
+                    future = executor.submit_task(node, func, *args)
+                else:
+                    future = executor.submit(func, *args)
+                running[future] = node
+        if executor is None:
+            continue
+        if not running:
+            break  # only reachable after a failure
+        wait = executor.wait if isinstance(executor, WorkerPool) \
+            else concurrent.futures.wait
+        done, _ = wait(list(running),
+                       return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            node = running.pop(future)
+            try:
+                future.result()
+            except BaseException as err:  # pylint: disable=broad-except
+                LOGGER.error('Module "%s" failed', node)
+                if error is None:
+                    error = err
+            else:
+                complete(node)
+        if error is not None:
+            remaining.clear()
+    if error is not None:
+        raise error
+
+
+def _get_deployment_context(deployment, context, env_root):
+    """Validate a preprocessed deployment and return the context to use.
+
+    Args:
+        deployment (:class:`runway.config.DeploymentDefinition`): Deployment
+            resolved for preprocessing.
+        context (:class:`runway.context.Context`): Context of the
+            current run.
+        env_root (str): Root directory of the environment.
+
+    Returns:
+        Optional[:class:`runway.context.Context`]: ``None`` when the
+        deployment has no modules.
+
+    """
+    if not deployment.modules:
+        LOGGER.warning('No modules found for deployment "%s"',
+                       deployment.name)
+        return None
+    if not (deployment.regions or deployment.parallel_regions):
+        LOGGER.error('No region configured for any deployment')
+        sys.exit(1)
+    deployment_context = copy.deepcopy(context)
+    if deployment.env_vars:
+        deployment_context.env_vars = merge_dicts(
+            deployment_context.env_vars,
+            merge_nested_environment_dicts(
+                deployment.env_vars, env_name=context.env_name,
+                env_root=env_root
+            )
+        )
+    return deployment_context
+
+
+def _add_explicit_edges(graph, nodes, nodes_by_module, explicit):
+    """Add the edges of modules with ``depends_on`` to a module graph.
+
+    Args:
+        graph (:class:`runway.cfngin.dag.DAG`): The module graph.
+        nodes (Dict[str, Tuple[Any, ...]]): The deployment, module, context
+            and region of each node.
+        nodes_by_module (Dict[str, List[str]]): Nodes of each module name.
+        explicit (List[Tuple[str, List[str], str]]): Node, ``depends_on``
+            and region of each module with ``depends_on``.
+
+    """
+    for name, depends_on, region in explicit:
+        for dep_name in depends_on:
+            if dep_name not in nodes_by_module:
+                LOGGER.warning('Module "%s" depends on "%s" which is not '
+                               'being processed', nodes[name][1].name,
+                               dep_name)
+                continue
+            deps = [dep for dep in nodes_by_module[dep_name]
+                    if nodes[dep][3] == region] or \
+                nodes_by_module[dep_name]
+            for dep in deps:
+                try:
+                    graph.add_edge(dep, name)
+                except DAGValidationError:
+                    LOGGER.error('Module "%s" depending on "%s" creates '
+                                 'a circular dependency',
+                                 nodes[name][1].name, dep_name)
+                    sys.exit(1)
+
+
+def _reverse_graph(graph):
+    """Return a module graph with every dependency reversed.
+
+    Nodes are kept in reverse order so modules that don't depend on each
+    other are processed in destroy order.
+
+    Args:
+        graph (:class:`runway.cfngin.dag.DAG`): The module graph.
+
+    Returns:
+        :class:`runway.cfngin.dag.DAG`
+
+    """
+    transposed = graph.transpose()
+    result = DAG()
+    for node in reversed(list(transposed.graph)):
+        result.graph[node] = transposed.graph[node]
+    return result
+
+
+def build_module_graph(deployments, context, runway_vars, env_root):
+    """Build a graph of every module and region to be processed.
+
+    Modules without ``depends_on`` depend on the module (or parallel
+    modules) defined before them in the same region and deployment. The
+    first module of a region depends on the last module of the previous
+    region (or deployment for ``parallel_regions``). Modules with
+    ``depends_on`` only depend on the modules they name, in the same
+    region when possible. When destroying, the graph is built in the
+    order used to deploy and every dependency is reversed.
+
+    Args:
+        deployments (List[:class:`runway.config.DeploymentDefinition`]):
+            Deployments to process.
+        context (:class:`runway.context.Context`): Context of the
+            current run.
+        runway_vars (:class:`runway.config.VariablesDefinition`): Variables
+            used to resolve the deployments.
+        env_root (str): Root directory of the environment.
+
+    Returns:
+        Tuple[:class:`runway.cfngin.dag.DAG`, Dict[str, Tuple[Any, ...]]]:
+        The graph and the deployment, module, context and region of each
+        node.
+
+    """
+    destroy = context.command == 'destroy'
+    if destroy:
+        # build the graph in deploy order then reverse the edges
+        deployments = reverse_deployments(list(deployments))
+    graph = DAG()
+    nodes = {}
+    nodes_by_module = {}
+    explicit = []
+    previous = []
+
+    def add_region(deployment, region, deployment_context, tail):
+        """Add the modules of a deployment in a region to the graph."""
+        for module in deployment.modules:
+            names = []
+            for mod in module.child_modules or [module]:
+                name = '%s:%s:%s' % (deployment.name, mod.name, region)
+                while name in nodes:
+                    name += '_'
+                graph.add_node(name)
+                nodes[name] = (deployment, mod, deployment_context, region)
+                nodes_by_module.setdefault(mod.name, []).append(name)
+                names.append(name)
+                if mod.depends_on is None:
+                    for dep in tail:
+                        graph.add_edge(dep, name)
+                else:
+                    explicit.append((name, mod.depends_on, region))
+            tail = names
+        return tail
+
+    for deployment in deployments:
+        LOGGER.debug('Resolving deployment for preprocessing...')
+        deployment.resolve(context, runway_vars, pre_process=True)
+        deployment_context = _get_deployment_context(deployment, context,
+                                                     env_root)
+        if deployment_context is None:
+            continue
+        tail = previous
+        for region in deployment.regions:
+            tail = add_region(deployment, region, deployment_context,
+                              tail)
+        parallel_tails = []
+        for region in deployment.parallel_regions:
+            parallel_tails.extend(add_region(
+                deployment, region, deployment_context, previous
+            ))
+        previous = (tail if deployment.regions else []) + parallel_tails
+
+    _add_explicit_edges(graph, nodes, nodes_by_module, explicit)
+    if destroy:
+        reverse_deployments(deployments)
+        graph = _reverse_graph(graph)
+    return graph, nodes
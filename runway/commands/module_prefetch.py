@@ -0,0 +1,267 @@
+"""Prepare what modules need before any of them are processed."""
+import glob
+import logging
+import os
+
+import six
+import yaml
+
+from ..env_mgr import prefetch_versions
+from ..env_mgr.kbenv import KB_VERSION_FILENAME, KBEnvManager
+from ..env_mgr.tfenv import TF_VERSION_FILENAME, TFEnvManager
+from ..module.k8s import get_module_defined_k8s_ver, get_overlay_dir
+from ..module.terraform import (find_tf_bin, get_module_defined_tf_var,
+                                get_plugin_cache_dir,
+                                get_workspace_tfvars_file,
+                                prewarm_plugin_cache, providers_changed)
+from ..path import Path
+from ..sources.git import Git, resolve_refs
+from ..util import merge_dicts
+
+LOGGER = logging.getLogger('runway')
+
+
+def resolve_remote_module_refs(deployments, env_root):
+    """Resolve the refs of all remote module paths in parallel.
+
+    Args:
+        deployments (List[:class:`runway.config.DeploymentDefinition`]):
+            Deployments that will be processed.
+        env_root (str): Root directory of the environment.
+
+    """
+    sources = {}
+    for deployment in deployments:
+        for module in deployment.modules:
+            for mod in [module] + list(module.child_modules or []):
+                source, uri, location, options = Path.parse(mod)
+                if source != 'git':
+                    continue
+                sources.setdefault(
+                    (uri, tuple(sorted(options.items()))),
+                    Git(uri=uri, location=location, options=options,
+                        cache_dir=os.path.join(env_root, '.runway_cache'))
+                )
+    if sources:
+        LOGGER.debug('Resolving refs of %d remote module source(s)...',
+                     len(sources))
+        resolve_refs(list(sources.values()))
+
+
+def get_deployment_regions(deployment, context):
+    """Return the regions a deployment will be processed in.
+
+    Falls back to the region of the context when the regions can't be
+    determined before the deployment is resolved.
+
+    """
+    try:
+        regions = deployment.regions or deployment.parallel_regions
+    except Exception:  # pylint: disable=broad-except
+        regions = []
+    return regions or [context.env_region]
+
+
+def will_module_run(path, deployment, module, context):
+    """Determine if a local module will be processed for the environment.
+
+    Mirrors the checks made when the module is processed: the
+    ``environments`` of the deployment, module & ``runway.module.yml`` and
+    the tfvars files (Terraform) or overlays (Kubernetes) of the
+    environment. Modules are assumed to run when this can't be determined
+    before the deployment is resolved (e.g. values with lookups or
+    ``account_id/region`` environments that need an AWS call).
+
+    Args:
+        path (str): Path to the module.
+        deployment (:class:`runway.config.DeploymentDefinition`): Deployment
+            of the module.
+        module (:class:`runway.config.ModuleDefinition`): The module.
+        context (:class:`runway.context.Context`): Context of the current
+            run.
+
+    Returns:
+        bool
+
+    """
+    try:
+        module_opts = merge_dicts(
+            {'environments': deployment.environments.copy(),
+             'parameters': deployment.parameters.copy()},
+            {'environments': module.environments,
+             'parameters': module.parameters}
+        )
+        module_file = os.path.join(path, 'runway.module.yml')
+        if os.path.isfile(module_file):
+            with open(module_file, 'r') as stream:
+                module_opts = merge_dicts(module_opts,
+                                          yaml.safe_load(stream) or {})
+    except Exception:  # pylint: disable=broad-except
+        return True
+    environment = (module_opts.get('environments') or {}).get(
+        context.env_name, {}
+    )
+    parameters = dict(module_opts.get('parameters') or {})
+    if isinstance(environment, dict):
+        parameters.update(environment)
+    elif environment is False:
+        return False
+    regions = get_deployment_regions(deployment, context)
+    if glob.glob(os.path.join(path, '*.tf')):
+        return bool(parameters) or any(
+            os.path.isfile(os.path.join(path, get_workspace_tfvars_file(
+                path, context.env_name, region
+            )))
+            for region in regions
+        )
+    if os.path.isdir(os.path.join(path, 'overlays')):
+        return any(
+            os.path.isfile(os.path.join(get_overlay_dir(
+                os.path.join(path, 'overlays'), context.env_name, region
+            ), 'kustomization.yaml'))
+            for region in regions
+        )
+    return True
+
+
+def local_module_paths(deployments, context, env_root):
+    """Yield the path & options of each local module that will run.
+
+    Modules skipped for the environment (see :func:`will_module_run`) are
+    omitted, as are options that can't be used before the deployment is
+    resolved (e.g. they contain lookups).
+
+    Args:
+        deployments (List[:class:`runway.config.DeploymentDefinition`]):
+            Deployments that will be processed.
+        context (:class:`runway.context.Context`): Context of the current
+            run.
+        env_root (str): Root directory of the environment.
+
+    Yields:
+        Tuple[str, Dict[str, Any]]
+
+    """
+    for deployment in deployments:
+        try:
+            deployment_options = deployment.module_options
+        except Exception:  # pylint: disable=broad-except
+            deployment_options = {}
+        for module in deployment.modules:
+            for mod in [module] + list(module.child_modules or []):
+                source, _uri, location, _options = Path.parse(mod)
+                if source != 'local':
+                    continue
+                path = os.path.join(env_root, location)
+                if not will_module_run(path, deployment, mod, context):
+                    LOGGER.debug('Module "%s" will be skipped for this '
+                                 'environment; not preparing it', location)
+                    continue
+                try:
+                    options = merge_dicts(deployment_options, mod.options)
+                except Exception:  # pylint: disable=broad-except
+                    options = deployment_options
+                yield path, options
+
+
+def prefetch_tool_versions(deployments, context, env_root):
+    """Install the Terraform & kubectl versions of local modules.
+
+    Versions requested by ``.terraform-version`` & ``.kubectl-version``
+    files or the ``terraform_version`` & ``kubectl_version`` options of
+    modules that will run are installed in parallel before any module is
+    processed.
+
+    Args:
+        deployments (List[:class:`runway.config.DeploymentDefinition`]):
+            Deployments that will be processed.
+        context (:class:`runway.context.Context`): Context of the current
+            run.
+        env_root (str): Root directory of the environment.
+
+    """
+    def has_version_file(version_dir):
+        """Determine if a directory has a version file."""
+        return os.path.isfile(os.path.join(version_dir, version_file))
+
+    installs = {}
+    for path, options in local_module_paths(deployments, context, env_root):
+        if glob.glob(os.path.join(path, '*.tf')):
+            manager, version_file = TFEnvManager, TF_VERSION_FILENAME
+            version = get_module_defined_tf_var(
+                options.get('terraform_version', {}), context.env_name
+            )
+            version_dirs = []
+        elif os.path.isdir(os.path.join(path, 'overlays')):
+            manager, version_file = KBEnvManager, KB_VERSION_FILENAME
+            version = get_module_defined_k8s_ver(
+                options.get('kubectl_version', {}), context.env_name
+            )
+            # overlays of the environment (any region)
+            version_dirs = [
+                i for i in glob.glob(os.path.join(path, 'overlays', '*'))
+                if (os.path.basename(i) == context.env_name or
+                    os.path.basename(i).startswith(context.env_name + '-'))
+                and has_version_file(i)
+            ]
+        else:
+            continue
+        if isinstance(version, six.string_types) and '${' not in version:
+            installs.setdefault((manager, path, version),
+                                (manager(path), version))
+            continue
+        if not version_dirs:
+            version_dirs = [i for i in [path, env_root]
+                            if has_version_file(i)][:1]
+        for version_dir in version_dirs:
+            installs.setdefault((manager, version_dir, None),
+                                (manager(version_dir), None))
+    if installs:
+        LOGGER.debug('Installing %d Terraform/kubectl version(s)...',
+                     len(installs))
+        prefetch_versions(list(installs.values()))
+
+
+def prewarm_terraform_plugins(deployments, context, env_root):
+    """Download the providers of local Terraform modules in parallel.
+
+    Providers are downloaded to the plugin cache shared by all Terraform
+    modules and regions before any module is processed. Nothing is
+    downloaded when destroying. Modules whose provider requirements are
+    unchanged since their last complete init are skipped, as are modules
+    whose Terraform version can't be installed (the error is raised when
+    the module is processed instead).
+
+    Args:
+        deployments (List[:class:`runway.config.DeploymentDefinition`]):
+            Deployments that will be processed.
+        context (:class:`runway.context.Context`): Context of the current
+            run.
+        env_root (str): Root directory of the environment.
+
+    """
+    cache_dir = get_plugin_cache_dir(env_root, context.env_vars)
+    if not cache_dir or context.command == 'destroy':
+        return
+    modules = []
+    for path, options in local_module_paths(deployments, context, env_root):
+        if not glob.glob(os.path.join(path, '*.tf')):
+            continue
+        version = get_module_defined_tf_var(
+            options.get('terraform_version', {}), context.env_name
+        )
+        try:
+            if isinstance(version, six.string_types) and \
+                    '${' not in version:
+                tf_bin = TFEnvManager(path).install(version)
+            else:
+                tf_bin = find_tf_bin(path, env_root)
+        except (Exception, SystemExit):  # noqa pylint: disable=broad-except
+            LOGGER.debug('Unable to find Terraform for %s; not downloading '
+                         'its providers', path, exc_info=True)
+            continue
+        if tf_bin and (tf_bin, path) not in modules and \
+                providers_changed(tf_bin, path, options, context.env_vars):
+            modules.append((tf_bin, path))
+    if modules:
+        prewarm_plugin_cache(modules, cache_dir, context.env_vars)
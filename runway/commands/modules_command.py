@@ -20,16 +20,28 @@ import yaml
 from .runway_command import RunwayCommand, get_env
 from ..context import Context
 from ..path import Path
+from .output_multiplexer import MODES as PARALLEL_OUTPUT_MODES
+from .output_multiplexer import OutputMultiplexer
+from .module_graph import (build_module_graph, parallel_disabled_reason,
+                           parallel_enabled, reverse_deployments,
+                           run_module_graph)
+from .module_prefetch import (prefetch_tool_versions,
+                              prewarm_terraform_plugins,
+                              resolve_remote_module_refs)
+from .worker_pool import WorkerPool
 from ..util import (
-    change_dir, load_object_from_string, merge_dicts,
+    PROCESS_STATE_LOCK, change_dir, load_object_from_string, merge_dicts,
     merge_nested_environment_dicts, extract_boto_args_from_env
 )
 
-if sys.version_info[0] > 2:
-    import concurrent.futures
-
 LOGGER = logging.getLogger('runway')
 
+# How the output of modules processed concurrently is shown.
+PARALLEL_OUTPUT_ENV_VAR = 'RUNWAY_PARALLEL_OUTPUT'
+# Whether modules are processed concurrently by processes or threads.
+PARALLEL_MODE_ENV_VAR = 'RUNWAY_PARALLEL_MODE'
+PARALLEL_MODES = ['processes', 'threads']
+
 
 def find_kustomize_files(path):
     """Return true if kustomize yaml file found."""
@@ -56,7 +68,7 @@ def assume_role(role_arn, session_name=None, duration_seconds=None,
             if env_vars.get(i.upper()):
                 boto_args[i] = env_vars[i.upper()]
 
-    sts_client = boto3.client('sts', region_name=region, **boto_args)
+    sts_client = boto3.Session(**boto_args).client('sts', region_name=region)
     LOGGER.info("Assuming role %s...", role_arn)
     response = sts_client.assume_role(**assume_role_opts)
     return {'AWS_ACCESS_KEY_ID': response['Credentials']['AccessKeyId'],
@@ -308,7 +320,8 @@ def validate_account_credentials(deployment, context):
     else:
         account_id = None
     if account_id:
-        validate_account_id(boto3.client('sts', **boto_args), account_id)
+        validate_account_id(boto3.Session(**boto_args).client('sts'),
+                            account_id)
     if isinstance(deployment.get('account_alias'), six.string_types):
         account_alias = deployment['account_alias']
     elif deployment.get('account_alias', {}).get(context.env_name):
@@ -316,7 +329,7 @@ def validate_account_credentials(deployment, context):
     else:
         account_alias = None
     if account_alias:
-        validate_account_alias(boto3.client('iam', **boto_args),
+        validate_account_alias(boto3.Session(**boto_args).client('iam'),
                                account_alias)
 
 
@@ -348,7 +361,7 @@ def validate_environment(module_name, env_def, env_vars):
 
     if isinstance(env_def, (list, six.string_types)):
         boto_args = extract_boto_args_from_env(env_vars)
-        sts_client = boto3.client('sts', **boto_args)
+        sts_client = boto3.Session(**boto_args).client('sts')
         current_env = '{}/{}'.format(
             sts_client.get_caller_identity()['Account'],
             env_vars['AWS_DEFAULT_REGION']
@@ -371,6 +384,8 @@ def validate_environment(module_name, env_def, env_vars):
 class ModulesCommand(RunwayCommand):
     """Env deployment class."""
 
+    _worker_pool = None
+
     def run(self, deployments=None, command='plan'):
         """Execute apps/code command."""
         if deployments is None:
@@ -421,7 +436,74 @@ class ModulesCommand(RunwayCommand):
         LOGGER.info("")
         LOGGER.info("Found %d deployment(s)", len(deployments_to_run))
 
-        self._process_deployments(deployments_to_run, context)
+        resolve_remote_module_refs(deployments_to_run, self.env_root)
+        prefetch_tool_versions(deployments_to_run, context, self.env_root)
+        prewarm_terraform_plugins(deployments_to_run, context, self.env_root)
+        parallel_mode = context.env_vars.get(PARALLEL_MODE_ENV_VAR) or \
+            'processes'
+        if parallel_mode not in PARALLEL_MODES:
+            LOGGER.error('%s must be one of: %s', PARALLEL_MODE_ENV_VAR,
+                         ', '.join(PARALLEL_MODES))
+            sys.exit(1)
+        self._worker_pool = WorkerPool(
+            self, context,
+            getattr(self.runway_config, 'max_concurrency', 0) or 0,
+            self._get_output_multiplexer(context),
+            use_threads=parallel_mode == 'threads'
+        )
+        try:
+            self._process_deployments(deployments_to_run, context)
+        finally:
+            self._worker_pool.shutdown()
+            self._worker_pool = None
+
+    def _get_output_multiplexer(self, context):
+        """Create what shows the output of modules processed concurrently.
+
+        Args:
+            context (:class:`runway.context.Context`): Context of the
+                current run.
+
+        Returns:
+            Optional[:class:`runway.commands.output_multiplexer.OutputMultiplexer`]:
+            ``None`` when output should be interleaved or modules will not
+            be processed concurrently.
+
+        """
+        mode = context.env_vars.get(PARALLEL_OUTPUT_ENV_VAR) or 'prefix'
+        if mode not in PARALLEL_OUTPUT_MODES:
+            LOGGER.error('%s must be one of: %s', PARALLEL_OUTPUT_ENV_VAR,
+                         ', '.join(PARALLEL_OUTPUT_MODES))
+            sys.exit(1)
+        if mode == 'interleaved' or not parallel_enabled(context.env_vars):
+            return None
+        return OutputMultiplexer(
+            os.path.join(self.env_root, '.runway_cache', 'logs'), mode
+        )
+
+    def _log_parallel_output(self):
+        """Log how the output of concurrent modules will be shown."""
+        if self.worker_pool.output:
+            LOGGER.info('(output of each is shown as it is written to %s)',
+                        self.worker_pool.output.log_dir)
+        else:
+            LOGGER.info('(output will be interwoven)')
+
+    @property
+    def worker_pool(self):
+        """Pool of worker processes used to process modules concurrently.
+
+        Returns:
+            :class:`runway.commands.worker_pool.WorkerPool`
+
+        """
+        if self._worker_pool is None:
+            self._worker_pool = WorkerPool(
+                self,
+                max_workers=getattr(self.runway_config, 'max_concurrency',
+                                    0) or 0
+            )
+        return self._worker_pool
 
     def execute(self):
         # type: () -> None
@@ -431,6 +513,12 @@ class ModulesCommand(RunwayCommand):
 
     def _process_deployments(self, deployments, context):
         """Process deployments."""
+        if any(mod.depends_on is not None
+               for deployment in deployments
+               for module in deployment.modules
+               for mod in [module] + list(module.child_modules or [])):
+            self._process_module_graph(deployments, context)
+            return
         for _, deployment in enumerate(deployments):
             LOGGER.debug('Resolving deployment for preprocessing...')
             deployment.resolve(context, self.runway_vars, pre_process=True)
@@ -468,21 +556,20 @@ class ModulesCommand(RunwayCommand):
                 LOGGER.info("")
 
                 if (deployment.parallel_regions and
-                        context.env_vars.get('CI') and
-                        sys.version_info[0] > 2):
-                    # CI is required for concurrent execution to prevent weird
-                    # user-input behavior
+                        parallel_enabled(context.env_vars)):
+                    # CI (or RUNWAY_PARALLEL) is required for concurrent
+                    # execution to prevent weird user-input behavior
                     # py3+ is required because backported futures has issues with
                     # ProcessPoolExecutor
                     LOGGER.info("Processing parallel regions %s",
                                 deployment.parallel_regions)
-                    LOGGER.info('(output will be interwoven)')
-                    executor = concurrent.futures.ProcessPoolExecutor()
-                    futures = [executor.submit(self._execute_deployment,
-                                               *[deployment, context,
-                                                 region, True])
-                               for region in deployment.parallel_regions]
-                    concurrent.futures.wait(futures)
+                    self._log_parallel_output()
+                    futures = [self.worker_pool.submit_task(
+                        '%s:%s' % (deployment.name, region),
+                        self._execute_deployment, deployment, context,
+                        region, True
+                    ) for region in deployment.parallel_regions]
+                    self.worker_pool.wait(futures)
                     for job in futures:
                         job.result()  # Raise exceptions / exit as needed
                     return
@@ -490,8 +577,7 @@ class ModulesCommand(RunwayCommand):
                 if deployment.parallel_regions:
                     LOGGER.info(
                         '%s - processing the regions sequentially...',
-                        ('Not running in CI mode' if sys.version_info[0] > 2
-                         else 'Parallel execution requires Python 3+')
+                        parallel_disabled_reason()
                     )
                     deployment.regions += deployment.parallel_regions
 
@@ -509,6 +595,49 @@ class ModulesCommand(RunwayCommand):
                 LOGGER.error('No region configured for any deployment')
                 sys.exit(1)
 
+    def _build_module_graph(self, deployments, context):
+        """Build a graph of every module and region to be processed.
+
+        See :func:`runway.commands.module_graph.build_module_graph`.
+
+        """
+        return build_module_graph(deployments, context, self.runway_vars,
+                                  self.env_root)
+
+    def _process_module_graph(self, deployments, context):
+        """Process deployments as a graph of modules and regions."""
+        graph, nodes = self._build_module_graph(deployments, context)
+        LOGGER.info('')
+        LOGGER.info('Processing %d module(s) using their dependencies',
+                    len(nodes))
+        # CI (or RUNWAY_PARALLEL) is required for concurrent execution to
+        # prevent weird user-input behavior
+        if parallel_enabled(context.env_vars):
+            self._log_parallel_output()
+            executor = self.worker_pool
+        else:
+            LOGGER.info('%s - processing the modules sequentially...',
+                        parallel_disabled_reason())
+            executor = None
+
+        tasks = dict((node, (self._execute_module, args))
+                     for node, args in nodes.items())
+        run_module_graph(graph, tasks, executor)
+
+    def _execute_module(self, deployment, module, context, region):
+        """Execute a single module of a deployment in a region."""
+        context = copy.deepcopy(context)
+        context.env_region = region
+        context.env_vars.update({'AWS_DEFAULT_REGION': region,
+                                 'AWS_REGION': region})
+
+        if deployment.assume_role:
+            pre_deploy_assume_role(deployment.assume_role, context)
+        if deployment.account_id or deployment.account_alias:
+            validate_account_credentials(deployment, context)
+
+        self._deploy_module(module, deployment, context)
+
     def _execute_deployment(self, deployment, context, region,
                             is_parallel_regions=False):
         """Execute a single deployment."""
@@ -535,29 +664,28 @@ class ModulesCommand(RunwayCommand):
         """Process the modules of a deployment."""
         for module in deployment.modules:
             if module.child_modules:
-                # CI is required for concurrent execution to prevent weird
-                # user-input behavior
+                # CI (or RUNWAY_PARALLEL) is required for concurrent
+                # execution to prevent weird user-input behavior
                 # py3+ is required because backported futures has issues with
-                # ProcessPoolExecutor, and alternatives (like ThreadPoolExecuter)
-                # won't work properly (e.g. working directory changes aren't
-                # thread-safe)
-                if context.env_vars.get('CI') and sys.version_info[0] > 2:
+                # ProcessPoolExecutor (RUNWAY_PARALLEL_MODE=threads is only
+                # offered alongside it)
+                if parallel_enabled(context.env_vars):
                     LOGGER.info("Processing parallel modules %s",
                                 [x.path for x in module.child_modules])
-                    LOGGER.info('(output will be interwoven)')
-                    executor = concurrent.futures.ProcessPoolExecutor()
-                    futures = [executor.submit(self._deploy_module,
-                                               *[x, deployment, context])
-                               for x in module.child_modules]
-                    concurrent.futures.wait(futures)
+                    self._log_parallel_output()
+                    futures = [self.worker_pool.submit_task(
+                        '%s:%s:%s' % (deployment.name, x.name,
+                                      context.env_region),
+                        self._deploy_module, x, deployment, context
+                    ) for x in module.child_modules]
+                    self.worker_pool.wait(futures)
                     for job in futures:
                         job.result()  # Raise exceptions / exit as needed
                 else:
                     LOGGER.info(
                         '%s - processing the following '
                         'parallel modules sequentially...',
-                        ('Not running in CI mode' if sys.version_info[0] > 2
-                         else 'Parallel execution requires Python 3+')
+                        parallel_disabled_reason()
                     )
                     for child_module in module.child_modules:
                         self._deploy_module(child_module,
@@ -630,35 +758,31 @@ class ModulesCommand(RunwayCommand):
                             "applied to this module: %s",
                             str(module_env_vars))
                 context.env_vars = merge_dicts(context.env_vars, module_env_vars)
-        with change_dir(path.module_root):
-            # dynamically load the particular module's class, 'get' the method
-            # associated with the command, and call the method
-            module_class = determine_module_class(path.module_root,
-                                                  module_opts.get('class_path'))
-            module_instance = module_class(
-                context=context,
-                path=path.module_root,
-                options=module_opts
-            )
-            if hasattr(module_instance, context.command):
-                command_method = getattr(module_instance, context.command)
+        # dynamically load the particular module's class, 'get' the method
+        # associated with the command, and call the method
+        module_class = determine_module_class(path.module_root,
+                                              module_opts.get('class_path'))
+        module_instance = module_class(
+            context=context,
+            path=path.module_root,
+            options=module_opts
+        )
+        if hasattr(module_instance, context.command):
+            command_method = getattr(module_instance, context.command)
+            if getattr(module_class, 'cwd_independent', False):
                 command_method()
             else:
-                LOGGER.error("'%s' is missing method '%s'",
-                             module_instance, context.command)
-                sys.exit(1)
+                with PROCESS_STATE_LOCK, change_dir(path.module_root):
+                    command_method()
+        else:
+            LOGGER.error("'%s' is missing method '%s'",
+                         module_instance, context.command)
+            sys.exit(1)
 
     @staticmethod
     def reverse_deployments(deployments=None):
         """Reverse deployments and the modules/regions in them."""
-        if deployments is None:
-            deployments = []
-
-        for deployment in deployments:
-            deployment.reverse()
-
-        deployments.reverse()
-        return deployments
+        return reverse_deployments(deployments)
 
     @staticmethod
     def select_deployment_to_run(deployments=None, command='build'):
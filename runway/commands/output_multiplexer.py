@@ -0,0 +1,163 @@
+"""Display the output of tasks run at the same time without interleaving."""
+import glob
+import logging
+import os
+import re
+import sys
+from collections import OrderedDict
+
+LOGGER = logging.getLogger('runway')
+
+MODES = ['prefix', 'status', 'interleaved']
+
+
+class OutputMultiplexer(object):
+    """Show the output of tasks that are written to log files.
+
+    Each task writes everything it outputs (including the output of child
+    processes) to its own log file. Calling :meth:`poll` shows what was
+    added to the logs since the last call, either as lines prefixed with
+    the name of the task (``prefix``) or as a board showing the state of
+    each task (``status``). The full log of each failed task is shown
+    again by :meth:`close`.
+
+    """
+
+    def __init__(self, log_dir, mode='prefix', stream=None):
+        """Instantiate class.
+
+        Args:
+            log_dir (str): Directory where the log files are written. Logs
+                left by a previous run are removed.
+            mode (str): How output is shown (``prefix`` or ``status``).
+            stream (Optional[IO[str]]): Where output is shown. Defaults to
+                ``sys.stdout``.
+
+        """
+        if mode not in MODES:
+            raise ValueError('Invalid parallel output mode "%s"; expected '
+                             'one of: %s' % (mode, ', '.join(MODES)))
+        self.log_dir = log_dir
+        self.mode = mode
+        self.stream = stream
+        self._tasks = OrderedDict()
+        self._board_lines = 0
+        self._board_states = None
+        if os.path.isdir(log_dir):
+            for path in glob.glob(os.path.join(log_dir, '*.log')):
+                os.remove(path)
+
+    def __getstate__(self):
+        """Exclude the output stream when pickled."""
+        state = self.__dict__.copy()
+        state['stream'] = None
+        return state
+
+    @property
+    def _stream(self):
+        """Stream that output is written to."""
+        return self.stream or sys.stdout
+
+    def start(self, name):
+        """Start tracking the output of a task.
+
+        Args:
+            name (str): Name of the task.
+
+        Returns:
+            Optional[str]: Path of the file the task should write its output
+            to. ``None`` when output is not captured.
+
+        """
+        if self.mode == 'interleaved':
+            return None
+        if not os.path.isdir(self.log_dir):
+            os.makedirs(self.log_dir)
+        path = os.path.join(self.log_dir,
+                            re.sub(r'[^\w.-]+', '_', name) + '.log')
+        open(path, 'w').close()
+        self._tasks[name] = {'path': path, 'offset': 0, 'partial': '',
+                             'lines': 0, 'state': 'running'}
+        return path
+
+    def finish(self, name, failed=False):
+        """Mark a task as done and show the rest of its output.
+
+        Args:
+            name (str): Name of the task.
+            failed (bool): Whether the task failed.
+
+        """
+        task = self._tasks.get(name)
+        if not task:
+            return
+        self._read(name, task, final=True)
+        task['state'] = 'failed' if failed else 'done'
+        if self.mode == 'status':
+            self._draw_board()
+
+    def poll(self):
+        """Show output added to the logs since the last call."""
+        for name, task in self._tasks.items():
+            if task['state'] == 'running':
+                self._read(name, task)
+        if self.mode == 'status':
+            self._draw_board()
+
+    def close(self):
+        """Show the full output of failed tasks."""
+        self.poll()
+        failed = [(name, task) for name, task in self._tasks.items()
+                  if task['state'] == 'failed']
+        for name, task in failed:
+            self._stream.write('\n======= Output of failed task "%s" '
+                               '=======\n' % name)
+            with open(task['path'], 'r') as log_file:
+                self._stream.write(log_file.read())
+            self._stream.write('======= End of output (%s) =======\n'
+                               % task['path'])
+            task['state'] = 'reported'
+        if self._tasks:
+            LOGGER.info('Logs of parallel tasks were written to %s',
+                        self.log_dir)
+        self._stream.flush()
+
+    def _read(self, name, task, final=False):
+        """Read new output of a task and show it in prefix mode."""
+        with open(task['path'], 'rb') as log_file:
+            log_file.seek(task['offset'])
+            data = log_file.read()
+        task['offset'] += len(data)
+        lines = (task['partial'] +
+                 data.decode('utf-8', 'replace')).split('\n')
+        task['partial'] = lines.pop()
+        if final and task['partial']:
+            lines.append(task['partial'])
+            task['partial'] = ''
+        task['lines'] += len(lines)
+        if self.mode == 'prefix' and lines:
+            self._stream.write(''.join('[%s] %s\n' % (name, line)
+                                       for line in lines))
+            self._stream.flush()
+
+    def _draw_board(self):
+        """Show the state of each task.
+
+        When output is a terminal, the board is redrawn in place. Otherwise,
+        it is written again only when the state of a task changes.
+
+        """
+        rows = ['%-10s %s (%d lines)' % (task['state'], name, task['lines'])
+                for name, task in self._tasks.items()]
+        is_tty = getattr(self._stream, 'isatty', lambda: False)()
+        if is_tty:
+            if self._board_lines:
+                self._stream.write('\x1b[%dF' % self._board_lines)
+            self._stream.write(''.join('\x1b[2K%s\n' % row for row in rows))
+            self._board_lines = len(rows)
+        else:
+            states = [row.split(' (')[0] for row in rows]
+            if states != self._board_states:
+                self._stream.write('\n'.join(states) + '\n')
+                self._board_states = states
+        self._stream.flush()
@@ -0,0 +1,478 @@
+"""Pool of worker processes used to process modules concurrently."""
+import copy
+import importlib
+import io
+import logging
+import multiprocessing
+import os
+import sys
+import traceback
+from contextlib import contextmanager
+
+from ..context import Context
+from ..sources import git
+from ..util import WORKER_THREAD, get_task_output, task_output
+
+if sys.version_info[0] > 2:
+    import concurrent.futures
+
+LOGGER = logging.getLogger('runway')
+
+# Imported by the worker processes before they are given any tasks.
+PRELOAD_MODULES = ['boto3', 'botocore.session',
+                   'runway.commands.modules_command',
+                   'runway.module.cdk', 'runway.module.cloudformation',
+                   'runway.module.k8s', 'runway.module.serverless',
+                   'runway.module.staticsite', 'runway.module.terraform']
+
+# Set in each worker process by _initialize_worker.
+WORKER_STATE = {}
+
+# Seconds between checks for new output while waiting for tasks.
+POLL_INTERVAL = 0.2
+
+
+class ContextDelta(object):  # pylint: disable=too-few-public-methods
+    """Differences between a :class:`runway.context.Context` and a base.
+
+    Sent to worker processes in place of the context so only the attributes
+    and environment variables that changed are pickled.
+
+    """
+
+    def __init__(self, base, context):
+        """Instantiate class.
+
+        Args:
+            base (:class:`runway.context.Context`): Context the worker
+                processes were started with.
+            context (:class:`runway.context.Context`): Context to send.
+
+        """
+        self.attributes = dict(
+            (key, value) for key, value in vars(context).items()
+            if key != 'env_vars' and getattr(base, key, None) != value
+        )
+        self.set_env_vars = dict(
+            (key, value) for key, value in context.env_vars.items()
+            if base.env_vars.get(key) != value
+        )
+        self.unset_env_vars = [key for key in base.env_vars
+                               if key not in context.env_vars]
+
+    def apply(self, base):
+        """Create a context from the base context and these differences.
+
+        Args:
+            base (:class:`runway.context.Context`): Context the worker
+                process was started with.
+
+        Returns:
+            :class:`runway.context.Context`
+
+        """
+        context = copy.copy(base)
+        context.__dict__.update(self.attributes)
+        context.env_vars = dict(base.env_vars)
+        context.env_vars.update(self.set_env_vars)
+        for key in self.unset_env_vars:
+            context.env_vars.pop(key, None)
+        return context
+
+
+def _cpu_count():
+    """Get the number of CPUs, defaulting to 1 if it can't be determined."""
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def _initialize_worker(command, context, log_levels, resolved_refs=None):
+    """Prepare a worker process to run tasks.
+
+    Args:
+        command (:class:`runway.commands.modules_command.ModulesCommand`):
+            Command that tasks are run with.
+        context (:class:`runway.context.Context`): Base context.
+        log_levels (Dict[str, int]): Levels of the root, ``runway`` and
+            ``botocore`` loggers in the main process.
+        resolved_refs (Optional[Dict[Tuple[str, str], str]]): Git refs
+            resolved by the main process so workers check out the same
+            commits without resolving them again.
+
+    """
+    if not logging.root.handlers:
+        logging.basicConfig(level=log_levels['root'])
+    for name in ['runway', 'botocore']:
+        logging.getLogger(name).setLevel(log_levels[name])
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+    WORKER_STATE['command'] = command
+    WORKER_STATE['context'] = context
+    with git.REF_CACHE_LOCK:
+        git.RESOLVED_REFS.update(resolved_refs or {})
+
+
+@contextmanager
+def capture_output(log_path):
+    """Write everything output by the process and its children to a file.
+
+    stdout and stderr are redirected at the file descriptor level so the
+    output of child processes is captured too. stdin is closed so anything
+    waiting for input fails instead of waiting forever.
+
+    Args:
+        log_path (Optional[str]): File to write to. Output is not captured
+            when not provided.
+
+    """
+    if not log_path:
+        yield
+        return
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = dict((fd, os.dup(fd)) for fd in [0, 1, 2])
+    saved_streams = sys.stdout, sys.stderr
+    with open(log_path, 'ab') as log_file, open(os.devnull, 'rb') as devnull:
+        os.dup2(devnull.fileno(), 0)
+        os.dup2(log_file.fileno(), 1)
+        os.dup2(log_file.fileno(), 2)
+        # line buffered so output is shown as it happens
+        stream = io.open(log_file.fileno(), 'w', buffering=1, closefd=False)
+        sys.stdout = sys.stderr = stream
+        try:
+            yield
+        except Exception:
+            traceback.print_exc()
+            raise
+        finally:
+            stream.close()
+            sys.stdout, sys.stderr = saved_streams
+            for fd, saved_fd in saved.items():
+                os.dup2(saved_fd, fd)
+                os.close(saved_fd)
+
+
+def _run_call(log_path, method, args, kwargs):
+    """Call a method in a worker process, capturing its output.
+
+    Args:
+        log_path (Optional[str]): File to write the output to.
+        method (Callable[..., Any]): Method to call.
+        args (Tuple[Any, ...]): Positional arguments for the method.
+        kwargs (Dict[str, Any]): Keyword arguments for the method.
+
+    """
+    with capture_output(log_path):
+        return method(*args, **kwargs)
+
+
+def _run_task(log_path, method_name, args, kwargs):
+    """Run a method of the command in an initialized worker process.
+
+    Args:
+        log_path (Optional[str]): File to write the output to.
+        method_name (str): Name of the command method to call.
+        args (Tuple[Any, ...]): Positional arguments for the method.
+        kwargs (Dict[str, Any]): Keyword arguments for the method.
+
+    """
+    base = WORKER_STATE['context']
+
+    def restore(value):
+        """Turn a ContextDelta back into a Context."""
+        if isinstance(value, ContextDelta):
+            return value.apply(base)
+        return value
+
+    return _run_call(log_path, getattr(WORKER_STATE['command'], method_name),
+                     [restore(arg) for arg in args],
+                     dict((key, restore(value))
+                          for key, value in kwargs.items()))
+
+
+def _run_in_thread(log_path, method, args, kwargs):
+    """Call a method in a worker thread, capturing its output.
+
+    Args:
+        log_path (Optional[str]): File to write the output to.
+        method (Callable[..., Any]): Method to call.
+        args (Tuple[Any, ...]): Positional arguments for the method.
+        kwargs (Dict[str, Any]): Keyword arguments for the method.
+
+    """
+    WORKER_THREAD.active = True
+    try:
+        if not log_path:
+            return method(*args, **kwargs)
+        with open(log_path, 'a', buffering=1) as stream, task_output(stream):
+            try:
+                return method(*args, **kwargs)
+            except Exception:
+                traceback.print_exc(file=stream)
+                raise
+    finally:
+        WORKER_THREAD.active = False
+
+
+class ThreadOutputStream(object):
+    """Stream that writes to the output of the current thread's task.
+
+    Replaces ``sys.stdout``, ``sys.stderr`` and the streams of logging
+    handlers while a thread based pool captures output. Threads that are
+    not running a task write to the original stream.
+
+    """
+
+    def __init__(self, default):
+        """Instantiate class.
+
+        Args:
+            default (IO[str]): Stream used by threads not running a task.
+
+        """
+        self.default = default
+
+    @property
+    def stream(self):
+        """Stream of the current thread."""
+        return get_task_output() or self.default
+
+    def write(self, data):
+        """Write to the stream of the current thread."""
+        return self.stream.write(data)
+
+    def flush(self):
+        """Flush the stream of the current thread."""
+        return self.stream.flush()
+
+    def __getattr__(self, name):
+        """Get any other attribute from the stream of the current thread."""
+        return getattr(self.stream, name)
+
+
+class WorkerPool(object):
+    """Long-lived pool of worker processes that run command methods.
+
+    The pool is started the first time a task is submitted and is reused
+    for the rest of the command. Workers import Runway and its module
+    classes before receiving tasks. They are given the command and the base
+    context once so tasks only include their own arguments and the changes
+    made to the context. When an
+    :class:`runway.commands.output_multiplexer.OutputMultiplexer` is
+    provided, the output of named tasks is captured and shown by it while
+    waiting for them.
+
+    With ``use_threads``, tasks are run by threads of the current process
+    instead, avoiding the cost of starting processes and pickling tasks.
+    Tasks get a copy of their arguments, as they would in a process. Tasks
+    submitted by a task are run right away in the same thread.
+
+    """
+
+    def __init__(self, command, context=None,  # pylint: disable=too-many-arguments
+                 max_workers=0, output=None, use_threads=False):
+        """Instantiate class.
+
+        Args:
+            command (:class:`runway.commands.modules_command.ModulesCommand`):
+                Command whose methods are run by the workers.
+            context (Optional[:class:`runway.context.Context`]): Base
+                context. When not provided, contexts are sent in full.
+            max_workers (int): Number of worker processes. ``0`` uses the
+                number of CPUs.
+            output (Optional[:class:`runway.commands.output_multiplexer.OutputMultiplexer`]):
+                Shows the output of named tasks.
+            use_threads (bool): Run tasks in threads instead of processes.
+
+        """
+        self.command = command
+        self.context = copy.deepcopy(context)
+        self.max_workers = max_workers or _cpu_count()
+        self.output = output
+        self.use_threads = use_threads
+        self._executor = None
+        self._task_names = {}
+        self._saved_streams = None
+
+    def __getstate__(self):
+        """Exclude the executor when pickled along with the command."""
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['_task_names'] = {}
+        state['_saved_streams'] = None
+        return state
+
+    @property
+    def executor(self):
+        """Executor that runs the tasks, started when first used.
+
+        Returns:
+            :class:`concurrent.futures.Executor`
+
+        """
+        if not self._executor and self.use_threads:
+            LOGGER.debug('Starting %d worker thread(s)...', self.max_workers)
+            if self.output:
+                self._redirect_streams()
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers
+            )
+        elif not self._executor:
+            kwargs = {'max_workers': self.max_workers}
+            if sys.version_info >= (3, 7) and self.context is not None:
+                kwargs['initializer'] = _initialize_worker
+                with git.REF_CACHE_LOCK:
+                    resolved_refs = dict(git.RESOLVED_REFS)
+                kwargs['initargs'] = (self.command, self.context, {
+                    'root': logging.root.level,
+                    'runway': logging.getLogger('runway').level,
+                    'botocore': logging.getLogger('botocore').level
+                }, resolved_refs)
+                if not getattr(sys, 'frozen', False) and \
+                        'forkserver' in multiprocessing.get_all_start_methods():
+                    mp_context = multiprocessing.get_context('forkserver')
+                    mp_context.set_forkserver_preload(PRELOAD_MODULES)
+                    kwargs['mp_context'] = mp_context
+            LOGGER.debug('Starting %d worker process(es)...',
+                         self.max_workers)
+            self._executor = concurrent.futures.ProcessPoolExecutor(**kwargs)
+        return self._executor
+
+    def submit(self, method, *args, **kwargs):
+        """Run a method of the command in a worker process.
+
+        Any :class:`runway.context.Context` in the arguments is sent as a
+        :class:`ContextDelta`.
+
+        Args:
+            method (Callable[..., Any]): Bound method of the command.
+
+        Returns:
+            :class:`concurrent.futures.Future`
+
+        """
+        return self.submit_task(None, method, *args, **kwargs)
+
+    def submit_task(self, name, method, *args, **kwargs):
+        """Run a method of the command in a worker process as a named task.
+
+        Args:
+            name (Optional[str]): Name shown with the output of the task.
+                Output is only captured for named tasks.
+            method (Callable[..., Any]): Bound method of the command.
+
+        Returns:
+            :class:`concurrent.futures.Future`
+
+        """
+        if self.use_threads:
+            return self._submit_to_thread(name, method, args, kwargs)
+        log_path = self.output.start(name) if self.output and name else None
+        if sys.version_info < (3, 7) or self.context is None:
+            # workers aren't initialized so the whole call is sent
+            future = self.executor.submit(_run_call, log_path, method, args,
+                                          kwargs)
+        else:
+            def convert(value):
+                """Turn a Context into a ContextDelta."""
+                if isinstance(value, Context):
+                    return ContextDelta(self.context, value)
+                return value
+
+            future = self.executor.submit(
+                _run_task, log_path, method.__name__,
+                tuple(convert(arg) for arg in args),
+                dict((key, convert(value)) for key, value in kwargs.items())
+            )
+        if log_path:
+            self._task_names[future] = name
+        return future
+
+    def _submit_to_thread(self, name, method, args, kwargs):
+        """Run a method of the command in a worker thread."""
+        # copied like they would be when sent to a process
+        args, kwargs = copy.deepcopy((args, kwargs))
+        if getattr(WORKER_THREAD, 'active', False):
+            # waiting for other threads from a worker thread could use every
+            # thread of the pool and never finish
+            future = concurrent.futures.Future()
+            try:
+                future.set_result(method(*args, **kwargs))
+            except BaseException as err:  # pylint: disable=broad-except
+                future.set_exception(err)
+            return future
+        log_path = self.output.start(name) if self.output and name else None
+        future = self.executor.submit(_run_in_thread, log_path, method, args,
+                                      kwargs)
+        if log_path:
+            self._task_names[future] = name
+        return future
+
+    def _redirect_streams(self):
+        """Send what threads write to stdout/stderr to their task output."""
+        self._saved_streams = {'stdout': sys.stdout, 'stderr': sys.stderr,
+                               'handlers': {}}
+        sys.stdout = ThreadOutputStream(sys.stdout)
+        sys.stderr = ThreadOutputStream(sys.stderr)
+        for logger in [logging.root, logging.getLogger('runway')]:
+            for handler in logger.handlers:
+                if isinstance(handler, logging.StreamHandler) and \
+                        not isinstance(handler, logging.FileHandler):
+                    self._saved_streams['handlers'][handler] = handler.stream
+                    handler.stream = ThreadOutputStream(handler.stream)
+
+    def _restore_streams(self):
+        """Undo :meth:`_redirect_streams`."""
+        if not self._saved_streams:
+            return
+        sys.stdout = self._saved_streams['stdout']
+        sys.stderr = self._saved_streams['stderr']
+        for handler, stream in self._saved_streams['handlers'].items():
+            handler.stream = stream
+        self._saved_streams = None
+
+    def wait(self, futures, return_when='ALL_COMPLETED'):
+        """Wait for tasks while showing their output.
+
+        Args:
+            futures (List[:class:`concurrent.futures.Future`]): Tasks to
+                wait for.
+            return_when (str): ``ALL_COMPLETED`` or ``FIRST_COMPLETED``.
+
+        Returns:
+            Tuple[Set[:class:`concurrent.futures.Future`],
+            Set[:class:`concurrent.futures.Future`]]: Tasks that are done
+            and tasks that are not.
+
+        """
+        while True:
+            done, not_done = concurrent.futures.wait(
+                futures, timeout=POLL_INTERVAL if self.output else None,
+                return_when=return_when
+            )
+            self._show_output(done)
+            if not not_done or (
+                    done and return_when == concurrent.futures.FIRST_COMPLETED
+            ):
+                return done, not_done
+
+    def _show_output(self, done):
+        """Show the output of running tasks and those that are done."""
+        if not self.output:
+            return
+        for future in done:
+            name = self._task_names.pop(future, None)
+            if name:
+                self.output.finish(name, failed=future.exception() is not None)
+        self.output.poll()
+
+    def shutdown(self):
+        """Stop the workers once running tasks are done."""
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+        self._restore_streams()
+        if self.output:
+            self.output.close()
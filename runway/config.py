@@ -210,7 +210,8 @@ class ModuleDefinition(ConfigComponent):  # pylint: disable=too-many-instance-at
 
     One special map keyword, ``parallel``, indicates a list of child
     modules that will be executed in parallel (simultaneously) if the
-    ``CI`` :ref:`environment variable is set<non-interactive-mode>`.
+    ``CI`` :ref:`environment variable is set<non-interactive-mode>` (or
+    :ref:`RUNWAY_PARALLEL<parallel-output>`).
 
     Example:
       In this example, ``backend.tf`` will be deployed followed by the services
@@ -230,6 +231,39 @@ class ModuleDefinition(ConfigComponent):  # pylint: disable=too-many-instance-at
                   count: ${var count.${env DEPLOY_ENVIRONMENT}}
             - frontend.tf
 
+    Modules can also list the names of modules they depend on using
+    ``depends_on``. If any module being processed uses ``depends_on``,
+    Runway builds a graph of every module and region being processed and
+    starts each one as soon as the modules it depends on have finished.
+    Modules that do not use ``depends_on`` still wait for the module
+    defined before them. A module with an empty ``depends_on`` list can
+    start right away. Modules are processed concurrently when the ``CI``
+    :ref:`environment variable is set<non-interactive-mode>` (or
+    :ref:`RUNWAY_PARALLEL<parallel-output>`), limited by the top-level
+    ``max_concurrency`` option.
+
+    Example:
+      In this example, ``app.cfn`` is deployed after ``network.cfn`` and
+      ``database.tf`` but, ``network.cfn`` and ``database.tf`` are deployed
+      at the same time. In each region, ``app.cfn`` only waits for the
+      other modules in that region.
+
+      .. code-block:: yaml
+
+        deployments:
+          - modules:
+              - path: network.cfn
+                depends_on: []
+              - path: database.tf
+                depends_on: []
+              - path: app.cfn
+                depends_on:
+                  - network.cfn
+                  - database.tf
+            regions:
+              - us-east-1
+              - us-west-2
+
     """
 
     SUPPORTS_VARIABLES = ['class_path', 'env_vars', 'environments',
@@ -244,7 +278,8 @@ class ModuleDefinition(ConfigComponent):  # pylint: disable=too-many-instance-at
                  env_vars=None,  # type: Optional[Dict[str, Dict[str, Any]]]
                  options=None,  # type: Optional[Dict[str, Any]]
                  tags=None,  # type: Optional[Dict[str, str]]
-                 child_modules=None  # type: Optional[List[Union[str, Dict[str, Any]]]]
+                 child_modules=None,  # type: Optional[List[Union[str, Dict[str, Any]]]]
+                 depends_on=None  # type: Optional[List[str]]
                  # pylint only complains for python2
                  ):  # pylint: disable=bad-continuation
         # type: (...) -> None
@@ -290,6 +325,9 @@ class ModuleDefinition(ConfigComponent):  # pylint: disable=too-many-instance-at
                 (``--tag <tag>...``)
             child_modules (Optional[List[Union[str, Dict[str, Any]]]]):
                 Child modules that can be executed in parallel
+            depends_on (Optional[List[str]]): Names of modules that must be
+                processed before this module. If not provided, the module
+                is processed after the module defined before it.
 
         .. rubric:: Lookup Resolution
 
@@ -312,6 +350,8 @@ class ModuleDefinition(ConfigComponent):  # pylint: disable=too-many-instance-at
         +---------------------+-----------------------------------------------+
         |  ``tags``           | None                                          |
         +---------------------+-----------------------------------------------+
+        |  ``depends_on``     | None                                          |
+        +---------------------+-----------------------------------------------+
 
         References:
             - `AWS CDK`_
@@ -341,6 +381,9 @@ class ModuleDefinition(ConfigComponent):  # pylint: disable=too-many-instance-at
         self._options = Variable(name + '.options', options or {}, 'runway')
         self.tags = tags or {}
         self.child_modules = child_modules or []
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        self.depends_on = depends_on
 
     @property
     def class_path(self):
@@ -405,7 +448,8 @@ class ModuleDefinition(ConfigComponent):  # pylint: disable=too-many-instance-at
                                options=mod.pop('options', {}),
                                parameters=mod.pop('parameters', {}),
                                tags=mod.pop('tags', {}),
-                               child_modules=child_modules))
+                               child_modules=child_modules,
+                               depends_on=mod.pop('depends_on', None)))
             if mod:
                 LOGGER.warning(
                     'Invalid keys found in module %s have been ignored: %s',
@@ -511,7 +555,8 @@ class DeploymentDefinition(ConfigComponent):  # pylint: disable=too-many-instanc
                 in all provided regions in parallel (at the same time).
                 Only takes effect when the ``CI`` environment variable is set,
                 enabling non-interactive mode, as prompts will not be able
-                to be presented. If ``CI`` is not set, the regions will be
+                to be presented (or when ``RUNWAY_PARALLEL`` is set, see
+                :ref:`parallel-output`). Otherwise, the regions will be
                 processed one at a time. This can be used in tandom with
                 **parallel modules**. ``assume_role.post_deploy_env_revert``
                 will always be ``true`` when run in parallel.
@@ -1040,7 +1085,8 @@ class Config(ConfigComponent):
                  deployments,  # type: List[Dict[str, Any]]
                  tests=None,  # type: List[Dict[str, Any]]
                  ignore_git_branch=False,  # type: bool
-                 variables=None  # type: Optional[Dict[str, Any]]
+                 variables=None,  # type: Optional[Dict[str, Any]]
+                 max_concurrency=0  # type: int
                  # pylint only complains for python2
                  ):  # pylint: disable=bad-continuation
         # type: (...) -> None
@@ -1061,6 +1107,9 @@ class Config(ConfigComponent):
             variables (Optional[Dict[str, Any]]): A map that defines the
                 location of a variables file and/or the variables
                 themselves.
+            max_concurrency (int): The number of worker processes used to
+                process modules and regions at the same time. ``0`` uses the
+                number of CPUs.
 
         .. rubric:: Lookup Resolution
 
@@ -1078,6 +1127,8 @@ class Config(ConfigComponent):
         +---------------------+-----------------------------------------------+
         | ``variables``       | None                                          |
         +---------------------+-----------------------------------------------+
+        |``max_concurrency``  | None                                          |
+        +---------------------+-----------------------------------------------+
 
         References:
             - :class:`deployment<runway.config.DeploymentDefinition>`
@@ -1087,6 +1138,7 @@ class Config(ConfigComponent):
         self.deployments = DeploymentDefinition.from_list(deployments)
         self.tests = TestDefinition.from_list(tests)
         self.ignore_git_branch = ignore_git_branch
+        self.max_concurrency = int(max_concurrency or 0)
 
         variables = variables or {}
         self.variables = VariablesDefinition.load(**variables)
@@ -1107,7 +1159,9 @@ class Config(ConfigComponent):
                             config_file.pop('ignore_git_branch',
                                             config_file.pop(
                                                 'ignore-git-branch',
-                                                False)))
+                                                False)),
+                            max_concurrency=config_file.pop(
+                                'max_concurrency', 0))
 
             if config_file:
                 LOGGER.warning(
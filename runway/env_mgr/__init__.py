@@ -1,10 +1,26 @@
 """Base module for environment managers."""
+import hashlib
 import logging
 import os
 import platform
 import sys
 
+# Old pylint on py2.7 incorrectly flags these
+from six.moves.urllib.request import Request, urlopen  # noqa pylint: disable=import-error,line-too-long
+from six.moves.urllib.error import HTTPError  # noqa pylint: disable=import-error,relative-import,line-too-long
+
+from ..util import file_lock
+
+if sys.version_info[0] > 2:
+    import concurrent.futures
+
 LOGGER = logging.getLogger('runway')
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# name of the directory in a versions directory where downloads are kept
+# until they are complete
+DOWNLOADS_DIRNAME = '.downloads'
+# number of versions installed by prefetch_versions at the same time
+MAX_PREFETCH_WORKERS = 8
 
 
 def ensure_versions_dir_exists(env_path):
@@ -17,6 +33,106 @@ def ensure_versions_dir_exists(env_path):
     return versions_dir
 
 
+def version_lock(versions_dir, version):
+    """Return a lock held while a version is being installed.
+
+    The lock is held by one thread of one process at a time (other
+    processes are locked out using a lock file in the versions directory).
+
+    Args:
+        versions_dir (str): Versions directory.
+        version (str): Version being installed.
+
+    """
+    return file_lock(os.path.join(versions_dir, '.%s.lock' % version))
+
+
+def download_file(url, path, hash_name):
+    """Download a file, calculating its hash as it's written.
+
+    The file is written to ``path`` with a ``.part`` suffix until it is
+    complete. A partial file left by an interrupted download is resumed
+    when the server supports range requests.
+
+    Args:
+        url (str): URL of the file.
+        path (str): Where the file is saved.
+        hash_name (str): Name of the hash algorithm (e.g. ``sha256``).
+
+    Returns:
+        str: Hex digest of the file.
+
+    """
+    part_path = path + '.part'
+    file_hash = hashlib.new(hash_name)
+    offset = 0
+    if os.path.isfile(part_path):
+        with open(part_path, 'rb') as stream:
+            for chunk in iter(lambda: stream.read(DOWNLOAD_CHUNK_SIZE), b''):
+                file_hash.update(chunk)
+                offset += len(chunk)
+    request = Request(url)
+    if offset:
+        LOGGER.debug('Resuming download of %s at byte %d', url, offset)
+        request.add_header('Range', 'bytes=%d-' % offset)
+    try:
+        response = urlopen(request)
+    except HTTPError as exc:
+        if not offset or exc.code != 416:
+            raise
+        response = None  # the partial file is already complete
+    if response:
+        try:
+            if offset and response.getcode() != 206:
+                file_hash = hashlib.new(hash_name)  # starting over
+                offset = 0
+            with open(part_path, 'ab' if offset else 'wb') as stream:
+                for chunk in iter(lambda: response.read(DOWNLOAD_CHUNK_SIZE),
+                                  b''):
+                    file_hash.update(chunk)
+                    stream.write(chunk)
+        finally:
+            response.close()
+    if os.path.isfile(path):
+        os.remove(path)
+    os.rename(part_path, path)
+    return file_hash.hexdigest()
+
+
+def prefetch_versions(installs):
+    """Install versions of tools in parallel.
+
+    Versions are installed concurrently on python 3 (up to
+    ``MAX_PREFETCH_WORKERS`` at a time) and one at a time on python 2.
+    Errors are ignored here so they are raised when the version is
+    installed by the module that uses it instead.
+
+    Args:
+        installs (List[Tuple[EnvManager, Optional[str]]]): Environment
+            manager & version requested (``None`` to use the version file
+            in the path of the manager) for each install.
+
+    """
+    def _install(env_manager, version):
+        """Install one version."""
+        try:
+            env_manager.install(version)
+        except (Exception, SystemExit):  # noqa pylint: disable=broad-except
+            LOGGER.debug('Unable to prefetch %s version for %s',
+                         env_manager.__class__.__name__, env_manager.path,
+                         exc_info=True)
+
+    if sys.version_info[0] > 2 and len(installs) > 1:
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=MAX_PREFETCH_WORKERS
+        ) as executor:
+            for env_manager, version in installs:
+                executor.submit(_install, env_manager, version)
+    else:
+        for env_manager, version in installs:
+            _install(env_manager, version)
+
+
 def handle_bin_download_error(exc, name):
     """Give user info about their failed download."""
     if sys.version_info[0] == 2:
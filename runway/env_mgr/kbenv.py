@@ -7,11 +7,13 @@ import sys
 import tempfile
 
 # Old pylint on py2.7 incorrectly flags these
-from six.moves.urllib.request import urlretrieve  # noqa pylint: disable=import-error,line-too-long
+from six.moves.urllib.request import urlopen  # noqa pylint: disable=import-error,line-too-long
 from six.moves.urllib.error import URLError  # noqa pylint: disable=import-error,relative-import,line-too-long
 
-from . import EnvManager, ensure_versions_dir_exists, handle_bin_download_error
-from ..util import md5sum
+from . import (
+    DOWNLOADS_DIRNAME, EnvManager, download_file, ensure_versions_dir_exists,
+    handle_bin_download_error, version_lock
+)
 
 LOGGER = logging.getLogger('runway')
 KB_VERSION_FILENAME = '.kubectl-version'
@@ -39,35 +41,41 @@ def download_kb_release(version,  # noqa pylint: disable=too-many-locals,too-man
         else:
             kb_platform = 'linux'
 
-    download_dir = tempfile.mkdtemp()
+    download_dir = os.path.join(versions_dir, DOWNLOADS_DIRNAME)
+    if not os.path.isdir(download_dir):
+        os.mkdir(download_dir)
     filename = 'kubectl.exe' if kb_platform == 'windows' else 'kubectl'
     kb_url = "https://storage.googleapis.com/kubernetes-release/release/%s/bin/%s/%s" % (version, kb_platform, arch)  # noqa pylint: disable=line-too-long
+    download_path = os.path.join(download_dir,
+                                 '%s-%s-%s-%s' % (version, kb_platform, arch,
+                                                  filename))
 
     try:
-        for i in [filename, filename + '.md5']:
-            urlretrieve(kb_url + '/' + i,
-                        os.path.join(download_dir, i))
+        kb_hash = urlopen(kb_url + '/' + filename + '.md5').read().decode()
+        # the hash is calculated while the file is downloaded
+        file_hash = download_file(kb_url + '/' + filename, download_path,
+                                  'md5')
     # IOError in py2; URLError in 3+
     except (IOError, URLError) as exc:
         handle_bin_download_error(exc, 'kubectl')
 
-    with open(os.path.join(download_dir, filename + '.md5'), 'r') as stream:
-        kb_hash = stream.read().rstrip('\n')
-
-    if kb_hash != md5sum(os.path.join(download_dir, filename)):
+    kb_hash = kb_hash.rstrip('\n')
+    if kb_hash != file_hash:
+        os.remove(download_path)
         LOGGER.error("Downloaded kubectl %s does not match md5 %s",
                      filename, kb_hash)
         sys.exit(1)
 
-    os.mkdir(version_dir)
-    shutil.move(os.path.join(download_dir, filename),
-                os.path.join(version_dir, filename))
-    shutil.rmtree(download_dir)
+    # moved next to the version directory and renamed once complete
+    install_dir = tempfile.mkdtemp(prefix='.%s-' % version, dir=versions_dir)
+    shutil.move(download_path, os.path.join(install_dir, filename))
     os.chmod(  # ensure it is executable
-        os.path.join(version_dir, filename),
-        os.stat(os.path.join(version_dir,
+        os.path.join(install_dir, filename),
+        os.stat(os.path.join(install_dir,
                              filename)).st_mode | 0o0111
     )
+    os.chmod(install_dir, 0o755)
+    os.rename(install_dir, version_dir)
 
 
 def get_version_requested(path):
@@ -105,20 +113,22 @@ class KBEnvManager(EnvManager):  # pylint: disable=too-few-public-methods
         if not version_requested.startswith('v'):
             version_requested = 'v' + version_requested
 
-        # Return early (i.e before reaching out to the internet) if the
-        # matching version is already installed
-        if os.path.isdir(os.path.join(versions_dir,
-                                      version_requested)):
-            LOGGER.info("kubectl version %s already installed; using "
-                        "it...", version_requested)
-            return os.path.join(versions_dir,
-                                version_requested,
-                                'kubectl') + self.command_suffix
-
-        LOGGER.info("Downloading and using kubectl version %s ...",
-                    version_requested)
-        download_kb_release(version_requested, versions_dir)
-        LOGGER.info("Downloaded kubectl %s successfully", version_requested)
+        with version_lock(versions_dir, version_requested):
+            # Return early (i.e before reaching out to the internet) if the
+            # matching version is already installed
+            if os.path.isdir(os.path.join(versions_dir,
+                                          version_requested)):
+                LOGGER.info("kubectl version %s already installed; using "
+                            "it...", version_requested)
+                return os.path.join(versions_dir,
+                                    version_requested,
+                                    'kubectl') + self.command_suffix
+
+            LOGGER.info("Downloading and using kubectl version %s ...",
+                        version_requested)
+            download_kb_release(version_requested, versions_dir)
+            LOGGER.info("Downloaded kubectl %s successfully",
+                        version_requested)
         return os.path.join(versions_dir,
                             version_requested,
                             'kubectl') + self.command_suffix
@@ -6,9 +6,10 @@ import logging
 import os
 import platform
 import re
-import shutil
 import sys
 import tempfile
+import threading
+import time
 import zipfile
 
 import hcl
@@ -17,11 +18,21 @@ import requests
 from six.moves.urllib.request import urlretrieve  # noqa pylint: disable=import-error,line-too-long
 from six.moves.urllib.error import URLError  # noqa pylint: disable=import-error,relative-import,line-too-long
 
-from . import EnvManager, ensure_versions_dir_exists, handle_bin_download_error
-from ..util import get_hash_for_filename, sha256sum
+from . import (
+    DOWNLOADS_DIRNAME, EnvManager, download_file, ensure_versions_dir_exists,
+    handle_bin_download_error, version_lock
+)
+from ..util import OFFLINE_ENV_VAR, get_hash_for_filename, is_offline
 
 LOGGER = logging.getLogger('runway')
 TF_VERSION_FILENAME = '.terraform-version'
+# number of seconds the list of Terraform releases is reused for
+TF_RELEASES_TTL_ENV_VAR = 'RUNWAY_TF_RELEASES_TTL'
+TF_RELEASES_DEFAULT_TTL = 3600
+TF_RELEASES_CACHE_FILENAME = 'releases.json'
+# required_version of modules keyed by path; see get_required_version
+REQUIRED_VERSIONS_CACHE_FILENAME = 'required_versions.json'
+CACHE_LOCK = threading.Lock()
 
 
 # Branch and local variable count will go down when py2 support is dropped
@@ -49,48 +60,139 @@ def download_tf_release(version,  # noqa pylint: disable=too-many-locals,too-man
         else:
             tfver_os = "linux_%s" % arch
 
-    download_dir = tempfile.mkdtemp()
+    download_dir = os.path.join(versions_dir, DOWNLOADS_DIRNAME)
+    if not os.path.isdir(download_dir):
+        os.mkdir(download_dir)
     filename = "terraform_%s_%s.zip" % (version, tfver_os)
     shasums_name = "terraform_%s_SHA256SUMS" % version
     tf_url = "https://releases.hashicorp.com/terraform/" + version
 
     try:
-        for i in [filename, shasums_name]:
-            urlretrieve(tf_url + '/' + i,
-                        os.path.join(download_dir, i))
+        urlretrieve(tf_url + '/' + shasums_name,
+                    os.path.join(download_dir, shasums_name))
+        # the hash is calculated while the archive is downloaded
+        file_hash = download_file(tf_url + '/' + filename,
+                                  os.path.join(download_dir, filename),
+                                  'sha256')
     # IOError in py2; URLError in 3+
     except (IOError, URLError) as exc:
         handle_bin_download_error(exc, 'Terraform')
 
     tf_hash = get_hash_for_filename(filename, os.path.join(download_dir,
                                                            shasums_name))
-    if tf_hash != sha256sum(os.path.join(download_dir, filename)):
+    os.remove(os.path.join(download_dir, shasums_name))
+    if tf_hash != file_hash:
+        os.remove(os.path.join(download_dir, filename))
         LOGGER.error("Downloaded Terraform %s does not match sha256 %s",
                      filename, tf_hash)
         sys.exit(1)
 
+    # extracted next to the version directory and renamed once complete
+    extract_dir = tempfile.mkdtemp(prefix='.%s-' % version, dir=versions_dir)
     tf_zipfile = zipfile.ZipFile(os.path.join(download_dir, filename))
-    os.mkdir(version_dir)
-    tf_zipfile.extractall(version_dir)
+    tf_zipfile.extractall(extract_dir)
     tf_zipfile.close()
-    shutil.rmtree(download_dir)
+    os.remove(os.path.join(download_dir, filename))
     os.chmod(  # ensure it is executable
-        os.path.join(version_dir,
+        os.path.join(extract_dir,
                      'terraform' + command_suffix),
-        os.stat(os.path.join(version_dir,
+        os.stat(os.path.join(extract_dir,
                              'terraform' + command_suffix)).st_mode | 0o0111
     )
+    os.chmod(extract_dir, 0o755)
+    os.rename(extract_dir, version_dir)
 
 
-def get_available_tf_versions(include_prerelease=False):
-    """Return available Terraform versions."""
-    tf_releases = json.loads(
-        requests.get('https://releases.hashicorp.com/index.json').text
-    )['terraform']
+def _read_cache(path):
+    """Read a JSON cache file."""
+    try:
+        with open(path, 'r') as stream:
+            return json.load(stream)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def _write_cache(path, data):
+    """Replace a JSON cache file with new data."""
+    try:
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(tmp_fd, 'w') as stream:
+            json.dump(data, stream)
+        if os.path.isfile(path):
+            os.remove(path)
+        os.rename(tmp_path, path)
+    except (IOError, OSError):
+        LOGGER.debug('unable to write cache file %s', path, exc_info=True)
+
+
+def get_releases_ttl():
+    """Get the number of seconds the list of releases is reused for."""
+    try:
+        return int(os.environ.get(TF_RELEASES_TTL_ENV_VAR,
+                                  TF_RELEASES_DEFAULT_TTL))
+    except ValueError:
+        LOGGER.warning('%s must be an integer; ignoring value "%s"',
+                       TF_RELEASES_TTL_ENV_VAR,
+                       os.environ[TF_RELEASES_TTL_ENV_VAR])
+        return TF_RELEASES_DEFAULT_TTL
+
+
+def get_tf_releases(cache_dir=None):
+    """Return all Terraform versions released (newest first).
+
+    When ``cache_dir`` is provided, the list is saved to it and reused for
+    the number of seconds set by the ``RUNWAY_TF_RELEASES_TTL`` environment
+    variable (defaults to an hour). The cached list is used regardless of
+    its age when ``RUNWAY_OFFLINE`` is set or the releases site can't be
+    reached.
+
+    Args:
+        cache_dir (Optional[str]): Directory where the list is cached.
+
+    Returns:
+        List[str]: Terraform versions.
+
+    """
+    cache_path = os.path.join(cache_dir, TF_RELEASES_CACHE_FILENAME) \
+        if cache_dir else None
+    cached = _read_cache(cache_path) if cache_path else {}
+    if cached.get('versions'):
+        if is_offline():
+            LOGGER.debug('Offline; using cached list of Terraform releases')
+            return cached['versions']
+        if time.time() - cached.get('time', 0) < get_releases_ttl():
+            LOGGER.debug('Using cached list of Terraform releases')
+            return cached['versions']
+    elif is_offline():
+        LOGGER.error('The list of Terraform releases has not been cached '
+                     'and %s is set', OFFLINE_ENV_VAR)
+        sys.exit(1)
+
+    try:
+        tf_releases = json.loads(
+            requests.get('https://releases.hashicorp.com/index.json').text
+        )['terraform']
+    except (requests.exceptions.RequestException, KeyError, ValueError):
+        if not cached.get('versions'):
+            raise
+        LOGGER.warning('Unable to get the list of Terraform releases; '
+                       'using the list cached %d seconds ago',
+                       time.time() - cached.get('time', 0))
+        return cached['versions']
     tf_versions = sorted([k  # descending
                           for k, _v in tf_releases['versions'].items()],
                          key=LooseVersion,
                          reverse=True)
+    if cache_path:
+        with CACHE_LOCK:
+            _write_cache(cache_path, {'time': time.time(),
+                                      'versions': tf_versions})
+    return tf_versions
+
+
+def get_available_tf_versions(include_prerelease=False, cache_dir=None):
+    """Return available Terraform versions."""
+    tf_versions = get_tf_releases(cache_dir)
     if include_prerelease:
         return tf_versions
     return [i for i in tf_versions if '-' not in i]
@@ -101,10 +203,34 @@ def get_latest_tf_version(include_prerelease=False):
     return get_available_tf_versions(include_prerelease)[0]
 
 
-def find_min_required(path):
-    """Inspect terraform files and find minimum version."""
+def get_required_version(path, cache_dir=None):
+    """Return the ``required_version`` of a module's tf files.
+
+    When ``cache_dir`` is provided, the result is cached by the path of the
+    module & the mtime/size of each tf file so files are only parsed again
+    after they change.
+
+    Args:
+        path (str): Path to the module.
+        cache_dir (Optional[str]): Directory where the result is cached.
+
+    Returns:
+        str: Version constraint. Empty when none was found.
+
+    """
+    filenames = glob.glob(os.path.join(path, '*.tf'))
+    stats = [[os.path.basename(i), os.stat(i).st_mtime, os.stat(i).st_size]
+             for i in filenames]
+    cache_path = os.path.join(cache_dir, REQUIRED_VERSIONS_CACHE_FILENAME) \
+        if cache_dir else None
+    key = os.path.realpath(path)
+    if cache_path:
+        cached = _read_cache(cache_path).get(key)
+        if cached and cached['files'] == stats:
+            return cached['required_version']
+
     found_min_required = ''
-    for filename in glob.glob(os.path.join(path, '*.tf')):
+    for filename in filenames:
         with open(filename, 'r') as stream:
             tf_config = hcl.load(stream)
             if tf_config.get('terraform', {}).get('required_version'):
@@ -112,6 +238,19 @@ def find_min_required(path):
                                                    {}).get('required_version')
                 break
 
+    if cache_path:
+        with CACHE_LOCK:
+            data = _read_cache(cache_path)
+            data[key] = {'files': stats,
+                         'required_version': found_min_required}
+            _write_cache(cache_path, data)
+    return found_min_required
+
+
+def find_min_required(path, cache_dir=None):
+    """Inspect terraform files and find minimum version."""
+    found_min_required = get_required_version(path, cache_dir)
+
     if found_min_required:
         if re.match(r'^!=.+', found_min_required):
             LOGGER.error('Min required Terraform version is a negation (%s) '
@@ -164,7 +303,7 @@ class TFEnvManager(EnvManager):  # pylint: disable=too-few-public-methods
 
         if re.match(r'^min-required$', version_requested):
             LOGGER.debug('tfenv: detecting minimal required version')
-            version_requested = find_min_required(self.path)
+            version_requested = find_min_required(self.path, self.env_dir)
 
         if re.match(r'^latest:.*$', version_requested):
             regex = re.search(r'latest:(.*)', version_requested).group(1)
@@ -188,27 +327,28 @@ class TFEnvManager(EnvManager):  # pylint: disable=too-few-public-methods
         try:
             version = next(i
                            for i in get_available_tf_versions(
-                               include_prerelease_versions)
+                               include_prerelease_versions, self.env_dir)
                            if re.match(regex, i))
         except StopIteration:
             LOGGER.error("Unable to find a Terraform version matching regex: %s",
                          regex)
             sys.exit(1)
 
-        # Now that a version has been selected, skip downloading if it's
-        # already been downloaded
-        if os.path.isdir(os.path.join(versions_dir,
-                                      version)):
-            LOGGER.info("Terraform version %s already installed; using it...",
+        with version_lock(versions_dir, version):
+            # Now that a version has been selected, skip downloading if it's
+            # already been downloaded
+            if os.path.isdir(os.path.join(versions_dir,
+                                          version)):
+                LOGGER.info("Terraform version %s already installed; using "
+                            "it...", version)
+                return os.path.join(versions_dir,
+                                    version,
+                                    'terraform') + self.command_suffix
+
+            LOGGER.info("Downloading and using Terraform version %s ...",
                         version)
-            return os.path.join(versions_dir,
-                                version,
-                                'terraform') + self.command_suffix
-
-        LOGGER.info("Downloading and using Terraform version %s ...",
-                    version)
-        download_tf_release(version, versions_dir, self.command_suffix)
-        LOGGER.info("Downloaded Terraform %s successfully", version)
+            download_tf_release(version, versions_dir, self.command_suffix)
+            LOGGER.info("Downloaded Terraform %s successfully", version)
         return os.path.join(versions_dir,
                             version,
                             'terraform') + self.command_suffix
@@ -12,7 +12,7 @@ from ...cfngin.lookups.handlers.rxref import RxrefLookup
 from ...cfngin.session_cache import get_session
 
 from .util import get_hash_of_files
-from ...util import change_dir, run_commands
+from ...util import run_commands
 from ...s3_util import download_and_extract_to_mkdtemp, does_s3_object_exist
 
 LOGGER = logging.getLogger(__name__)
@@ -30,13 +30,16 @@ def zip_and_upload(app_dir, bucket, key, session=None):
     os.close(filedes)
     LOGGER.info("staticsite: archiving app at %s to s3://%s/%s",
                 app_dir, bucket, key)
+    top = os.path.join(app_dir, './')
     with zipfile.ZipFile(temp_file, 'w', zipfile.ZIP_DEFLATED) as filehandle:
-        with change_dir(app_dir):
-            for dirname, _subdirs, files in os.walk('./'):
-                if dirname != './':
-                    filehandle.write(dirname)
-                for filename in files:
-                    filehandle.write(os.path.join(dirname, filename))
+        for dirname, _subdirs, files in os.walk(top):
+            # archive names are relative to app_dir (e.g. ./dir/file)
+            arcdir = './' + dirname[len(top):]
+            if arcdir != './':
+                filehandle.write(dirname, arcdir)
+            for filename in files:
+                filehandle.write(os.path.join(dirname, filename),
+                                 os.path.join(arcdir, filename))
     transfer.upload_file(temp_file, bucket, key)
     os.remove(temp_file)
 
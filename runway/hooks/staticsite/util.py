@@ -6,7 +6,6 @@ import os
 
 import zgitignore
 
-from ...util import change_dir
 
 LOGGER = logging.getLogger(__name__)
 
@@ -49,18 +48,20 @@ def get_hash_of_files(root_path, directories=None):
         ignorer = get_ignorer(os.path.join(root_path, i['path']),
                               i.get('exclusions'))
 
-        with change_dir(root_path):
-            for root, dirs, files in os.walk(i['path'], topdown=True):
-                if (root != './') and ignorer.is_ignored(root, True):
-                    dirs[:] = []
-                    files[:] = []
-                else:
-                    for filename in files:
-                        filepath = os.path.join(root, filename)
-                        if not ignorer.is_ignored(filepath):
-                            files_to_hash.append(
-                                filepath[2:] if filepath.startswith('./') else filepath  # noqa
-                            )
+        top = os.path.join(root_path, i['path'])
+        for abs_root, dirs, files in os.walk(top, topdown=True):
+            # paths relative to root_path, as if walking i['path'] from there
+            root = i['path'] + abs_root[len(top):]
+            if (root != './') and ignorer.is_ignored(root, True):
+                dirs[:] = []
+                files[:] = []
+            else:
+                for filename in files:
+                    filepath = os.path.join(root, filename)
+                    if not ignorer.is_ignored(filepath):
+                        files_to_hash.append(
+                            filepath[2:] if filepath.startswith('./') else filepath  # noqa
+                        )
 
     return calculate_hash_of_files(files_to_hash, root_path)
 
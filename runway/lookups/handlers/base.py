@@ -52,7 +52,7 @@ Common Arguments
 # python2 supported pylint is unable to load this when in a venv
 from distutils.util import strtobool  # pylint: disable=E
 from typing import (TYPE_CHECKING, Any, Dict,  # noqa: F401 pylint: disable=W
-                    Tuple, Union)
+                    Set, Tuple, Union)
 
 from six import string_types
 
@@ -62,6 +62,11 @@ from ...cfngin.util import read_value_from_path
 # pylint: disable=cyclic-import
 if TYPE_CHECKING:
     from ...context import Context  # noqa: F401 pylint: disable=unused-import
+    from ...variables import VariableValue  # noqa: F401 pylint: disable=unused-import
+
+# Parsed lookup arguments keyed by the raw string; see LookupHandler._parse_args
+PARSED_ARGS_CACHE = {}  # type: Dict[str, Dict[str, str]]
+PARSED_ARGS_CACHE_SIZE = 10000
 
 
 class LookupHandler(object):
@@ -83,6 +88,20 @@ class LookupHandler(object):
         """
         raise NotImplementedError
 
+    @classmethod
+    def dependencies(cls, lookup_data):  # pylint: disable=unused-argument
+        # type: ('VariableValue') -> Set[str]
+        """Calculate any dependencies required to perform this lookup.
+
+        Args:
+            lookup_data: Parameter(s) given to this lookup.
+
+        Returns:
+            Stack names this lookup depends on.
+
+        """
+        return set()
+
     @classmethod
     def parse(cls, value):
         # type: (str) -> Tuple[str, Dict[str, str]]
@@ -120,9 +139,16 @@ class LookupHandler(object):
             Dict of parsed args.
 
         """
-        split_args = args.split(',')
-        return {key.strip(): value.strip() for key, value in
-                [arg.split('=') for arg in split_args]}
+        parsed = PARSED_ARGS_CACHE.get(args)
+        if parsed is None:
+            split_args = args.split(',')
+            parsed = {key.strip(): value.strip() for key, value in
+                      [arg.split('=') for arg in split_args]}
+            if len(PARSED_ARGS_CACHE) >= PARSED_ARGS_CACHE_SIZE:
+                PARSED_ARGS_CACHE.clear()
+            PARSED_ARGS_CACHE[args] = parsed
+        # callers are free to modify the dict they are given
+        return dict(parsed)
 
     @classmethod
     def transform(cls, value, to_type='str', **kwargs):
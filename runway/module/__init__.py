@@ -1,16 +1,28 @@
 """Runway module module."""
 
+import hashlib
+import json
 import logging
 import os
 import platform
 import subprocess
 import sys
+import threading
+from typing import Dict, Optional, Tuple  # noqa pylint: disable=unused-import
 
-from ..util import which
+from ..util import get_subprocess_output_kwargs, which
 
 LOGGER = logging.getLogger('runway')
 NPM_BIN = 'npm.cmd' if platform.system().lower() == 'windows' else 'npm'
 NPX_BIN = 'npx.cmd' if platform.system().lower() == 'windows' else 'npx'
+# written to node_modules after a successful npm ci/install
+NPM_INSTALL_STAMP_FILENAME = '.runway-npm-install.json'
+# files node_modules is installed from
+NPM_PACKAGE_FILENAMES = ['package.json', 'package-lock.json',
+                         'npm-shrinkwrap.json']
+# results of commands run to inspect node & npm; see get_npm_probe
+NPM_PROBES = {}  # type: Dict[Tuple[str, ...], Tuple[Optional[int], str]]
+NPM_PROBES_LOCK = threading.Lock()
 
 
 def format_npm_command_for_logging(command):
@@ -24,9 +36,43 @@ def format_npm_command_for_logging(command):
     return " ".join(command).replace('\'\'', '\'')
 
 
+def find_node_bin(command, path):
+    """Find the executable of a node package installed for a module.
+
+    Like ``npx``, the ``node_modules/.bin`` directory of the module and each
+    of its parent directories (e.g. where packages are hoisted) is checked.
+
+    Args:
+        command (str): Name of the executable.
+        path (str): Path to the module.
+
+    Returns:
+        Optional[str]: Path of the executable. ``None`` if it was not found.
+
+    """
+    names = [command]
+    if platform.system().lower() == 'windows':
+        names.insert(0, command + '.cmd')
+    path = os.path.abspath(path)
+    while True:
+        for name in names:
+            bin_path = os.path.join(path, 'node_modules', '.bin', name)
+            if os.path.isfile(bin_path):
+                return bin_path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
 def generate_node_command(command, command_opts, path):
     """Return node bin command list for subprocess execution."""
-    if which(NPX_BIN):
+    bin_path = find_node_bin(command, path)
+    if bin_path:
+        # Invoke the package directly, without the startup time of npx
+        LOGGER.debug("Using %s to invoke %s.", bin_path, command)
+        cmd_list = [bin_path] + command_opts
+    elif which(NPX_BIN):
         # Use npx if available (npm v5.2+)
         LOGGER.debug("Using npx to invoke %s.", command)
         if platform.system().lower() == 'windows':
@@ -51,47 +97,142 @@ def generate_node_command(command, command_opts, path):
     return cmd_list
 
 
-def run_module_command(cmd_list, env_vars, exit_on_error=True):
-    """Shell out to provisioner command."""
+def run_module_command(cmd_list, env_vars, exit_on_error=True, cwd=None):
+    """Shell out to provisioner command.
+
+    Args:
+        cmd_list (List[str]): Command to run.
+        env_vars (Dict[str, str]): Environment variables of the command.
+        exit_on_error (bool): Exit with the return code of the command if it
+            fails instead of raising an exception.
+        cwd (Optional[str]): Directory to run the command in.
+
+    """
     if exit_on_error:
         try:
-            subprocess.check_call(cmd_list, env=env_vars)
+            subprocess.check_call(cmd_list, env=env_vars, cwd=cwd,
+                                  **get_subprocess_output_kwargs())
         except subprocess.CalledProcessError as shelloutexc:
             sys.exit(shelloutexc.returncode)
     else:
-        subprocess.check_call(cmd_list, env=env_vars)
+        subprocess.check_call(cmd_list, env=env_vars, cwd=cwd,
+                              **get_subprocess_output_kwargs())
+
+
+def get_npm_probe(cmd_list):
+    """Run a command that inspects node or npm once per process.
+
+    Args:
+        cmd_list (List[str]): Command to run.
+
+    Returns:
+        Tuple[Optional[int], str]: Return code (``None`` when the command
+        was not found) & output of the command.
+
+    """
+    key = tuple(cmd_list)
+    with NPM_PROBES_LOCK:
+        if key in NPM_PROBES:
+            return NPM_PROBES[key]
+    try:
+        result = (0, subprocess.check_output(
+            cmd_list, stderr=subprocess.STDOUT
+        ).decode().strip())
+    except subprocess.CalledProcessError as exc:
+        result = (exc.returncode, '')
+    except OSError:
+        result = (None, '')
+    with NPM_PROBES_LOCK:
+        NPM_PROBES[key] = result
+    return result
 
 
 def use_npm_ci(path):
     """Return true if npm ci should be used in lieu of npm install."""
     # https://docs.npmjs.com/cli/ci#description
-    with open(os.devnull, 'w') as fnull:
-        if ((os.path.isfile(os.path.join(path,
-                                         'package-lock.json')) or
-             os.path.isfile(os.path.join(path,
-                                         'npm-shrinkwrap.json'))) and
-                subprocess.call(
-                    [NPM_BIN, 'ci', '-h'],
-                    stdout=fnull,
-                    stderr=subprocess.STDOUT) == 0):
-            return True
+    if ((os.path.isfile(os.path.join(path,
+                                     'package-lock.json')) or
+         os.path.isfile(os.path.join(path,
+                                     'npm-shrinkwrap.json'))) and
+            get_npm_probe([NPM_BIN, 'ci', '-h'])[0] == 0):
+        return True
     return False
 
 
+def get_npm_install_stamp(path, env_vars):
+    """Return what node_modules of a module is installed from.
+
+    Args:
+        path (str): Path to the module.
+        env_vars (Dict[str, str]): Environment variables of npm.
+
+    Returns:
+        Dict[str, Any]: Hash of the package & lock files, node & npm versions,
+        platform and environment variables that change what is installed.
+
+    """
+    package_hash = hashlib.sha256()
+    for name in NPM_PACKAGE_FILENAMES:
+        if os.path.isfile(os.path.join(path, name)):
+            with open(os.path.join(path, name), 'rb') as stream:
+                package_hash.update(name.encode() + b'\0' + stream.read())
+    return {
+        'package_hash': package_hash.hexdigest(),
+        'node': get_npm_probe(['node', '--version'])[1],
+        'npm': get_npm_probe([NPM_BIN, '--version'])[1],
+        'platform': [platform.system(), platform.machine()],
+        'env_vars': dict((key, env_vars.get(key))
+                         for key in ['NODE_ENV', 'npm_config_production'])
+    }
+
+
 def run_npm_install(path, options, context):
-    """Run npm install/ci."""
-    # Use npm ci if available (npm v5.7+)
+    """Run npm install/ci.
+
+    Skipped when ``node_modules`` was installed from the same package &
+    lock files by the same versions of node & npm on the same platform.
+
+    """
     if options.get('options', {}).get('skip_npm_ci'):
         LOGGER.info("Skipping npm ci or npm install on %s...",
                     os.path.basename(path))
-    elif context.env_vars.get('CI') and use_npm_ci(path):
+        return
+    stamp_path = os.path.join(path, 'node_modules',
+                              NPM_INSTALL_STAMP_FILENAME)
+    env_vars = context.env_vars
+    npm_opts = []
+    if options.get('options', {}).get('shared_npm_cache'):
+        env_vars = dict(env_vars)
+        env_vars.setdefault('npm_config_cache',
+                            os.path.join(context.env_root, '.runway_cache',
+                                         'npm'))
+        npm_opts.append('--prefer-offline')
+    try:
+        with open(stamp_path, 'r') as stream:
+            installed = json.load(stream)
+    except (IOError, OSError, ValueError):
+        installed = None
+    if installed == get_npm_install_stamp(path, env_vars):
+        LOGGER.info("Skipping npm ci or npm install on %s; node_modules "
+                    "is up to date", os.path.basename(path))
+        return
+    # Use npm ci if available (npm v5.7+)
+    if context.env_vars.get('CI') and use_npm_ci(path):
         LOGGER.info("Running npm ci on %s...",
                     os.path.basename(path))
-        subprocess.check_call([NPM_BIN, 'ci'])
+        subprocess.check_call([NPM_BIN, 'ci'] + npm_opts, cwd=path,
+                              env=env_vars,
+                              **get_subprocess_output_kwargs())
     else:
         LOGGER.info("Running npm install on %s...",
                     os.path.basename(path))
-        subprocess.check_call([NPM_BIN, 'install'])
+        subprocess.check_call([NPM_BIN, 'install'] + npm_opts, cwd=path,
+                              env=env_vars,
+                              **get_subprocess_output_kwargs())
+    if os.path.isdir(os.path.dirname(stamp_path)):
+        # npm install can update the lock file
+        with open(stamp_path, 'w') as stream:
+            json.dump(get_npm_install_stamp(path, env_vars), stream)
 
 
 def warn_on_boto_env_vars(env_vars):
@@ -105,7 +246,17 @@ def warn_on_boto_env_vars(env_vars):
 
 
 class RunwayModule(object):
-    """Base class for Runway modules."""
+    """Base class for Runway modules.
+
+    Attributes:
+        cwd_independent (bool): The module passes its path to everything it
+            runs instead of relying on the working directory. Modules that
+            do not are run from their directory, one at a time when modules
+            are processed in threads.
+
+    """
+
+    cwd_independent = False
 
     def __init__(self, context, path, options=None):
         """Initialize base class."""
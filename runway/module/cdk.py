@@ -6,11 +6,11 @@ import subprocess
 import sys
 
 from . import (
-    RunwayModule, format_npm_command_for_logging, generate_node_command,
-    run_module_command, run_npm_install, warn_on_boto_env_vars
+    RunwayModule, find_node_bin, format_npm_command_for_logging,
+    generate_node_command, run_module_command, run_npm_install, warn_on_boto_env_vars
 )
 from ..util import (
-    change_dir, run_commands, which
+    get_subprocess_output_kwargs, run_commands, which
 )
 
 LOGGER = logging.getLogger('runway')
@@ -25,6 +25,7 @@ def get_cdk_stacks(module_path, env_vars, context_opts):
             command='cdk',
             command_opts=['list'] + context_opts,
             path=module_path),
+        cwd=module_path,
         env=env_vars
     )
     if isinstance(result, bytes):  # python3 returns encoded bytes
@@ -35,6 +36,8 @@ def get_cdk_stacks(module_path, env_vars, context_opts):
 class CloudDevelopmentKit(RunwayModule):
     """CDK Runway Module."""
 
+    cwd_independent = True
+
     def run_cdk(self, command='deploy'):  # pylint: disable=too-many-branches
         """Run CDK."""
         response = {'skipped_configs': False}
@@ -52,68 +55,75 @@ class CloudDevelopmentKit(RunwayModule):
 
         if self.options['environment']:
             if os.path.isfile(os.path.join(self.path, 'package.json')):
-                with change_dir(self.path):
-                    run_npm_install(self.path, self.options, self.context)
-                    if self.options.get('options', {}).get('build_steps',
-                                                           []):
-                        LOGGER.info("Running build steps for %s...",
-                                    os.path.basename(self.path))
-                        run_commands(
-                            commands=self.options.get('options',
-                                                      {}).get('build_steps',
-                                                              []),
-                            directory=self.path,
-                            env=self.context.env_vars
+                run_npm_install(self.path, self.options, self.context)
+                if self.options.get('options', {}).get('build_steps',
+                                                       []):
+                    LOGGER.info("Running build steps for %s...",
+                                os.path.basename(self.path))
+                    run_commands(
+                        commands=self.options.get('options',
+                                                  {}).get('build_steps',
+                                                          []),
+                        directory=self.path,
+                        env=self.context.env_vars
+                    )
+                cdk_context_opts = []
+                for (key, val) in self.options['parameters'].items():
+                    cdk_context_opts.extend(['-c', "%s=%s" % (key, val)])
+                cdk_opts.extend(cdk_context_opts)
+                if command == 'diff':
+                    LOGGER.info("Running cdk %s on each stack in %s",
+                                command,
+                                os.path.basename(self.path))
+                    for i in get_cdk_stacks(self.path,
+                                            self.context.env_vars,
+                                            cdk_context_opts):
+                        subprocess.call(
+                            generate_node_command(
+                                'cdk',
+                                cdk_opts + [i],  # 'diff <stack>'
+                                self.path
+                            ),
+                            cwd=self.path,
+                            env=self.context.env_vars,
+                            **get_subprocess_output_kwargs()
                         )
-                    cdk_context_opts = []
-                    for (key, val) in self.options['parameters'].items():
-                        cdk_context_opts.extend(['-c', "%s=%s" % (key, val)])
-                    cdk_opts.extend(cdk_context_opts)
-                    if command == 'diff':
-                        LOGGER.info("Running cdk %s on each stack in %s",
-                                    command,
-                                    os.path.basename(self.path))
-                        for i in get_cdk_stacks(self.path,
-                                                self.context.env_vars,
-                                                cdk_context_opts):
-                            subprocess.call(
-                                generate_node_command(
-                                    'cdk',
-                                    cdk_opts + [i],  # 'diff <stack>'
-                                    self.path
-                                ),
-                                env=self.context.env_vars
-                            )
-                    else:
-                        # Make sure we're targeting all stacks
-                        if command in ['deploy', 'destroy']:
+                else:
+                    # Make sure we're targeting all stacks
+                    if command in ['deploy', 'destroy']:
+                        # quoted only for the shell when run through npx
+                        if find_node_bin('cdk', self.path):
+                            cdk_opts.append('*')
+                        else:
                             cdk_opts.append('"*"')
 
-                        if command == 'deploy':
-                            if 'CI' in self.context.env_vars:
-                                cdk_opts.append('--ci')
-                                cdk_opts.append('--require-approval=never')
-                            bootstrap_command = generate_node_command(
-                                'cdk',
-                                ['bootstrap'] + cdk_context_opts,
-                                self.path
-                            )
-                            LOGGER.info('Running cdk bootstrap...')
-                            run_module_command(cmd_list=bootstrap_command,
-                                               env_vars=self.context.env_vars)
-                        elif command == 'destroy' and 'CI' in self.context.env_vars:  # noqa
-                            cdk_opts.append('-f')  # Don't prompt
-                        cdk_command = generate_node_command(
+                    if command == 'deploy':
+                        if 'CI' in self.context.env_vars:
+                            cdk_opts.append('--ci')
+                            cdk_opts.append('--require-approval=never')
+                        bootstrap_command = generate_node_command(
                             'cdk',
-                            cdk_opts,
+                            ['bootstrap'] + cdk_context_opts,
                             self.path
                         )
-                        LOGGER.info("Running cdk %s on %s (\"%s\")",
-                                    command,
-                                    os.path.basename(self.path),
-                                    format_npm_command_for_logging(cdk_command))  # noqa
-                        run_module_command(cmd_list=cdk_command,
-                                           env_vars=self.context.env_vars)
+                        LOGGER.info('Running cdk bootstrap...')
+                        run_module_command(cmd_list=bootstrap_command,
+                                           env_vars=self.context.env_vars,
+                                           cwd=self.path)
+                    elif command == 'destroy' and 'CI' in self.context.env_vars:  # noqa
+                        cdk_opts.append('-f')  # Don't prompt
+                    cdk_command = generate_node_command(
+                        'cdk',
+                        cdk_opts,
+                        self.path
+                    )
+                    LOGGER.info("Running cdk %s on %s (\"%s\")",
+                                command,
+                                os.path.basename(self.path),
+                                format_npm_command_for_logging(cdk_command))  # noqa
+                    run_module_command(cmd_list=cdk_command,
+                                       env_vars=self.context.env_vars,
+                                       cwd=self.path)
             else:
                 LOGGER.info(
                     "Skipping cdk %s of %s; no \"package.json\" "
@@ -7,7 +7,11 @@ import sys
 import yaml
 
 from . import RunwayModule, run_module_command
-from ..util import change_dir
+from ..cfngin.commands import Stacker
+from ..cfngin.logger import setup_logging
+from ..cfngin.lookups.registry import CFNGIN_LOOKUP_HANDLERS
+from ..cfngin.providers.aws.default import OUTPUT_STORES, OUTPUT_STORES_LOCK
+from ..util import PROCESS_STATE_LOCK, WORKER_THREAD, change_dir
 
 LOGGER = logging.getLogger('runway')
 
@@ -66,12 +70,106 @@ def make_stacker_cmd_string(args):
             "stacker.configure(args);args.run(args)".format(args=str(args)))
 
 
+def _is_relative_to(path, directories):
+    """Check if a path is inside any of the directories."""
+    return any(path == directory or path.startswith(directory + os.sep)
+               for directory in directories)
+
+
+def run_stacker_in_process(args, env_vars, cwd=None):
+    """Run Stacker in the current process.
+
+    Mirrors the behavior of running :func:`make_stacker_cmd_string` in a child
+    process but without the cost of starting an interpreter and importing
+    boto3/troposphere for every config file. The environment, working
+    directory, ``sys.argv``, ``sys.path``, logging handlers, the level of the
+    ``runway`` logger and registered lookups are swapped out for the duration
+    of the run and restored afterwards. Stack outputs stored during the run
+    are dropped so they are not used by the next one. Modules imported
+    from paths that were added to ``sys.path`` during the run (e.g.
+    ``sys_path`` or ``package_sources`` of the config) are removed from
+    ``sys.modules`` so the next config file does not pick them up.
+
+    Since this state is shared by every thread of the process, this must not
+    be used while other threads may be running modules (e.g. from a worker
+    thread of a thread based pool) and only one thread can run Stacker
+    in-process at a time.
+
+    Args:
+        args (List[str]): Stacker command line arguments.
+        env_vars (Dict[str, str]): Environment variables to run with.
+        cwd (Optional[str]): Directory to run in.
+
+    """
+    with PROCESS_STATE_LOCK, change_dir(cwd or os.getcwd()):
+        _run_stacker_in_process(args, env_vars)
+
+
+def _run_stacker_in_process(args, env_vars):
+    """Run Stacker in the current process; see run_stacker_in_process."""
+    saved_environ = os.environ.copy()
+    saved_argv = sys.argv
+    saved_path = list(sys.path)
+    saved_modules = set(sys.modules)
+    saved_handlers = list(logging.root.handlers)
+    saved_level = logging.root.level
+    saved_runway_level = LOGGER.level
+    saved_lookups = dict(CFNGIN_LOOKUP_HANDLERS)
+    os.environ.clear()
+    os.environ.update(env_vars)
+    logging.root.handlers = []
+    try:
+        sys.argv = ['stacker'] + args
+        stacker = Stacker(setup_logging=setup_logging)
+        parsed_args = stacker.parse_args(args)
+        stacker.configure(parsed_args)
+        parsed_args.run(parsed_args)
+    except SystemExit as exc:
+        if exc.code not in (None, 0):
+            raise
+    finally:
+        added_paths = [os.path.abspath(path) for path in sys.path
+                       if path not in saved_path]
+        if added_paths:
+            for name in set(sys.modules) - saved_modules:
+                module_file = getattr(sys.modules[name], '__file__', None)
+                if module_file and _is_relative_to(
+                        os.path.abspath(module_file), added_paths):
+                    del sys.modules[name]
+        sys.path[:] = saved_path
+        sys.argv = saved_argv
+        logging.root.handlers = saved_handlers
+        logging.root.setLevel(saved_level)
+        LOGGER.setLevel(saved_runway_level)
+        CFNGIN_LOOKUP_HANDLERS.clear()
+        CFNGIN_LOOKUP_HANDLERS.update(saved_lookups)
+        with OUTPUT_STORES_LOCK:
+            OUTPUT_STORES.clear()
+        os.environ.clear()
+        os.environ.update(saved_environ)
+
+
 class CloudFormation(RunwayModule):
     """CloudFormation (Stacker) Runway Module."""
 
+    cwd_independent = True
+
     def execute_stacker_cmd(self, cmd_list):
-        """Run Stacker in child process."""
-        if getattr(sys, 'frozen', False):
+        """Run Stacker.
+
+        Stacker is run in the current process unless the ``process_isolation``
+        option is enabled for the module or it is being run by a worker
+        thread, in which case each invocation is run in a child process so
+        the environment of modules run by other threads is left untouched.
+
+        """
+        if not (self.options.get('options', {}).get('process_isolation') or
+                getattr(WORKER_THREAD, 'active', False)):
+            LOGGER.debug("Stacker command being executed in-process: %s",
+                         ' '.join(cmd_list))
+            run_stacker_in_process(cmd_list, self.context.env_vars,
+                                   self.path)
+        elif getattr(sys, 'frozen', False):
             # running in pyinstaller single-exe, so sys.executable will
             # be the all-in-one Runway binary
             executable_cmd_list = [sys.executable, 'run-stacker', '--']
@@ -82,7 +180,8 @@ class CloudFormation(RunwayModule):
             )
             run_module_command(
                 cmd_list=executable_cmd_list + cmd_list,
-                env_vars=self.context.env_vars
+                env_vars=self.context.env_vars,
+                cwd=self.path
             )
         else:
             # traditional python execution
@@ -95,7 +194,8 @@ class CloudFormation(RunwayModule):
             )
             run_module_command(
                 cmd_list=executable_cmd_list + [stacker_cmd_str],
-                env_vars=self.context.env_vars
+                env_vars=self.context.env_vars,
+                cwd=self.path
             )
 
     def run_stacker(self, command='diff'):  # pylint: disable=too-many-branches,too-many-locals
@@ -139,31 +239,47 @@ class CloudFormation(RunwayModule):
                                           self.context.env_region))  # noqa
             )
         else:
-            with change_dir(self.path):
-                # Iterate through any stacker yaml configs to deploy them in order
-                # or destroy them in reverse order
-                for _root, _dirs, files in os.walk(self.path):
-                    sorted_files = sorted(files)
-                    if command == 'destroy':
-                        sorted_files = reversed(sorted_files)
-                    for name in sorted_files:
-                        if re.match(r"runway(\..*)?\.(yml|yaml)", name) or (
-                                name.startswith('.') or
-                                name == 'docker-compose.yml'):
-                            # Hidden files (e.g. .gitlab-ci.yml), Runway configs,
-                            # and docker-compose files definitely aren't stacker
-                            # config files
-                            continue
-                        if os.path.splitext(name)[1] in ['.yaml', '.yml']:
-                            ensure_stacker_compat_config(
-                                os.path.join(self.path, name)
-                            )
-                            LOGGER.info("Running stacker %s on %s in region %s",
-                                        command,
-                                        name,
-                                        self.context.env_region)
-                            self.execute_stacker_cmd(stacker_cmd + [name])
-                    break  # only need top level files
+            # Iterate through any stacker yaml configs to deploy them in order
+            # or destroy them in reverse order
+            config_files = []
+            for _root, _dirs, files in os.walk(self.path):
+                sorted_files = sorted(files)
+                if command == 'destroy':
+                    sorted_files = reversed(sorted_files)
+                for name in sorted_files:
+                    if re.match(r"runway(\..*)?\.(yml|yaml)", name) or (
+                            name.startswith('.') or
+                            name == 'docker-compose.yml'):
+                        # Hidden files (e.g. .gitlab-ci.yml), Runway configs,
+                        # and docker-compose files definitely aren't stacker
+                        # config files
+                        continue
+                    if os.path.splitext(name)[1] in ['.yaml', '.yml']:
+                        ensure_stacker_compat_config(
+                            os.path.join(self.path, name)
+                        )
+                        config_files.append(name)
+                break  # only need top level files
+            if config_files and \
+                    self.options.get('options', {}).get('merge_configs'):
+                # Process all configs as a single plan
+                LOGGER.info("Running stacker %s on %s in region %s",
+                            command,
+                            ', '.join(config_files),
+                            self.context.env_region)
+                # options must come before the positional arguments
+                merge_cmd = stacker_cmd[:1]
+                for name in config_files[1:]:
+                    merge_cmd.extend(['--merge-config', name])
+                self.execute_stacker_cmd(merge_cmd + stacker_cmd[1:] +
+                                         [config_files[0]])
+            else:
+                for name in config_files:
+                    LOGGER.info("Running stacker %s on %s in region %s",
+                                command,
+                                name,
+                                self.context.env_region)
+                    self.execute_stacker_cmd(stacker_cmd + [name])
         return response
 
     def plan(self):
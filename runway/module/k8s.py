@@ -62,6 +62,8 @@ def generate_response(overlay_path, module_path, environment, region):
 class K8s(RunwayModule):
     """Kubectl Runway Module."""
 
+    cwd_independent = True
+
     def run_kubectl(self, command='plan'):
         """Run kubectl."""
         kustomize_config_path = os.path.join(
@@ -125,7 +127,8 @@ class K8s(RunwayModule):
             LOGGER.info('Running kubectl %s ("%s")...',
                         command,
                         ' '.join(kubectl_command))
-            run_module_command(kubectl_command, self.context.env_vars)
+            run_module_command(kubectl_command, self.context.env_vars,
+                               cwd=self.path)
         return response
 
     def plan(self):
@@ -1,6 +1,8 @@
 """Serverless module."""
 from __future__ import print_function
 
+import hashlib
+import json
 import logging
 import os
 import re
@@ -8,18 +10,30 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import yaml
 
 from runway.hooks.staticsite.util import get_hash_of_files
 from . import (
-    RunwayModule, format_npm_command_for_logging, generate_node_command,
-    run_module_command, run_npm_install, warn_on_boto_env_vars
+    NPM_PACKAGE_FILENAMES, RunwayModule, format_npm_command_for_logging,
+    generate_node_command, run_module_command, run_npm_install,
+    warn_on_boto_env_vars
 )
-from ..util import change_dir, which
+from ..util import which
 from ..s3_util import ensure_bucket_exists, does_s3_object_exist, download, upload
 
 LOGGER = logging.getLogger('runway')
 
+# service config files that `sls print` can be cached for
+SLS_CONFIG_FILENAMES = ['serverless.yml', 'serverless.yaml', 'serverless.json']
+# config written in code can read anything; `sls print` is always run for it
+SLS_SCRIPT_CONFIG_FILENAMES = ['serverless.js', 'serverless.ts']
+SLS_FILE_VARIABLE_REGEX = re.compile(r'\$\{file\(([^)]*)\)')
+SLS_ENV_VARIABLE_REGEX = re.compile(r'\$\{env:([\w.-]+)')
+# parts of the resolved config that are cached; see get_sls_config
+SLS_CONFIG_CACHE_KEYS = ['service', 'functions', 'package']
+SLS_FUNCTION_CACHE_KEYS = ['handler', 'package']
+
 
 def gen_sls_config_files(stage, region):
     """Generate possible SLS config files names."""
@@ -48,10 +62,11 @@ def get_sls_config_file(path, stage, region):
     return "config-%s.json" % stage  # fallback to generic json name
 
 
-def run_sls_remove(sls_cmd, env_vars):
+def run_sls_remove(sls_cmd, env_vars, path=None):
     """Run sls remove command."""
     sls_process = subprocess.Popen(sls_cmd,
                                    stdout=subprocess.PIPE,
+                                   cwd=path,
                                    env=env_vars)
     stdoutdata, _stderrdata = sls_process.communicate()
     sls_return = sls_process.wait()
@@ -65,24 +80,196 @@ def run_sls_remove(sls_cmd, env_vars):
 
 def run_sls_print(sls_opts, env_vars, path):
     """Run sls print command."""
-    sls_info_opts = sls_opts
+    sls_info_opts = list(sls_opts)
     sls_info_opts[0] = 'print'
     sls_info_opts.extend(['--format', 'yaml'])
     sls_info_cmd = generate_node_command(command='sls',
                                          command_opts=sls_info_opts,
                                          path=path)
     return yaml.safe_load(subprocess.check_output(sls_info_cmd,
+                                                  cwd=path,
                                                   env=env_vars))
 
 
+def get_sls_config_key(path, stage, region, env_vars):
+    """Return the key the resolved config of a service is cached with.
+
+    The key is a hash of the service config file, the files it includes
+    with ``${file(...)}`` (recursively), the stage/region config file, the
+    npm package files (which set the Serverless & plugin versions) and the
+    environment variables referenced with ``${env:...}``.
+
+    Args:
+        path (str): Path to the module.
+        stage (str): Serverless stage.
+        region (str): AWS region.
+        env_vars (Dict[str, str]): Environment variables of sls.
+
+    Returns:
+        Optional[str]: Hash of the inputs of the config. ``None`` when the
+        config can't be cached (e.g. it is written in code or an included
+        file name contains a variable).
+
+    """
+    if any(os.path.isfile(os.path.join(path, name))
+           for name in SLS_SCRIPT_CONFIG_FILENAMES):
+        return None
+    pending = [name for name in SLS_CONFIG_FILENAMES
+               if os.path.isfile(os.path.join(path, name))]
+    if not pending:
+        return None
+    pending.append(get_sls_config_file(path, stage, region))
+    files = {}
+    env_names = set()
+    while pending:
+        name = os.path.normpath(pending.pop())
+        if name in files:
+            continue
+        try:
+            with open(os.path.join(path, name), 'rb') as stream:
+                content = stream.read()
+        except (IOError, OSError):
+            files[name] = None  # missing files are part of the key too
+            continue
+        files[name] = hashlib.sha256(content).hexdigest()
+        text = content.decode('utf-8', 'replace')
+        env_names.update(SLS_ENV_VARIABLE_REGEX.findall(text))
+        for included in SLS_FILE_VARIABLE_REGEX.findall(text):
+            included = included.strip().strip('\'"')
+            if '${' in included:
+                LOGGER.debug('Not caching config of %s; the name of included '
+                             'file "%s" is a variable', path, included)
+                return None
+            pending.append(included)
+    for name in NPM_PACKAGE_FILENAMES:
+        if os.path.isfile(os.path.join(path, name)):
+            with open(os.path.join(path, name), 'rb') as stream:
+                files[name] = hashlib.sha256(stream.read()).hexdigest()
+    key_data = {
+        'path': os.path.abspath(path),
+        'stage': stage,
+        'region': region,
+        'files': files,
+        'env_vars': dict((name, env_vars.get(name))
+                         for name in sorted(env_names))
+    }
+    return hashlib.sha256(
+        json.dumps(key_data, sort_keys=True).encode()
+    ).hexdigest()
+
+
+def get_sls_config(sls_opts, context, path):
+    """Return the resolved config of a service.
+
+    The parts of the config used to hash the source of the service are
+    cached in ``.runway_cache/serverless`` of the environment root, so
+    ``sls print`` is only run when one of the inputs of the config changes
+    (see :func:`get_sls_config_key`). Values that Serverless looks up
+    remotely (e.g. ``${ssm:...}``) are not part of the key. Only the
+    ``handler`` & ``package`` of functions are cached so secrets resolved
+    into the rest of the config are not written to disk.
+
+    Args:
+        sls_opts (List[str]): Options of the sls command.
+        context (Context): Runway context object.
+        path (str): Path to the module.
+
+    Returns:
+        Dict[str, Any]: The ``service``, ``functions`` & ``package`` of the
+        resolved config.
+
+    """
+    key = get_sls_config_key(path, context.env_name, context.env_region,
+                             context.env_vars)
+    cache_path = os.path.join(
+        context.env_root, '.runway_cache', 'serverless',
+        '%s-%s-%s.json' % (hashlib.sha256(
+            os.path.abspath(path).encode()
+        ).hexdigest()[:16], context.env_name, context.env_region)
+    )
+    if key:
+        try:
+            with open(cache_path, 'r') as stream:
+                cached = json.load(stream)
+            if cached.get('key') == key:
+                LOGGER.info('Using cached config of %s (inputs unchanged '
+                            'since the last "sls print")',
+                            os.path.basename(path))
+                return cached['config']
+        except (IOError, OSError, ValueError):
+            pass
+
+    resolved = run_sls_print(sls_opts, context.env_vars, path)
+    sls_config = dict((name, resolved[name])
+                      for name in SLS_CONFIG_CACHE_KEYS if name in resolved)
+    sls_config['functions'] = dict(
+        (func_name, dict((name, func[name])
+                         for name in SLS_FUNCTION_CACHE_KEYS
+                         if name in func))
+        for func_name, func in (resolved.get('functions') or {}).items()
+    )
+    if key:
+        try:
+            if not os.path.isdir(os.path.dirname(cache_path)):
+                os.makedirs(os.path.dirname(cache_path))
+            tmp_fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(cache_path)
+            )
+            with os.fdopen(tmp_fd, 'w') as stream:
+                json.dump({'key': key, 'config': sls_config}, stream)
+            if os.path.isfile(cache_path):
+                os.remove(cache_path)
+            os.rename(tmp_path, cache_path)
+        except (IOError, OSError):
+            LOGGER.debug('unable to write cache file %s', cache_path,
+                         exc_info=True)
+    return sls_config
+
+
+def get_hashes_of_directories(path, directories):
+    """Hash the files of directories in parallel.
+
+    Args:
+        path (str): Path to the module.
+        directories (Iterable[str]): Directories relative to ``path``.
+
+    Returns:
+        Dict[str, str]: Hash of each directory.
+
+    """
+    results = {}
+
+    def _hash(directory):
+        """Hash one directory."""
+        try:
+            results[directory] = get_hash_of_files(os.path.join(path,
+                                                                directory))
+        except Exception as exc:  # pylint: disable=broad-except
+            results[directory] = exc
+
+    threads = [threading.Thread(target=_hash, args=(directory,))
+               for directory in set(directories)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for result in results.values():
+        if isinstance(result, Exception):
+            raise result
+    return results
+
+
 def get_src_hash(sls_config, path):
     """Get hash(es) of serverless source."""
     funcs = sls_config['functions']
 
     if sls_config.get('package', {}).get('individually'):
-        hashes = {key: get_hash_of_files(os.path.join(path,
-                                                      os.path.dirname(funcs[key].get('handler'))))
-                  for key in funcs.keys()}
+        func_dirs = {key: os.path.dirname(funcs[key].get('handler'))
+                     for key in funcs.keys()}
+        # functions sharing a directory are only hashed once
+        dir_hashes = get_hashes_of_directories(path, func_dirs.values())
+        hashes = {key: dir_hashes[func_dir]
+                  for key, func_dir in func_dirs.items()}
     else:
         directories = []
         for (key, value) in funcs.items():
@@ -103,7 +290,7 @@ def deploy_package(sls_opts, options, context, path): # noqa pylint: disable=too
     LOGGER.debug('Package directory: %s', package_dir)
 
     ensure_bucket_exists(bucketname, context.env_region)
-    sls_config = run_sls_print(sls_opts, context.env_vars, path)
+    sls_config = get_sls_config(sls_opts, context, path)
     hashes = get_src_hash(sls_config, path)
 
     sls_opts[0] = 'package'
@@ -118,7 +305,8 @@ def deploy_package(sls_opts, options, context, path): # noqa pylint: disable=too
                 format_npm_command_for_logging(sls_package_cmd))
 
     run_module_command(cmd_list=sls_package_cmd,
-                       env_vars=context.env_vars)
+                       env_vars=context.env_vars,
+                       cwd=path)
 
     for key in hashes.keys():
         hash_zip = hashes[key] + ".zip"
@@ -141,7 +329,8 @@ def deploy_package(sls_opts, options, context, path): # noqa pylint: disable=too
                 os.path.basename(path),
                 format_npm_command_for_logging(sls_deploy_cmd))
     run_module_command(cmd_list=sls_deploy_cmd,
-                       env_vars=context.env_vars)
+                       env_vars=context.env_vars,
+                       cwd=path)
 
     shutil.rmtree(package_dir)
 
@@ -149,6 +338,8 @@ def deploy_package(sls_opts, options, context, path): # noqa pylint: disable=too
 class Serverless(RunwayModule):
     """Serverless Runway Module."""
 
+    cwd_independent = True
+
     def run_serverless(self, command='deploy'):
         """Run Serverless."""
         response = {'skipped_configs': False}
@@ -173,35 +364,35 @@ class Serverless(RunwayModule):
                                            self.context.env_name,
                                            self.context.env_region)
 
-        sls_cmd = generate_node_command(command='sls',
-                                        command_opts=sls_opts,
-                                        path=self.path)
-
         if (
                 self.options['parameters'] or
                 os.path.isfile(os.path.join(self.path, sls_env_file))
         ):
             if os.path.isfile(os.path.join(self.path, 'package.json')):
-                with change_dir(self.path):
-                    run_npm_install(self.path, self.options, self.context)
-                    if command == 'deploy' and self.options.get('options', {}).get('promotezip', {}): # noqa pylint: disable=line-too-long
-                        deploy_package(sls_opts,
-                                       self.options,
-                                       self.context,
-                                       self.path)
-                        return response
-
-                    LOGGER.info("Running sls %s on %s (\"%s\")",
-                                command,
-                                os.path.basename(self.path),
-                                format_npm_command_for_logging(sls_cmd))
-                    if command == 'remove':
-                        # Need to account for exit code 1 on any removals after
-                        # the first
-                        run_sls_remove(sls_cmd, self.context.env_vars)
-                    else:
-                        run_module_command(cmd_list=sls_cmd,
-                                           env_vars=self.context.env_vars)
+                run_npm_install(self.path, self.options, self.context)
+                if command == 'deploy' and self.options.get('options', {}).get('promotezip', {}): # noqa pylint: disable=line-too-long
+                    deploy_package(sls_opts,
+                                   self.options,
+                                   self.context,
+                                   self.path)
+                    return response
+
+                # generated after npm install so the installed sls is used
+                sls_cmd = generate_node_command(command='sls',
+                                                command_opts=sls_opts,
+                                                path=self.path)
+                LOGGER.info("Running sls %s on %s (\"%s\")",
+                            command,
+                            os.path.basename(self.path),
+                            format_npm_command_for_logging(sls_cmd))
+                if command == 'remove':
+                    # Need to account for exit code 1 on any removals after
+                    # the first
+                    run_sls_remove(sls_cmd, self.context.env_vars, self.path)
+                else:
+                    run_module_command(cmd_list=sls_cmd,
+                                       env_vars=self.context.env_vars,
+                                       cwd=self.path)
             else:
                 LOGGER.warning(
                     "Skipping serverless %s of %s; no \"package.json\" "
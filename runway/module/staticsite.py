@@ -25,6 +25,8 @@ def ensure_valid_environment_config(module_name, config):
 class StaticSite(RunwayModule):
     """Static website Runway Module."""
 
+    cwd_independent = True
+
     def setup_website_module(self, command):
         """Create stacker configuration for website module."""
         name = self.options.get('name', self.options.get('path'))
@@ -1,23 +1,43 @@
 """Terraform module."""
 import copy
+import glob
+import hashlib
+import json
 import logging
 import os
 import re
+import shutil
 import subprocess
 import sys
+import tempfile
+from distutils.version import LooseVersion  # noqa pylint: disable=import-error,no-name-in-module
 
 import boto3
+import hcl
 from send2trash import send2trash
 import six
 
 from . import RunwayModule, run_module_command
 from ..env_mgr.tfenv import TFEnvManager
 from ..util import (
-    change_dir, extract_boto_args_from_env, find_cfn_output,
+    extract_boto_args_from_env, find_cfn_output, is_offline,
     merge_nested_environment_dicts, which
 )
 
+if sys.version_info[0] > 2:
+    import concurrent.futures
+
 FAILED_INIT_FILENAME = '.init_failed'
+INIT_STAMP_FILENAME = 'runway_stamp.json'
+# top-level blocks of a configuration that change what init/get install
+INIT_CONFIG_BLOCKS = ['module', 'provider', 'terraform']
+PLUGIN_CACHE_ENV_VAR = 'TF_PLUGIN_CACHE_DIR'
+# number of providers downloaded to the plugin cache at the same time
+MAX_PREWARM_WORKERS = 8
+# directory in .terraform linked to the shared plugin cache during init
+PLUGIN_CACHE_VIEW_DIRNAME = 'runway-plugin-cache'
+# directory in .terraform where plans saved by "runway plan" are kept
+SAVED_PLAN_DIRNAME = 'runway-plans'
 LOGGER = logging.getLogger('runway')
 
 
@@ -37,10 +57,9 @@ def create_config_backend_options(module_opts, env_name, env_vars):
             backend_opts['config']['region'] = env_vars['AWS_DEFAULT_REGION']
 
         boto_args = extract_boto_args_from_env(env_vars)
-        cfn_client = boto3.client(
+        cfn_client = boto3.Session(**boto_args).client(
             'cloudformation',
-            region_name=backend_opts['config']['region'],
-            **boto_args
+            region_name=backend_opts['config']['region']
         )
         for (key, val) in merge_nested_environment_dicts(module_opts.get('terraform_backend_cfn_outputs'),  # noqa pylint: disable=line-too-long
                                                          env_name).items():
@@ -57,10 +76,9 @@ def create_config_backend_options(module_opts, env_name, env_vars):
             backend_opts['config']['region'] = env_vars['AWS_DEFAULT_REGION']
 
         boto_args = extract_boto_args_from_env(env_vars)
-        ssm_client = boto3.client(
+        ssm_client = boto3.Session(**boto_args).client(
             'ssm',
-            region_name=backend_opts['config']['region'],
-            **boto_args
+            region_name=backend_opts['config']['region']
         )
         for (key, val) in merge_nested_environment_dicts(module_opts.get('terraform_backend_ssm_params'),  # noqa pylint: disable=line-too-long
                                                          env_name).items():
@@ -134,10 +152,24 @@ def get_workspace_tfvars_file(path, environment, region):
 
 def run_terraform_init(tf_bin,  # pylint: disable=too-many-arguments
                        module_path, backend_options, env_name, env_region,
-                       env_vars):
-    """Run Terraform init."""
+                       env_vars, plugin_cache_dir=None):
+    """Run Terraform init.
+
+    When a shared plugin cache is used, init populates a directory of links
+    to it in the ``.terraform`` directory of the module. Providers it
+    downloads are linked back into the shared cache once init succeeds so
+    inits run at the same time never write to the same directory.
+
+    """
     init_cmd = [tf_bin, 'init', '-reconfigure']
-    cmd_opts = {'env_vars': env_vars, 'exit_on_error': False}
+    cmd_opts = {'env_vars': env_vars, 'exit_on_error': False,
+                'cwd': module_path}
+    if plugin_cache_dir:
+        view_dir = os.path.join(module_path, '.terraform',
+                                PLUGIN_CACHE_VIEW_DIRNAME)
+        link_plugin_cache(plugin_cache_dir, view_dir)
+        cmd_opts['env_vars'] = dict(env_vars)
+        cmd_opts['env_vars'][PLUGIN_CACHE_ENV_VAR] = view_dir
 
     if backend_options.get('config'):
         LOGGER.info('Using provided backend values "%s"',
@@ -170,6 +202,549 @@ def run_terraform_init(tf_bin,  # pylint: disable=too-many-arguments
                                    FAILED_INIT_FILENAME), 'w') as stream:
                 stream.write('1')
         sys.exit(shelloutexc.returncode)
+    if plugin_cache_dir:
+        link_plugin_cache(view_dir, plugin_cache_dir)
+
+
+def get_plugin_cache_dir(env_root, env_vars):
+    """Return the plugin cache directory managed by Runway.
+
+    Args:
+        env_root (str): Root directory of the environment.
+        env_vars (Dict[str, str]): Environment variables.
+
+    Returns:
+        Optional[str]: ``None`` when ``TF_PLUGIN_CACHE_DIR`` is set; it's
+        left for Terraform to use as is (an empty value disables caching).
+
+    """
+    if PLUGIN_CACHE_ENV_VAR in env_vars:
+        return None
+    return os.path.join(env_root, '.runway_cache', 'terraform_plugins')
+
+
+def link_plugin_cache(source, target):
+    """Link plugin files of one cache directory into another.
+
+    Files already in ``target`` are left as they are and each file appears
+    in ``target`` at once (it's linked to a temporary name then renamed).
+    Files are copied where hard links are not supported. Hidden
+    directories (used for work in progress) are skipped.
+
+    Args:
+        source (str): Cache directory to link files from.
+        target (str): Cache directory to link files into.
+
+    """
+    if not os.path.isdir(target):
+        os.makedirs(target)
+    for root, dirs, files in os.walk(source):
+        dirs[:] = [i for i in dirs if not i.startswith('.')]
+        target_root = os.path.normpath(
+            os.path.join(target, os.path.relpath(root, source))
+        )
+        if not os.path.isdir(target_root):
+            try:
+                os.makedirs(target_root)
+            except OSError:  # created by another process
+                pass
+        for name in files:
+            target_path = os.path.join(target_root, name)
+            if os.path.exists(target_path):
+                continue
+            tmp_path = '%s.%d.tmp' % (target_path, os.getpid())
+            try:
+                os.link(os.path.join(root, name), tmp_path)
+            except (AttributeError, OSError):
+                shutil.copy2(os.path.join(root, name), tmp_path)
+            try:
+                os.rename(tmp_path, target_path)
+            except OSError:  # target exists on windows
+                os.remove(tmp_path)
+
+
+def find_tf_bin(module_path, env_root):
+    """Return the Terraform executable for a module.
+
+    Uses the version in a ``.terraform-version`` file of the module or the
+    environment (installing it if needed), falling back to the
+    ``terraform`` found in the PATH.
+
+    Args:
+        module_path (str): Path to the module.
+        env_root (str): Root directory of the environment.
+
+    Returns:
+        Optional[str]: ``None`` when Terraform is not available.
+
+    """
+    for path in [module_path, env_root]:
+        if os.path.isfile(os.path.join(path, '.terraform-version')):
+            return TFEnvManager(path).install()
+    if which('terraform'):
+        return 'terraform'
+    return None
+
+
+def get_required_providers(module_path):
+    """Return the providers used by a module and their requirements.
+
+    Args:
+        module_path (str): Path to the module.
+
+    Returns:
+        Dict[str, Any]: ``required_providers`` entry (version constraint or
+        object) of each provider by name. ``None`` when a provider doesn't
+        have any requirements.
+
+    """
+    providers = {}
+    required = {}
+    for blocks in get_tf_config_blocks(module_path).values():
+        if not isinstance(blocks, dict):
+            continue
+        for name, config in (blocks.get('provider') or {}).items():
+            if providers.get(name) is None:
+                providers[name] = config.get('version') \
+                    if isinstance(config, dict) else None
+        terraform = blocks.get('terraform')
+        if isinstance(terraform, dict):
+            required.update(terraform.get('required_providers') or {})
+    providers.update(required)
+    return providers
+
+
+def get_cached_provider_versions(cache_dir, name):
+    """Return the versions of a provider found in a plugin cache.
+
+    Both the ``<host>/<namespace>/<type>/<version>/<os_arch>`` layout of
+    Terraform >= 0.13 and the ``<os_arch>/terraform-provider-<type>_v<version>``
+    layout of older versions are supported.
+
+    Args:
+        cache_dir (str): Plugin cache directory.
+        name (str): Type of the provider (e.g. ``aws``).
+
+    Returns:
+        List[Optional[str]]: ``None`` for plugins without a version in their
+        name.
+
+    """
+    versions = []
+    file_pattern = re.compile(r'^terraform-provider-%s(?:_v([^_]+))?(?:_x\d+)?'
+                              r'(?:\.exe)?$' % re.escape(name))
+    for root, dirs, files in os.walk(cache_dir):
+        dirs[:] = [i for i in dirs if not i.startswith('.')]
+        if os.path.basename(root) == name and \
+                len(os.path.relpath(root, cache_dir).split(os.sep)) == 3:
+            versions.extend(dirs)
+            dirs[:] = []
+            continue
+        for filename in files:
+            match = file_pattern.match(filename)
+            if match:
+                versions.append(match.group(1))
+    return versions
+
+
+def version_matches(version, constraint):
+    """Determine if a version meets a Terraform version constraint.
+
+    Args:
+        version (Optional[str]): Version to check; ``None`` for an unknown
+            version (only meets an empty constraint).
+        constraint (Optional[str]): Comma separated version constraints
+            (e.g. ``>= 2.0, < 3.0`` or ``~> 2.1``).
+
+    Returns:
+        bool
+
+    """
+    if not constraint:
+        return True
+    if not version:
+        return False
+    version = LooseVersion(version)
+    for part in constraint.split(','):
+        match = re.match(r'^\s*(=|!=|>=|<=|>|<|~>)?\s*v?(\S+)\s*$', part)
+        if not match:
+            return False
+        operator, value = match.group(1) or '=', LooseVersion(match.group(2))
+        if operator == '~>':
+            parts = match.group(2).split('.')
+            upper = parts[:-1] if len(parts) > 1 else parts
+            upper[-1] = str(int(upper[-1]) + 1) if upper[-1].isdigit() \
+                else upper[-1]
+            if not value <= version < LooseVersion('.'.join(upper)):
+                return False
+        elif not {'=': version == value,
+                  '!=': version != value,
+                  '>=': version >= value,
+                  '<=': version <= value,
+                  '>': version > value,
+                  '<': version < value}[operator]:
+            return False
+    return True
+
+
+def is_provider_cached(cache_dir, name, spec):
+    """Determine if the plugin cache has a version of a provider for a spec.
+
+    Args:
+        cache_dir (str): Plugin cache directory.
+        name (str): Local name of the provider.
+        spec (Any): ``required_providers`` entry of the provider (version
+            constraint or object).
+
+    Returns:
+        bool
+
+    """
+    constraint = spec.get('version') if isinstance(spec, dict) else spec
+    if isinstance(spec, dict) and spec.get('source'):
+        name = spec['source'].split('/')[-1]
+    if not isinstance(constraint, (six.string_types, type(None))):
+        return False
+    return any(version_matches(version, constraint)
+               for version in get_cached_provider_versions(cache_dir, name))
+
+
+def prewarm_plugin_cache(modules, cache_dir, env_vars):
+    """Download the providers used by modules to the plugin cache.
+
+    Providers are installed in parallel on python 3 (up to
+    ``MAX_PREWARM_WORKERS`` at a time), each by ``terraform init`` of a
+    configuration that only uses that provider. Providers with a version in
+    the cache that meets their requirements are skipped, as is everything
+    when Runway is offline. Errors are ignored here so they are raised by
+    the init of the module instead.
+
+    Args:
+        modules (List[Tuple[str, str]]): Terraform executable & path of
+            each module.
+        cache_dir (str): Plugin cache directory.
+        env_vars (Dict[str, str]): Environment variables.
+
+    """
+    if is_offline():
+        LOGGER.debug('Runway is offline; not downloading Terraform '
+                     'providers to the plugin cache')
+        return
+    jobs = {}
+    for tf_bin, module_path in modules:
+        for name, spec in get_required_providers(module_path).items():
+            if is_provider_cached(cache_dir, name, spec):
+                continue
+            jobs.setdefault(
+                (tf_bin, name, json.dumps(spec, sort_keys=True)), spec
+            )
+    if not jobs:
+        return
+    env = dict((key, val) for key, val in env_vars.items()
+               if key not in ['TF_CLI_ARGS', 'TF_CLI_ARGS_init',
+                              'TF_DATA_DIR', 'TF_WORKSPACE'])
+    env['TF_IN_AUTOMATION'] = '1'
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+
+    def _warm(tf_bin, name, spec):
+        """Install one provider using a view of the cache."""
+        work_dir = tempfile.mkdtemp(prefix='.prewarm-', dir=cache_dir)
+        try:
+            config = {'provider': {name: {}}}
+            if spec:
+                config['terraform'] = {'required_providers': {name: spec}}
+            with open(os.path.join(work_dir, 'main.tf.json'), 'w') as stream:
+                json.dump(config, stream)
+            view_dir = os.path.join(work_dir, 'plugins')
+            link_plugin_cache(cache_dir, view_dir)
+            subprocess.check_output(
+                [tf_bin, 'init', '-backend=false', '-get=false',
+                 '-input=false'],
+                cwd=work_dir,
+                env=dict(env, **{PLUGIN_CACHE_ENV_VAR: view_dir}),
+                stderr=subprocess.STDOUT
+            )
+            link_plugin_cache(view_dir, cache_dir)
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.debug('Unable to download Terraform provider "%s" to '
+                         'the plugin cache', name, exc_info=True)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    LOGGER.info('Downloading %d Terraform provider(s) to the plugin '
+                'cache...', len(jobs))
+    if sys.version_info[0] > 2 and len(jobs) > 1:
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=MAX_PREWARM_WORKERS
+        ) as executor:
+            for key, spec in jobs.items():
+                executor.submit(_warm, key[0], key[1], spec)
+    else:
+        for key, spec in jobs.items():
+            _warm(key[0], key[1], spec)
+
+
+def get_file_hash(path):
+    """Return the SHA256 hash of a file or ``None`` if it does not exist."""
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'rb') as stream:
+        return hashlib.sha256(stream.read()).hexdigest()
+
+
+def get_tf_config_blocks(module_path, root=None, result=None):
+    """Return the blocks of a configuration that init & get act on.
+
+    The ``module``, ``provider`` & ``terraform`` blocks of each file are
+    returned, including those of local child modules. Files that can't be
+    parsed are represented by a hash of their content.
+
+    Args:
+        module_path (str): Path to the module.
+        root (Optional[str]): Path that the keys are relative to. Defaults
+            to ``module_path``.
+        result (Optional[Dict[str, Any]]): Blocks found so far.
+
+    Returns:
+        Dict[str, Any]: Blocks of each file by its relative path.
+
+    """
+    root = root or module_path
+    result = {} if result is None else result
+    paths = sorted(glob.glob(os.path.join(module_path, '*.tf')) +
+                   glob.glob(os.path.join(module_path, '*.tf.json')))
+    for path in paths:
+        name = os.path.relpath(path, root)
+        if name in result:
+            continue
+        try:
+            with open(path, 'r') as stream:
+                config = hcl.load(stream)
+        except Exception:  # pylint: disable=broad-except
+            result[name] = get_file_hash(path)
+            continue
+        result[name] = dict((key, config[key]) for key in INIT_CONFIG_BLOCKS
+                            if key in config)
+        modules = config.get('module', {})
+        for module in modules.values() if isinstance(modules, dict) else []:
+            source = module.get('source', '') if isinstance(module,
+                                                            dict) else ''
+            if source.startswith(('./', '../')):
+                get_tf_config_blocks(os.path.join(module_path, source),
+                                     root, result)
+    return result
+
+
+def get_init_hashes(tf_bin, module_path, backend_options):
+    """Return hashes of everything that affects terraform init & get.
+
+    Args:
+        tf_bin (str): Terraform executable.
+        module_path (str): Path to the module.
+        backend_options (Dict[str, Any]): Backend options of the module.
+
+    Returns:
+        Dict[str, str]: ``init`` hash of the executable, backend config,
+        lock file & configuration blocks, ``providers`` hash of the
+        executable, lock file & configuration blocks and ``modules`` hash
+        of the ``module`` blocks.
+
+    """
+    config = get_tf_config_blocks(module_path)
+    tf_path = os.path.realpath(which(tf_bin) or tf_bin)
+    provider_inputs = {
+        'terraform': [tf_path, os.path.getmtime(tf_path)
+                      if os.path.isfile(tf_path) else None],
+        'lock_file': get_file_hash(os.path.join(module_path,
+                                                '.terraform.lock.hcl')),
+        'config': config
+    }
+    init_inputs = dict(provider_inputs, **{
+        'backend_config': backend_options.get('config'),
+        'backend_filename': backend_options.get('filename'),
+        'backend_file': get_file_hash(
+            os.path.join(module_path, backend_options.get('filename', ''))
+        )
+    })
+    modules = dict((name, blocks.get('module') if isinstance(blocks, dict)
+                    else blocks)
+                   for name, blocks in config.items())
+    return dict(
+        (key, hashlib.sha256(json.dumps(val, sort_keys=True,
+                                        default=str).encode()).hexdigest())
+        for key, val in [('init', init_inputs), ('modules', modules),
+                         ('providers', provider_inputs)]
+    )
+
+
+def providers_changed(tf_bin, module_path, module_options, env_vars):
+    """Determine if the next init of a module may install providers.
+
+    Checked without resolving the backend config of the module (which may
+    need AWS calls); only the inputs that select providers are compared
+    with those of the last complete init.
+
+    Args:
+        tf_bin (str): Terraform executable.
+        module_path (str): Path to the module.
+        module_options (Dict[str, Any]): Options of the module.
+        env_vars (Dict[str, str]): Environment variables.
+
+    Returns:
+        bool
+
+    """
+    if module_options.get('terraform_force_init') or \
+            'TF_DATA_DIR' in env_vars:
+        return True
+    return read_init_stamp(module_path).get('providers') != \
+        get_init_hashes(tf_bin, module_path, {})['providers']
+
+
+def read_init_stamp(module_path):
+    """Return the hashes recorded by the last complete init of a module."""
+    try:
+        with open(os.path.join(module_path, '.terraform',
+                               INIT_STAMP_FILENAME), 'r') as stream:
+            return json.load(stream)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def write_init_stamp(module_path, stamp):
+    """Record the hashes of a complete init; ``None`` removes the record."""
+    path = os.path.join(module_path, '.terraform', INIT_STAMP_FILENAME)
+    if stamp is None:
+        if os.path.isfile(path):
+            os.remove(path)
+    elif os.path.isdir(os.path.dirname(path)):
+        with open(path, 'w') as stream:
+            json.dump(stamp, stream)
+
+
+def get_current_workspace(module_path):
+    """Return the workspace selected in the .terraform directory."""
+    path = os.path.join(module_path, '.terraform', 'environment')
+    if os.path.isfile(path):
+        with open(path, 'r') as stream:
+            return stream.read().strip() or 'default'
+    return 'default'
+
+
+def get_state_version(tf_bin, module_path, env_vars):
+    """Return the serial & lineage of the current state of a module.
+
+    Args:
+        tf_bin (str): Terraform executable.
+        module_path (str): Path to the module.
+        env_vars (Dict[str, str]): Environment variables.
+
+    Returns:
+        Optional[List[Any]]: Serial & lineage of the state (both ``None``
+        when there is no state yet). ``None`` when the state can't be read.
+
+    """
+    try:
+        state = subprocess.check_output([tf_bin, 'state', 'pull'],
+                                        cwd=module_path, env=env_vars)
+        state = json.loads(state.decode() or '{}')
+    except (subprocess.CalledProcessError, ValueError):
+        LOGGER.debug('Unable to read the state of %s', module_path,
+                     exc_info=True)
+        return None
+    return [state.get('serial'), state.get('lineage')]
+
+
+class SavedPlan(object):
+    """Plan of a module saved by ``runway plan`` to be applied by deploy.
+
+    A plan is saved for each environment & region of a module along with a
+    hash of everything used to create it (sources, variables & executable)
+    and the version of the state it was created from. It's only applied
+    when both are unchanged.
+
+    """
+
+    def __init__(self, module_path, env_name, env_region):
+        """Instantiate class.
+
+        Args:
+            module_path (str): Path to the module.
+            env_name (str): Name of the environment.
+            env_region (str): Region of the environment.
+
+        """
+        self.module_path = module_path
+        plan_dir = os.path.join(module_path, '.terraform', SAVED_PLAN_DIRNAME)
+        name = '%s-%s' % (env_name, env_region)
+        self.plan_path = os.path.join(plan_dir, name + '.tfplan')
+        self.metadata_path = os.path.join(plan_dir, name + '.json')
+        self.env_name = env_name
+        self.env_region = env_region
+
+    def get_key(self, tf_bin, tf_cmd, env_vars):
+        """Return a hash of everything used to create the plan.
+
+        Args:
+            tf_bin (str): Terraform executable.
+            tf_cmd (List[str]): Terraform command being run.
+            env_vars (Dict[str, str]): Environment variables.
+
+        Returns:
+            str: Hash of the executable, variables and the files of the
+            module (excluding hidden directories) & its local child modules.
+
+        """
+        paths = set(os.path.join(self.module_path, name)
+                    for name in get_tf_config_blocks(self.module_path))
+        for root, dirs, files in os.walk(self.module_path):
+            dirs[:] = [i for i in dirs if not i.startswith('.')]
+            paths.update(os.path.join(root, name) for name in files)
+        inputs = {
+            'environment': [self.env_name, self.env_region],
+            'files': dict((os.path.relpath(path, self.module_path),
+                           get_file_hash(path)) for path in paths),
+            'terraform': os.path.realpath(which(tf_bin) or tf_bin),
+            'var_files': [i for i in tf_cmd if i.startswith('-var-file')],
+            'vars': dict((key, val) for key, val in env_vars.items()
+                         if key.startswith('TF_VAR_'))
+        }
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True,
+                                         default=str).encode()).hexdigest()
+
+    def is_current(self, key, state_version):
+        """Determine if the saved plan can be applied.
+
+        Args:
+            key (str): Hash of what would be used to create the plan now.
+            state_version (Optional[List[Any]]): Current state version.
+
+        Returns:
+            bool
+
+        """
+        if state_version is None or not os.path.isfile(self.plan_path):
+            return False
+        try:
+            with open(self.metadata_path, 'r') as stream:
+                metadata = json.load(stream)
+        except (IOError, OSError, ValueError):
+            return False
+        return metadata == {'key': key, 'state': state_version}
+
+    def save(self, key, state_version):
+        """Record what the plan written by terraform was created from."""
+        if state_version is None or not os.path.isfile(self.plan_path):
+            return
+        with open(self.metadata_path, 'w') as stream:
+            json.dump({'key': key, 'state': state_version}, stream)
+
+    def remove(self):
+        """Remove the saved plan."""
+        for path in [self.metadata_path, self.plan_path]:
+            if os.path.isfile(path):
+                os.remove(path)
 
 
 def update_env_vars_with_tf_var_values(os_env_vars, tf_vars):
@@ -192,6 +767,8 @@ def update_env_vars_with_tf_var_values(os_env_vars, tf_vars):
 class Terraform(RunwayModule):
     """Terraform Runway Module."""
 
+    cwd_independent = True
+
     def run_terraform(self, command='plan'):  # noqa pylint: disable=too-many-branches,too-many-statements
         """Run Terraform."""
         response = {'skipped_configs': False}
@@ -238,14 +815,9 @@ class Terraform(RunwayModule):
             )
             if module_defined_tf_var:
                 tf_bin = TFEnvManager(self.path).install(module_defined_tf_var)
-            elif os.path.isfile(os.path.join(self.path,
-                                             '.terraform-version')):
-                tf_bin = TFEnvManager(self.path).install()
-            elif os.path.isfile(os.path.join(self.context.env_root,
-                                             '.terraform-version')):
-                tf_bin = TFEnvManager(self.context.env_root).install()
             else:
-                if not which('terraform'):
+                tf_bin = find_tf_bin(self.path, self.context.env_root)
+                if not tf_bin:
                     LOGGER.error('Terraform not available (a '
                                  '".terraform-version" file is not present '
                                  'and "terraform" not found in path). Fix '
@@ -253,14 +825,31 @@ class Terraform(RunwayModule):
                                  'to your module\'s .terraform-version file '
                                  'or installing Terraform.')
                     sys.exit(1)
-                tf_bin = 'terraform'
             tf_cmd.insert(0, tf_bin)
-            with change_dir(self.path):
-                if os.path.isfile(os.path.join(self.path, '.terraform', FAILED_INIT_FILENAME)):
-                    LOGGER.info('Previous init failed; trashing '
-                                '.terraform directory...')
-                    send2trash(os.path.join(self.path, '.terraform'))
-
+            if os.path.isfile(os.path.join(self.path, '.terraform', FAILED_INIT_FILENAME)):
+                LOGGER.info('Previous init failed; trashing '
+                            '.terraform directory...')
+                send2trash(os.path.join(self.path, '.terraform'))
+
+            # The data directory can only be trusted to match the stamp
+            # when it's in the default location
+            use_stamp = 'TF_DATA_DIR' not in env_vars
+            plugin_cache_dir = get_plugin_cache_dir(self.context.env_root,
+                                                    env_vars)
+            init_hashes = get_init_hashes(tf_bin, self.path, backend_options)
+            stamp = {}
+            if self.options.get('options', {}).get('terraform_force_init'):
+                LOGGER.debug('terraform_force_init is set; running init, '
+                             'workspace & get steps')
+            elif use_stamp:
+                stamp = read_init_stamp(self.path)
+            # removed until all steps succeed again
+            write_init_stamp(self.path, None)
+
+            if stamp.get('init') == init_hashes['init']:
+                LOGGER.info('Skipping "terraform init"; backend config, '
+                            'providers & modules are unchanged')
+            else:
                 LOGGER.info('Running "terraform init"...')
                 run_terraform_init(
                     tf_bin=tf_bin,
@@ -268,74 +857,122 @@ class Terraform(RunwayModule):
                     backend_options=backend_options,
                     env_name=self.context.env_name,
                     env_region=self.context.env_region,
-                    env_vars=env_vars
+                    env_vars=env_vars,
+                    plugin_cache_dir=plugin_cache_dir
                 )
 
+            if stamp and 'TF_WORKSPACE' not in env_vars:
+                current_tf_workspace = get_current_workspace(self.path)
+            else:
                 LOGGER.debug('Checking current Terraform workspace...')
                 current_tf_workspace = subprocess.check_output(
                     [tf_bin,
                      'workspace',
                      'show'],
+                    cwd=self.path,
                     env=env_vars
                 ).strip().decode()
-                if current_tf_workspace != self.context.env_name:
-                    LOGGER.info("Terraform workspace currently set to %s; "
-                                "switching to %s...",
-                                current_tf_workspace,
+            if current_tf_workspace != self.context.env_name:
+                LOGGER.info("Terraform workspace currently set to %s; "
+                            "switching to %s...",
+                            current_tf_workspace,
+                            self.context.env_name)
+                LOGGER.debug('Checking available Terraform '
+                             'workspaces...')
+                available_tf_envs = subprocess.check_output(
+                    [tf_bin, 'workspace', 'list'],
+                    cwd=self.path,
+                    env=env_vars
+                ).decode()
+                if re.compile("^[*\\s]\\s%s$" % self.context.env_name,
+                              re.M).search(available_tf_envs):
+                    run_module_command(
+                        cmd_list=[tf_bin, 'workspace', 'select',
+                                  self.context.env_name],
+                        env_vars=env_vars,
+                        cwd=self.path
+                    )
+                else:
+                    LOGGER.info("Terraform workspace %s not found; "
+                                "creating it...",
                                 self.context.env_name)
-                    LOGGER.debug('Checking available Terraform '
-                                 'workspaces...')
-                    available_tf_envs = subprocess.check_output(
-                        [tf_bin, 'workspace', 'list'],
-                        env=env_vars
-                    ).decode()
-                    if re.compile("^[*\\s]\\s%s$" % self.context.env_name,
-                                  re.M).search(available_tf_envs):
-                        run_module_command(
-                            cmd_list=[tf_bin, 'workspace', 'select',
-                                      self.context.env_name],
-                            env_vars=env_vars
-                        )
-                    else:
-                        LOGGER.info("Terraform workspace %s not found; "
-                                    "creating it...",
-                                    self.context.env_name)
-                        run_module_command(
-                            cmd_list=[tf_bin, 'workspace', 'new',
-                                      self.context.env_name],
-                            env_vars=env_vars
-                        )
-                    LOGGER.info('Re-running terraform init after workspace '
-                                'change...')
-                    run_terraform_init(
-                        tf_bin=tf_bin,
-                        module_path=self.path,
-                        backend_options=backend_options,
-                        env_name=self.context.env_name,
-                        env_region=self.context.env_region,
-                        env_vars=env_vars
+                    run_module_command(
+                        cmd_list=[tf_bin, 'workspace', 'new',
+                                  self.context.env_name],
+                        env_vars=env_vars,
+                        cwd=self.path
                     )
+                LOGGER.info('Re-running terraform init after workspace '
+                            'change...')
+                run_terraform_init(
+                    tf_bin=tf_bin,
+                    module_path=self.path,
+                    backend_options=backend_options,
+                    env_name=self.context.env_name,
+                    env_region=self.context.env_region,
+                    env_vars=env_vars,
+                    plugin_cache_dir=plugin_cache_dir
+                )
+            if stamp.get('modules') == init_hashes['modules']:
+                LOGGER.info('Skipping "terraform get"; module sources are '
+                            'unchanged')
+            else:
                 LOGGER.info('Executing "terraform get" to update remote '
                             'modules')
                 run_module_command(
                     cmd_list=[tf_bin, 'get', '-update=true'],
-                    env_vars=env_vars
+                    env_vars=env_vars,
+                    cwd=self.path
                 )
-                LOGGER.info("Running Terraform %s on %s (\"%s\")",
-                            command,
-                            os.path.basename(self.path),
-                            " ".join(tf_cmd))
-                if any(key.startswith('TF_VAR_') for key, _val in env_vars.items()):
-                    LOGGER.info(
-                        "With terraform variable environment variables \"%s\"",
-                        " ".join(
-                            ["%s=%s" % (key, val)
-                             for key, val in env_vars.items()
-                             if key.startswith('TF_VAR_')]
-                        )
+            if use_stamp:
+                write_init_stamp(self.path, init_hashes)
+            saved_plan = None
+            if command in ['plan', 'apply'] and \
+                    self.options.get('options', {}).get('terraform_save_plan'):
+                saved_plan = SavedPlan(self.path, self.context.env_name,
+                                       self.context.env_region)
+                plan_key = saved_plan.get_key(tf_bin, tf_cmd, env_vars)
+                if command == 'plan':
+                    saved_plan.remove()
+                    if not os.path.isdir(os.path.dirname(saved_plan.plan_path)):
+                        os.makedirs(os.path.dirname(saved_plan.plan_path))
+                    tf_cmd.append('-out=%s' % saved_plan.plan_path)
+                elif 'CI' not in self.context.env_vars:
+                    # a saved plan is applied without asking for approval
+                    LOGGER.info('Not applying the plan saved by "runway '
+                                'plan" outside of CI; running terraform '
+                                'apply for approval...')
+                    saved_plan = None
+                elif saved_plan.is_current(plan_key, get_state_version(
+                        tf_bin, self.path, env_vars)):
+                    LOGGER.info('Applying the plan saved by "runway plan"')
+                    tf_cmd = [tf_bin, 'apply', saved_plan.plan_path]
+                else:
+                    LOGGER.info('No saved plan matching the current sources, '
+                                'variables & state; planning again...')
+                    saved_plan.remove()
+                    saved_plan = None
+            LOGGER.info("Running Terraform %s on %s (\"%s\")",
+                        command,
+                        os.path.basename(self.path),
+                        " ".join(tf_cmd))
+            if any(key.startswith('TF_VAR_') for key, _val in env_vars.items()):
+                LOGGER.info(
+                    "With terraform variable environment variables \"%s\"",
+                    " ".join(
+                        ["%s=%s" % (key, val)
+                         for key, val in env_vars.items()
+                         if key.startswith('TF_VAR_')]
                     )
-                run_module_command(cmd_list=tf_cmd,
-                                   env_vars=env_vars)
+                )
+            run_module_command(cmd_list=tf_cmd,
+                               env_vars=env_vars,
+                               cwd=self.path)
+            if saved_plan and command == 'plan':
+                saved_plan.save(plan_key, get_state_version(tf_bin, self.path,
+                                                            env_vars))
+            elif saved_plan:
+                saved_plan.remove()  # applied plans can't be used again
         else:
             response['skipped_configs'] = True
             LOGGER.info("Skipping Terraform %s of %s",
@@ -1,20 +1,286 @@
 """'Git' type Path Source."""
 from __future__ import absolute_import
 # pylint: disable=unused-import
-from typing import List, Dict, Optional, Union  # noqa: F401
+from typing import Any, Callable, ContextManager, List, Dict, Optional, Tuple, Union  # noqa: F401
 
+import json
 import tempfile
 import shutil
 import subprocess
+import threading
+import time
 
 import os
 import sys
 import logging
 
+from six.moves.urllib.request import pathname2url  # pylint: disable=import-error
+
 from .source import Source
+from ..util import OFFLINE_ENV_VAR, file_lock, is_offline
 
 LOGGER = logging.getLogger('runway')
 
+# number of seconds a branch/HEAD resolved to a commit id is reused for
+GIT_REF_TTL_ENV_VAR = 'RUNWAY_GIT_REF_TTL'
+# branches/HEAD resolved during this process; keyed by (uri, ref)
+RESOLVED_REFS = {}  # type: Dict[Tuple[str, str], str]
+REF_CACHE_LOCK = threading.Lock()
+REF_CACHE_FILE_NAME = 'git_refs.json'
+
+
+def get_ref_ttl():
+    # type: () -> int
+    """Get the number of seconds a resolved ref can be reused for."""
+    try:
+        return int(os.environ.get(GIT_REF_TTL_ENV_VAR, 0))
+    except ValueError:
+        LOGGER.warning('%s must be an integer; ignoring value "%s"',
+                       GIT_REF_TTL_ENV_VAR,
+                       os.environ[GIT_REF_TTL_ENV_VAR])
+        return 0
+
+
+def _read_ref_cache(cache_dir):
+    # type: (str) -> Dict[str, Dict[str, Dict[str, Any]]]
+    """Read previously resolved refs from the cache directory."""
+    try:
+        with open(os.path.join(cache_dir, REF_CACHE_FILE_NAME)) as cache_file:
+            return json.load(cache_file)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def _write_ref_cache(cache_dir, uri, ref, commit):
+    # type: (str, str, str, str) -> None
+    """Add a resolved ref to the cache in the cache directory."""
+    with REF_CACHE_LOCK:
+        data = _read_ref_cache(cache_dir)
+        data.setdefault(uri, {})[ref] = {'commit': commit, 'time': time.time()}
+        try:
+            tmp_fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+            with os.fdopen(tmp_fd, 'w') as cache_file:
+                json.dump(data, cache_file)
+            cache_path = os.path.join(cache_dir, REF_CACHE_FILE_NAME)
+            if os.path.isfile(cache_path):
+                os.remove(cache_path)
+            os.rename(tmp_path, cache_path)
+        except (IOError, OSError):
+            LOGGER.debug('unable to write resolved git refs to %s', cache_dir,
+                         exc_info=True)
+
+
+def _resolve_ref_from_mirror(uri, ref, cache_dir):
+    # type: (str, str, str) -> Optional[str]
+    """Resolve a ref using the local mirror of a remote repository."""
+    from git import Repo
+    from git.exc import GitCommandError
+
+    mirror_path = get_mirror_path(uri, cache_dir)
+    if not os.path.isdir(mirror_path):
+        return None
+    with Repo(mirror_path) as mirror:
+        try:
+            return mirror.git.rev_parse('--verify', '--quiet',
+                                        ref + '^{commit}')
+        except GitCommandError:
+            return None
+
+
+def resolve_git_ref(uri, ref, cache_dir, ls_remote):
+    # type: (str, str, str, Callable[[str, str], Union[bytes, str]]) -> str
+    """Resolve a branch or ``HEAD`` of a remote repository to a commit id.
+
+    Refs are only resolved once per process. Resolved refs are also saved
+    to the cache directory where they are reused for the number of seconds
+    set by the ``RUNWAY_GIT_REF_TTL`` environment variable (defaults to 0).
+    When ``RUNWAY_OFFLINE`` is set, the newest cached commit id is used
+    regardless of its age and the remote is never contacted.
+
+    Args:
+        uri: Remote repository URI.
+        ref: Ref to resolve (e.g. ``refs/heads/master`` or ``HEAD``).
+        cache_dir: Cache directory (e.g. ``~/.runway_cache``).
+        ls_remote: Function used to resolve the ref from the remote.
+
+    Returns:
+        A commit id.
+
+    Raises:
+        ValueError: Offline and the ref has not been resolved before.
+
+    """
+    with REF_CACHE_LOCK:
+        if (uri, ref) in RESOLVED_REFS:
+            return RESOLVED_REFS[(uri, ref)]
+    cached = _read_ref_cache(cache_dir).get(uri, {}).get(ref)
+
+    if is_offline():
+        commit = (cached['commit'] if cached else
+                  _resolve_ref_from_mirror(uri, ref, cache_dir))
+        if not commit:
+            raise ValueError('Ref "%s" for repo %s has not been resolved '
+                             'before and %s is set.' % (ref, uri,
+                                                        OFFLINE_ENV_VAR))
+        LOGGER.debug('Offline; using cached commit id %s for ref %s of %s',
+                     commit, ref, uri)
+    elif cached and time.time() - cached['time'] < get_ref_ttl():
+        commit = cached['commit']
+        LOGGER.debug('Using cached commit id %s for ref %s of %s',
+                     commit, ref, uri)
+    else:
+        commit = ls_remote(uri, ref)
+        if isinstance(commit, bytes):
+            commit = commit.decode()
+        _write_ref_cache(cache_dir, uri, ref, commit)
+
+    with REF_CACHE_LOCK:
+        RESOLVED_REFS[(uri, ref)] = commit
+    return commit
+
+
+def _get_mirror_lock(mirror_path):
+    # type: (str) -> ContextManager[None]
+    """Get the lock held while a mirror is being updated or read from.
+
+    The lock is shared by the threads & processes of every runway run
+    using the mirror.
+
+    """
+    return file_lock(mirror_path + '.lock')
+
+
+def get_mirror_path(uri, cache_dir):
+    # type: (str, str) -> str
+    """Get the path of the bare mirror for a remote repository.
+
+    Args:
+        uri: Remote repository URI.
+        cache_dir: Cache directory (e.g. ``~/.runway_cache``).
+
+    Returns:
+        Path of the mirror within ``cache_dir``.
+
+    """
+    dir_name = uri[:-4] if uri.endswith('.git') else uri
+    for i in ['@', '/', ':', '\\']:
+        dir_name = dir_name.replace(i, '_')
+    return os.path.join(cache_dir, 'git_mirrors', dir_name + '.git')
+
+
+def _keep_mirror_objects(repo):
+    # type: (Any) -> None
+    """Stop git from removing objects of a mirror that checkouts borrow.
+
+    Checkouts list the objects of the mirror in their alternates so
+    objects that are no longer referenced by the mirror (e.g. commits of a
+    force pushed branch) must never be removed by ``git gc``.
+
+    """
+    repo.git.config('gc.auto', '0')
+    repo.git.config('gc.pruneExpire', 'never')
+
+
+def update_mirror(uri, mirror_path, ref=None):
+    # type: (str, str, Optional[str]) -> None
+    """Create a bare mirror of a remote repository or fetch new objects.
+
+    Args:
+        uri: Remote repository URI.
+        mirror_path: Path of the mirror.
+        ref: A commit id or tag. If it is already in the mirror, nothing is
+            fetched.
+
+    """
+    from git import Repo
+    from git.exc import GitCommandError
+
+    if not os.path.isdir(mirror_path):
+        LOGGER.debug('Creating mirror of repo %s at %s', uri, mirror_path)
+        tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(mirror_path))
+        try:
+            tmp_mirror_path = os.path.join(tmp_dir, 'mirror.git')
+            with Repo.clone_from(uri, tmp_mirror_path, mirror=True) as repo:
+                # allow checkouts to fetch any commit from the mirror
+                repo.git.config('uploadpack.allowAnySHA1InWant', 'true')
+                _keep_mirror_objects(repo)
+            os.rename(tmp_mirror_path, mirror_path)
+        finally:
+            shutil.rmtree(tmp_dir)
+        return
+
+    with Repo(mirror_path) as repo:
+        if ref:
+            try:
+                repo.git.rev_parse('--verify', '--quiet', ref + '^{commit}')
+                LOGGER.debug('Ref %s found in mirror %s -- bypassing fetch',
+                             ref, mirror_path)
+                return
+            except GitCommandError:
+                pass
+        LOGGER.debug('Fetching repo %s into mirror %s', uri, mirror_path)
+        _keep_mirror_objects(repo)
+        # not pruned; checkouts borrow objects of deleted branches & tags
+        repo.git.fetch('origin')
+
+
+def checkout_from_mirror(uri, ref, path, cache_dir, shallow=False,
+                         sparse_paths=None):
+    # type: (str, str, str, str, bool, Optional[List[str]]) -> None
+    """Checkout a ref of a remote repository using a shared bare mirror.
+
+    One mirror is kept per remote under ``cache_dir`` and is updated
+    incrementally so only new objects are downloaded.
+
+    Args:
+        uri: Remote repository URI.
+        ref: A commit id or tag to checkout.
+        path: Path where the repository will be checked out. Must not exist.
+        cache_dir: Cache directory (e.g. ``~/.runway_cache``).
+        shallow: Only fetch the commit being checked out instead of
+            referencing all objects of the mirror.
+        sparse_paths: Only checkout these paths relative to the root of the
+            repository.
+
+    """
+    from git import Repo
+
+    mirror_path = get_mirror_path(uri, cache_dir)
+    if not os.path.isdir(os.path.dirname(mirror_path)):
+        os.makedirs(os.path.dirname(mirror_path))
+    sparse_paths = [os.path.normpath(i).replace('\\', '/').strip('/')
+                    for i in sparse_paths or []]
+    if '.' in sparse_paths or '' in sparse_paths:
+        sparse_paths = []  # the root of the repo is required
+
+    with Repo.init(path) as repo:
+        with _get_mirror_lock(mirror_path):
+            update_mirror(uri, mirror_path, ref)
+            with Repo(mirror_path) as mirror:
+                commit = mirror.git.rev_parse(ref + '^{commit}')
+            if shallow:
+                repo.git.fetch('--depth', '1',
+                               'file://' + pathname2url(
+                                   os.path.abspath(mirror_path)),
+                               commit)
+            else:
+                # borrow objects from the mirror instead of copying them
+                with open(os.path.join(path, '.git', 'objects', 'info',
+                                       'alternates'), 'w') as alternates:
+                    alternates.write(os.path.abspath(
+                        os.path.join(mirror_path, 'objects')) + '\n')
+                repo.git.fetch(os.path.abspath(mirror_path), commit)
+        if sparse_paths:
+            repo.git.config('core.sparseCheckout', 'true')
+            info_dir = os.path.join(path, '.git', 'info')
+            if not os.path.isdir(info_dir):
+                os.makedirs(info_dir)
+            with open(os.path.join(info_dir, 'sparse-checkout'),
+                      'w') as sparse_checkout:
+                sparse_checkout.write(''.join('/%s\n' % i
+                                              for i in sparse_paths))
+        repo.git.checkout(commit)
+
 
 class Git(Source):
     """Git Path Source.
@@ -52,11 +318,20 @@ class Git(Source):
 
     def fetch(self):
         # type: () -> str
-        """Retrieve the git repository from it's remote location."""
-        from git import Repo
+        """Retrieve the git repository from it's remote location.
+
+        A bare mirror of the repository is kept in the cache directory and
+        each ref is checked out from it. The ``shallow`` option only fetches
+        the commit being checked out into the checkout and the ``sparse``
+        option only checks out ``location``.
 
-        ref = self.__determine_git_ref()  # type: str
+        """
+        ref = self.resolve_ref()  # type: str
+        sparse = self.__option_enabled('sparse')  # type: bool
         dir_name = '_'.join([self.sanitize_git_path(self.uri), ref])  # type: str
+        location = os.path.normpath(self.location).strip('/\\')  # type: str
+        if sparse and location not in ['', '.']:
+            dir_name += '_' + self.sanitize_directory_path(location)
         cached_dir_path = os.path.join(self.cache_dir, dir_name)  # type: str
         cached_path = ''  # type: str
 
@@ -64,9 +339,11 @@ class Git(Source):
             tmp_dir = tempfile.mkdtemp()
             try:
                 tmp_repo_path = os.path.join(tmp_dir, dir_name)  # type: str
-                with Repo.clone_from(self.uri, tmp_repo_path) as repo:
-                    repo.head.reference = ref  # type: str
-                    repo.head.reset(index=True, working_tree=True)
+                checkout_from_mirror(
+                    self.uri, ref, tmp_repo_path, self.cache_dir,
+                    shallow=self.__option_enabled('shallow'),
+                    sparse_paths=[self.location] if sparse else None
+                )
                 shutil.move(tmp_repo_path, self.cache_dir)
                 cached_path = os.path.join(self.cache_dir, dir_name)  # type: str
             finally:
@@ -76,6 +353,23 @@ class Git(Source):
 
         return os.path.join(cached_path, self.location)
 
+    def resolve_ref(self):
+        # type: () -> str
+        """Determine the commit id or tag to checkout."""
+        return self.__determine_git_ref()
+
+    def __option_enabled(self, name):
+        # type: (str) -> bool
+        """Determine if a boolean option is enabled.
+
+        Options parsed from a path are strings (e.g. ``shallow=true``).
+
+        """
+        value = self.options.get(name, False)
+        if isinstance(value, str):
+            return value.lower() in ['true', 'yes', '1']
+        return bool(value)
+
     def __git_ls_remote(self, ref):
         # type: (str) -> str
         """List remote repositories based on uri and ref received.
@@ -121,7 +415,10 @@ class Git(Source):
         elif self.options.get('tag'):
             ref = self.options.get('tag')  # type: str
         else:
-            ref = self.__git_ls_remote(self.__determine_git_ls_remote_ref())  # ty pe: str
+            ref = resolve_git_ref(
+                self.uri, self.__determine_git_ls_remote_ref(), self.cache_dir,
+                lambda _uri, ls_ref: self.__git_ls_remote(ls_ref)
+            )  # type: str
         if sys.version_info[0] > 2 and isinstance(ref, bytes):
             return ref.decode()
         return ref
@@ -143,3 +440,30 @@ class Git(Source):
             dir_name = domain[:-4]
 
         return cls.sanitize_directory_path(dir_name)
+
+
+def resolve_refs(sources):
+    # type: (List[Git]) -> None
+    """Resolve the refs of git sources in parallel.
+
+    Resolved refs are reused when the sources are fetched. Errors are
+    ignored here so they are raised when the source is fetched instead.
+
+    Args:
+        sources: Git sources to resolve.
+
+    """
+    def _resolve(source):
+        # type: (Git) -> None
+        try:
+            source.resolve_ref()
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.debug('Unable to resolve ref of git source %s',
+                         source.uri, exc_info=True)
+
+    threads = [threading.Thread(target=_resolve, args=(source,))
+               for source in sources]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
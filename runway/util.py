@@ -2,6 +2,7 @@
 from __future__ import print_function
 from typing import Any, Dict, Iterator, List, Optional, Union  # noqa pylint: disable=unused-import
 
+from collections import OrderedDict
 from contextlib import contextmanager
 import hashlib
 import importlib
@@ -9,20 +10,57 @@ import os
 import platform
 import re
 import stat
-from subprocess import check_call
+from subprocess import STDOUT, check_call
 import sys
+import threading
+import time
+import weakref
 import six
 
+try:
+    import fcntl
+    msvcrt = None  # pylint: disable=invalid-name
+except ImportError:  # windows
+    fcntl = None  # pylint: disable=invalid-name
+    import msvcrt  # pylint: disable=import-error
+
 EMBEDDED_LIB_PATH = os.path.join(
     os.path.dirname(os.path.abspath(__file__)),
     'embedded'
 )
 
+# Held while changing state shared by every thread of the process (e.g. the
+# working directory or os.environ)
+PROCESS_STATE_LOCK = threading.RLock()
+
+# Output stream of the task being run by the current thread; see task_output
+TASK_OUTPUT = threading.local()
+
+# Set for threads of a thread based worker pool while they run a task
+WORKER_THREAD = threading.local()
+
+# use cached data instead of contacting remote services where possible
+OFFLINE_ENV_VAR = 'RUNWAY_OFFLINE'
+
+FILE_LOCKS = {}  # type: Dict[str, threading.Lock]
+FILE_LOCKS_LOCK = threading.Lock()
+# seconds between attempts to lock a file on windows
+FILE_LOCK_RETRY_INTERVAL = 0.5
+
 
 # python2 supported pylint is unable to load six.moves correctly
 class MutableMap(six.moves.collections_abc.MutableMapping):  # pylint: disable=no-member
     """Base class for mutable map objects."""
 
+    # bookkeeping of the ``find`` index is kept in slots instead of
+    # ``__dict__`` so it isn't one of the keys of the map:
+    # _generation - incremented when the map or a map nested in it is
+    #   written to so the index can detect changes
+    # _parents - weak references to the maps this map is nested in
+    # _found_queries/_found_generation - the index & the generation it's for
+    __slots__ = ('__dict__', '__weakref__', '_generation', '_parents',
+                 '_found_queries', '_found_generation')
+
     def __init__(self, **kwargs):
         # type: (Dict[str, Any]) -> None
         """Initialize class.
@@ -42,8 +80,6 @@ class MutableMap(six.moves.collections_abc.MutableMapping):  # pylint: disable=n
                 setattr(self, key, MutableMap(**value))
             else:
                 setattr(self, key, value)
-        if kwargs:
-            self._found_queries = MutableMap()
 
     @property
     def data(self):
@@ -69,51 +105,56 @@ class MutableMap(six.moves.collections_abc.MutableMapping):  # pylint: disable=n
         for _, val in self.__dict__.items():
             if isinstance(val, MutableMap):
                 val.clear_found_cache()
-        if hasattr(self, '_found_queries'):
-            self._found_queries.clear()
+        self._found_queries = None  # pylint: disable=attribute-defined-outside-init
+
+    def _build_found_queries(self):
+        # type: () -> Dict[str, Any]
+        """Build a flat index of values keyed by their period delimited path."""
+        result = {}
+        for key, val in self.__dict__.items():
+            if key.startswith('_'):
+                continue
+            result[key] = val
+            if isinstance(val, MutableMap):
+                for nested_key, nested_val in \
+                        val._build_found_queries().items():  # pylint: disable=protected-access
+                    result[key + '.' + nested_key] = nested_val
+        return result
 
     def find(self, query, default=None, ignore_cache=False):
         # type: (str, Any, bool) -> Any
         """Find a value in the map.
 
-        Previously found queries are cached to increase search speed. The
-        cached value should only be used if values are not expected to change.
+        Queries are answered from a flat index of every nested value that is
+        built on first use and rebuilt after the map (or any other map) has
+        been written to.
 
         Args:
             query: A period delimited string that is split to search for
                 nested values
             default: The value to return if the query was unsuccessful.
-            ignore_cache: Ignore cached value.
+            ignore_cache: Rebuild the index before searching.
 
         """
-        if not ignore_cache:
-            cached_result = self._found_queries.get(query, None)
-            if cached_result:
-                return cached_result
-
-        split_query = query.split('.')
-
-        if len(split_query) == 1:
-            result = self.get(split_query[0], default)
-            if result != default:
-                self._found_queries[split_query[0]] = result
-            return result
-
-        nested_value = self.get(split_query[0])
-
-        if not nested_value:
-            return default
-
-        nested_value = nested_value.find(split_query[1])
-
-        try:
-            nested_value = self[split_query[0]].find('.'.join(split_query[1:]),
-                                                     default, ignore_cache)
-            if nested_value != default:
-                self._found_queries[query] = nested_value
-            return nested_value
-        except (AttributeError, KeyError):
-            return default
+        # pylint: disable=attribute-defined-outside-init
+        generation = getattr(self, '_generation', 0)
+        if (ignore_cache or getattr(self, '_found_queries', None) is None or
+                getattr(self, '_found_generation', None) != generation):
+            # generation is captured first so writes made while building are
+            # not missed
+            self._found_queries = self._build_found_queries()
+            self._found_generation = generation
+        if query in self._found_queries:
+            return self._found_queries[query]
+
+        # not a public attribute so fall back to ``get``
+        key, _, nested_query = query.partition('.')
+        if not nested_query:
+            return self.get(key, default)
+        nested_value = self.get(key)
+        if isinstance(nested_value, MutableMap):
+            return nested_value.find(nested_query, default, ignore_cache)
+        return default
 
     def get(self, key, default=None):
         # type: (str, Any) -> Any
@@ -135,6 +176,62 @@ class MutableMap(six.moves.collections_abc.MutableMapping):  # pylint: disable=n
 
     __nonzero__ = __bool__  # python2 compatability
 
+    def _add_parent(self, parent):
+        # type: (MutableMap) -> None
+        """Track a map this map is nested in so its index is invalidated."""
+        parents = getattr(self, '_parents', None)
+        if parents is None:
+            parents = self._parents = []  # noqa pylint: disable=attribute-defined-outside-init
+        if not any(ref() is parent for ref in parents):
+            parents.append(weakref.ref(parent))
+
+    def _changed(self):
+        # type: () -> None
+        """Invalidate the ``find`` index of this map and the maps above it."""
+        pending = [self]
+        seen = set()
+        while pending:
+            current = pending.pop()
+            if id(current) in seen:
+                continue
+            seen.add(id(current))
+            current._generation = getattr(current, '_generation', 0) + 1  # noqa pylint: disable=protected-access,attribute-defined-outside-init
+            for parent_ref in getattr(current, '_parents', None) or []:
+                parent = parent_ref()
+                if parent is not None:
+                    pending.append(parent)
+
+    def __getstate__(self):
+        # type: () -> Dict[str, Any]
+        """Pickle only the attributes, not the bookkeeping in slots."""
+        return dict(self.__dict__)
+
+    def __setstate__(self, state):
+        # type: (Dict[str, Any]) -> None
+        """Restore the references nested maps have to this map."""
+        self.__dict__.update(state)
+        for key, val in state.items():
+            if not key.startswith('_') and isinstance(val, MutableMap):
+                val._add_parent(self)  # pylint: disable=protected-access
+
+    def __setattr__(self, name, value):
+        # type: (str, Any) -> None
+        """Implement attribute assignment, invalidating ``find`` indexes."""
+        if not name.startswith('_'):
+            if isinstance(value, MutableMap):
+                value._add_parent(self)  # pylint: disable=protected-access
+            super(MutableMap, self).__setattr__(name, value)
+            self._changed()
+        else:
+            super(MutableMap, self).__setattr__(name, value)
+
+    def __delattr__(self, name):
+        # type: (str) -> None
+        """Implement attribute deletion, invalidating ``find`` indexes."""
+        super(MutableMap, self).__delattr__(name)
+        if not name.startswith('_'):
+            self._changed()
+
     def __getitem__(self, key):
         # type: (str) -> Any
         """Implement evaluation of self[key].
@@ -228,6 +325,109 @@ class MutableMap(six.moves.collections_abc.MutableMapping):  # pylint: disable=n
         return iter(self.__dict__)
 
 
+class LRUCache(object):
+    """Thread safe mapping that keeps only the most recently used items.
+
+    Used for process wide caches so they don't grow for the life of the
+    process.
+
+    """
+
+    def __init__(self, maxsize=128):
+        # type: (int) -> None
+        """Instantiate class.
+
+        Args:
+            maxsize: Number of items kept. The least recently used item is
+                removed when another is added.
+
+        """
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        # type: (Any, Any) -> Any
+        """Get an item, marking it as the most recently used."""
+        with self._lock:
+            if key not in self._data:
+                return default
+            value = self._data.pop(key)
+            self._data[key] = value
+            return value
+
+    def clear(self):
+        # type: () -> None
+        """Remove all items."""
+        with self._lock:
+            self._data.clear()
+
+    def __setitem__(self, key, value):
+        # type: (Any, Any) -> None
+        """Add an item, removing the least recently used item when full."""
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        # type: (Any) -> bool
+        """Check if an item is stored."""
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        # type: () -> int
+        """Get the number of items stored."""
+        return len(self._data)
+
+
+def _msvcrt_lock(lock_file):
+    """Lock the first byte of a file on windows, waiting as long as needed.
+
+    ``msvcrt.locking`` gives up after about 10 seconds so it is retried
+    until the lock is acquired.
+
+    """
+    lock_file.seek(0)
+    while True:
+        try:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            return
+        except (IOError, OSError):
+            time.sleep(FILE_LOCK_RETRY_INTERVAL)
+
+
+@contextmanager
+def file_lock(path):
+    # type: (str) -> Iterator[None]
+    """Hold a lock shared by every thread & process using the same path.
+
+    Threads of this process are locked out using a :class:`threading.Lock`
+    and other processes using an exclusive lock of the file.
+
+    Args:
+        path: Path of the lock file. It is created if it does not exist.
+
+    """
+    with FILE_LOCKS_LOCK:
+        lock = FILE_LOCKS.setdefault(path, threading.Lock())
+    with lock, open(path, 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            _msvcrt_lock(lock_file)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
 @contextmanager
 def change_dir(newdir):
     """Change directory.
@@ -242,6 +442,51 @@ def change_dir(newdir):
         os.chdir(prevdir)
 
 
+@contextmanager
+def task_output(stream):
+    """Send the output of the current thread's commands to a stream.
+
+    Used when tasks run in threads of the same process so that the output
+    of each one (and of the commands it runs) can be kept separate.
+
+    Args:
+        stream (Optional[IO[str]]): Stream with a file descriptor that the
+            output is written to. ``None`` uses the output of the process.
+
+    """
+    previous = getattr(TASK_OUTPUT, 'stream', None)
+    TASK_OUTPUT.stream = stream
+    try:
+        yield
+    finally:
+        TASK_OUTPUT.stream = previous
+
+
+def get_task_output():
+    """Return the output stream set for the current thread.
+
+    Returns:
+        Optional[IO[str]]: ``None`` when output is not redirected.
+
+    """
+    return getattr(TASK_OUTPUT, 'stream', None)
+
+
+def get_subprocess_output_kwargs():
+    """Return the arguments to send a subprocess' output to the task output.
+
+    Returns:
+        Dict[str, Any]: ``stdout`` & ``stderr`` arguments for
+        :mod:`subprocess` functions (empty when output is not redirected).
+
+    """
+    stream = get_task_output()
+    if stream is None:
+        return {}
+    stream.flush()
+    return {'stdout': stream, 'stderr': STDOUT}
+
+
 def ensure_file_is_executable(path):
     """Exit if file is not executable."""
     if platform.system() != 'Windows' and (
@@ -410,22 +655,29 @@ def run_commands(commands,  # type: List[Union[str, List[str], Dict[str, Union[s
         if platform.system().lower() == 'windows':
             command_list = fix_windows_command_list(command_list)
 
-        with change_dir(execution_dir):
-            failed_to_find_error = "Attempted to run \"%s\" and failed to find it (are you sure it is installed and added to your PATH?)" % command_list[0]  # noqa pylint: disable=line-too-long
-            if sys.version_info[0] < 3:
-                # Legacy exception version for python 2
-                try:
-                    check_call(command_list, env=env)
-                except OSError:
-                    print(failed_to_find_error, file=sys.stderr)
-                    sys.exit(1)
-            else:
-                try:
-                    check_call(command_list, env=env)
-                # The noqa/pylint overrides can be dropped alongside python 2
-                except FileNotFoundError:  # noqa pylint: disable=undefined-variable
-                    print(failed_to_find_error, file=sys.stderr)
-                    sys.exit(1)
+        failed_to_find_error = "Attempted to run \"%s\" and failed to find it (are you sure it is installed and added to your PATH?)" % command_list[0]  # noqa pylint: disable=line-too-long
+        if sys.version_info[0] < 3:
+            # Legacy exception version for python 2
+            try:
+                check_call(command_list, env=env, cwd=execution_dir,
+                           **get_subprocess_output_kwargs())
+            except OSError:
+                print(failed_to_find_error, file=sys.stderr)
+                sys.exit(1)
+        else:
+            try:
+                check_call(command_list, env=env, cwd=execution_dir,
+                           **get_subprocess_output_kwargs())
+            # The noqa/pylint overrides can be dropped alongside python 2
+            except FileNotFoundError:  # noqa pylint: disable=undefined-variable
+                print(failed_to_find_error, file=sys.stderr)
+                sys.exit(1)
+
+
+def is_offline():
+    # type: () -> bool
+    """Determine if remote services should not be contacted."""
+    return os.environ.get(OFFLINE_ENV_VAR, '').lower() in ['1', 'true', 'yes']
 
 
 def md5sum(filename):
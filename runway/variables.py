@@ -24,6 +24,14 @@ if TYPE_CHECKING:
 
 LOGGER = logging.getLogger('runway')
 
+TOKEN_REGEX = re.compile(r'(\$\{|\}|\s+)')
+
+# Parsed strings are cached as immutable templates keyed by the raw string and
+# variable type. A new VariableValue tree is created from the template each
+# time since the tree stores the resolved value of its lookups.
+PARSE_CACHE = {}  # type: Dict[Any, Any]
+PARSE_CACHE_SIZE = 10000
+
 
 def resolve_variables(variables, context, provider):
     """Given a list of variables, resolve all of them.
@@ -39,6 +47,32 @@ def resolve_variables(variables, context, provider):
         variable.resolve(context, provider)
 
 
+def _freeze(value):
+    # type: (Any) -> Any
+    """Convert a parsed string into an immutable template."""
+    if isinstance(value, VariableValueLookup):
+        return (VariableValueLookup, _freeze(value.lookup_name),
+                _freeze(value.lookup_data))
+    if isinstance(value, VariableValueConcatenation):
+        return (VariableValueConcatenation,
+                tuple(_freeze(item) for item in value))
+    return (VariableValueLiteral, value.value)
+
+
+def _thaw(template, variable_type):
+    # type: (Any, str) -> Any
+    """Create a new parsed value from a template created by ``_freeze``."""
+    kind = template[0]
+    if kind is VariableValueLiteral:
+        return VariableValueLiteral(template[1])
+    if kind is VariableValueConcatenation:
+        return VariableValueConcatenation([_thaw(item, variable_type)
+                                           for item in template[1]])
+    return VariableValueLookup(lookup_name=_thaw(template[1], variable_type),
+                               lookup_data=_thaw(template[2], variable_type),
+                               variable_type=variable_type)
+
+
 class Variable(object):
     """Represents a variable provided to a Runway directive."""
 
@@ -67,6 +101,17 @@ class Variable(object):
         """
         return self._value.dependencies
 
+    @property
+    def lookups(self):
+        # type: () -> List[VariableValueLookup]
+        """Lookups contained in this variable, including nested lookups.
+
+        Returns:
+            List[VariableValueLookup]: Lookups in the order they are found.
+
+        """
+        return self._value.lookups
+
     @property
     def resolved(self):
         # type: () -> bool
@@ -130,6 +175,12 @@ class VariableValue(object):
         """Stack names that this variable depends on."""
         return set()
 
+    @property
+    def lookups(self):
+        # type: () -> List[VariableValueLookup]
+        """Lookups contained in this variable value."""
+        return []
+
     @property
     def resolved(self):
         # type: () -> bool
@@ -187,48 +238,68 @@ class VariableValue(object):
             return VariableValueList.parse(input_object, variable_type)
         if isinstance(input_object, dict):
             return VariableValueDict.parse(input_object, variable_type)
-        if not isinstance(input_object, string_types):
+        if not isinstance(input_object, string_types) or \
+                '${' not in input_object:
             return VariableValueLiteral(input_object)
 
-        tokens = VariableValueConcatenation([
-            VariableValueLiteral(t)
-            for t in re.split(r'(\$\{|\}|\s+)', input_object)  # ${ or space or }
-        ])
-
-        opener = '${'
-        closer = '}'
-
-        while True:
-            last_open = None
-            next_close = None
-            for i, tok in enumerate(tokens):
-                if not isinstance(tok, VariableValueLiteral):
-                    continue
-
-                if tok.value == opener:
-                    last_open = i
-                    next_close = None
-                if (
-                        last_open is not None and
-                        tok.value == closer and
-                        next_close is None
-                ):
-                    next_close = i
-
-            if next_close is not None:
-                lookup_data = VariableValueConcatenation(
-                    tokens[(cast(int, last_open) + len(opener) + 1):next_close]
-                )
+        cache_key = (input_object, variable_type)
+        template = PARSE_CACHE.get(cache_key)
+        if template is None:
+            template = _freeze(cls._tokenize(input_object, variable_type))
+            if len(PARSE_CACHE) >= PARSE_CACHE_SIZE:
+                PARSE_CACHE.clear()
+            PARSE_CACHE[cache_key] = template
+        return _thaw(template, variable_type)
+
+    @staticmethod
+    def _tokenize(input_object, variable_type='cfngin'):
+        # type: (str, str) -> Any
+        """Parse a string containing lookups in a single pass.
+
+        Lookups are matched using a stack so nested lookups are built before
+        the lookup containing them.
+
+        Args:
+            input_object: String to parse.
+
+        """
+        tokens = TOKEN_REGEX.split(input_object)  # ${ or space or }
+
+        # an opener without a closer after it stops the parsing of any lookup
+        # that comes before it so those tokens are kept as literals.
+        start = 0
+        closers = 0
+        for index in range(len(tokens) - 1, -1, -1):
+            if tokens[index] == '}':
+                closers += 1
+            elif tokens[index] == '${':
+                if not closers:
+                    start = index + 1
+                    break
+                closers -= 1
+
+        result = [VariableValueLiteral(tok) for tok in tokens[:start]]
+        parents = []  # type: List[List[Any]]
+        current = result
+        for index in range(start, len(tokens)):
+            tok = tokens[index]
+            if tok == '${':
+                parents.append(current)
+                current = []
+            elif tok == '}' and parents:
+                # split always places a token between separators so the
+                # first token is the name; the second is the separating space
                 lookup = VariableValueLookup(
-                    lookup_name=tokens[cast(int, last_open) + 1],
-                    lookup_data=lookup_data,
+                    lookup_name=current[0],
+                    lookup_data=VariableValueConcatenation(current[2:]),
                     variable_type=variable_type
                 )
-                tokens[last_open:(next_close + 1)] = [lookup]
+                current = parents.pop()
+                current.append(lookup)
             else:
-                break
+                current.append(VariableValueLiteral(tok))
 
-        return tokens.simplified
+        return VariableValueConcatenation(result).simplified
 
     def __iter__(self):
         # type: () -> Iterable
@@ -297,6 +368,15 @@ class VariableValueList(VariableValue, list):
             deps.update(item.dependencies)
         return deps
 
+    @property
+    def lookups(self):
+        # type: () -> List[VariableValueLookup]
+        """Lookups contained in this variable value."""
+        lookups = []  # type: List[VariableValueLookup]
+        for item in self:
+            lookups.extend(item.lookups)
+        return lookups
+
     @property
     def resolved(self):
         # type: () -> bool
@@ -381,6 +461,15 @@ class VariableValueDict(VariableValue, dict):
             deps.update(item.dependencies)
         return deps
 
+    @property
+    def lookups(self):
+        # type: () -> List[VariableValueLookup]
+        """Lookups contained in this variable value."""
+        lookups = []  # type: List[VariableValueLookup]
+        for item in self.values():
+            lookups.extend(item.lookups)
+        return lookups
+
     @property
     def resolved(self):
         # type: () -> bool
@@ -465,6 +554,15 @@ class VariableValueConcatenation(VariableValue, list):
             deps.update(item.dependencies)
         return deps
 
+    @property
+    def lookups(self):
+        # type: () -> List[VariableValueLookup]
+        """Lookups contained in this variable value."""
+        lookups = []  # type: List[VariableValueLookup]
+        for item in self:
+            lookups.extend(item.lookups)
+        return lookups
+
     @property
     def resolved(self):
         # type: () -> bool
@@ -611,6 +709,12 @@ class VariableValueLookup(VariableValue):
             return self.handler.dependencies(self.lookup_data)
         return set()
 
+    @property
+    def lookups(self):
+        # type: () -> List[VariableValueLookup]
+        """This lookup followed by any lookups nested in its data."""
+        return [self] + self.lookup_data.lookups
+
     @property
     def resolved(self):
         # type: () -> bool
@@ -151,3 +151,29 @@ class TestBaseAction(unittest.TestCase):
                     MOCK_VERSION
                 )
             )
+
+    def test_prefetch_outputs(self):
+        """Test prefetch outputs."""
+        context = mock_context("mynamespace", extra_config_args={
+            "stacks": [{
+                "name": "app",
+                "class_path": "tests.cfngin.fixtures.mock_blueprints.Dummy",
+                "variables": {
+                    "Rxref": "${rxref vpc::VpcId}",
+                    "Xref": ["${xref shared-bucket::BucketName}"],
+                    "Nested": "${xref ${default env::shared}-db::Endpoint}",
+                },
+            }]
+        })
+        provider = mock.MagicMock()
+        action = BaseAction(
+            context=context,
+            provider_builder=MockProviderBuilder(provider)
+        )
+
+        action.prefetch_outputs(concurrency=1)
+
+        self.assertEqual(
+            sorted(call[0][0] for call in provider.get_outputs.call_args_list),
+            ["mynamespace-vpc", "shared-bucket"]
+        )
@@ -221,6 +221,21 @@ class TestFileTranslator(unittest.TestCase):
 
         self.assertEqual(result, out)
 
+    @mock.patch('runway.cfngin.lookups.handlers.file.yaml_codec')
+    @mock.patch('runway.cfngin.lookups.handlers.file.read_value_from_path',
+                return_value=u'key: cached-value')
+    def test_handler_cached(self, _, codec_mock):
+        """Test handler reuses the result of a codec for the same content."""
+        codec_mock.return_value = {'key': ['cached-value']}
+
+        first = FileLookup.handle(u'yaml:file://tmp/test')
+        first['key'].append('modified')
+        second = FileLookup.handle(u'yaml:file://tmp/other')
+
+        codec_mock.assert_called_once_with(u'key: cached-value',
+                                           parameterized=False)
+        self.assertEqual(second, {'key': ['cached-value']})
+
     @mock.patch('runway.cfngin.lookups.handlers.file.read_value_from_path')
     def test_unknown_codec(self, _):
         """Test unknown codec."""
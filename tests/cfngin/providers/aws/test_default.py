@@ -491,6 +491,53 @@ class TestProviderDefaultMode(unittest.TestCase):
 
         self.assertEqual(response["StackName"], stack_name)
 
+    def test_get_outputs(self):
+        """Test get outputs."""
+        stack_name = "MockStack"
+        stack = generate_describe_stacks_stack(stack_name)
+        stack["Outputs"] = [{"OutputKey": "Key", "OutputValue": "Value"}]
+        self.stubber.add_response(
+            "describe_stacks",
+            {"Stacks": [stack]},
+            expected_params={"StackName": stack_name}
+        )
+
+        with self.stubber:
+            self.assertEqual(self.provider.get_outputs(stack_name),
+                             {"Key": "Value"})
+            # second call is served from the output store
+            self.assertEqual(self.provider.get_outputs(stack_name),
+                             {"Key": "Value"})
+        self.stubber.assert_no_pending_responses()
+
+    def test_get_outputs_shared_store(self):
+        """Test get outputs with an output store shared between providers."""
+        store = default.OutputStore()
+        store["MockStack"] = {"Key": "Value"}
+        provider = Provider(self.session, region="us-east-1",
+                            output_store=store)
+
+        self.assertEqual(provider.get_outputs("MockStack"), {"Key": "Value"})
+        self.assertIs(default.get_output_store("us-east-1", "test"),
+                      default.get_output_store("us-east-1", "test"))
+        # credentials passed through the environment (e.g. assume_role)
+        # don't share outputs with those of another account
+        self.assertIsNot(default.get_output_store("us-east-1", None, "KEY1"),
+                         default.get_output_store("us-east-1", None, "KEY2"))
+
+    def test_output_store_empty_outputs(self):
+        """Test empty outputs are fetched again."""
+        store = default.OutputStore()
+        results = [{}, {"Key": "Value"}]
+
+        def fetch(_stack_name):
+            return results.pop(0)
+
+        self.assertEqual(store.fetch("MockStack", fetch), {})
+        self.assertNotIn("MockStack", store)
+        self.assertEqual(store.fetch("MockStack", fetch), {"Key": "Value"})
+        self.assertEqual(store.fetch("MockStack", fetch), {"Key": "Value"})
+
     def test_select_update_method(self):
         """Test select update method."""
         for i in [[{'force_interactive': True,
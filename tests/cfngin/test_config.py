@@ -3,11 +3,14 @@
 import sys
 import unittest
 
+import mock
+
 from yaml.constructor import ConstructorError
 
+from runway.cfngin import config as config_module
 from runway.cfngin import exceptions
-from runway.cfngin.config import (Config, Stack, dump, load, parse,
-                                  process_remote_sources, render,
+from runway.cfngin.config import (Config, Stack, dump, load, merge_configs,
+                                  parse, process_remote_sources, render,
                                   render_parse_load)
 from runway.cfngin.environment import parse_environment
 from runway.cfngin.lookups.registry import CFNGIN_LOOKUP_HANDLERS
@@ -473,6 +476,26 @@ stacks:
         config.validate()
         assert config.namespace == 'prod'
 
+    def test_render_parse_load_cached(self):
+        """Test render parse load only parses and validates once."""
+        conf = """
+        namespace: cached
+        stacks:
+        - name: vpc
+          class_path: blueprints.VPC
+        """
+        config_module.CONFIG_CACHE.clear()
+        first = render_parse_load(conf)
+        first.stacks[0].name = "changed"
+
+        with mock.patch.object(config_module, 'parse_to_dict') as mock_parse, \
+                mock.patch.object(Config, 'validate') as mock_validate:
+            second = render_parse_load(conf)
+        mock_parse.assert_not_called()
+        mock_validate.assert_not_called()
+        self.assertEqual(second.namespace, "cached")
+        self.assertEqual(second.stacks[0].name, "vpc")
+
     def test_allow_most_keys_to_be_duplicates_for_overrides(self):
         """Test allow most keys to be duplicates for overrides."""
         yaml_config = """
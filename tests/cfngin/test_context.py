@@ -38,6 +38,12 @@ class TestContext(unittest.TestCase):
         self.assertEqual(stack_names[0], "namespace-stack1")
         self.assertEqual(stack_names[1], "namespace-stack2")
 
+    def test_context_get_stack(self):
+        """Test context get stack."""
+        context = Context(config=self.config)
+        self.assertIs(context.get_stack("stack2"), context.get_stacks()[1])
+        self.assertIsNone(context.get_stack("namespace-stack2"))
+
     def test_context_get_fqn(self):
         """Test context get fqn."""
         context = Context(config=self.config)
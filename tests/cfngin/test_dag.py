@@ -36,6 +36,21 @@ def test_add_edge(empty_dag):
     assert dag.graph == {'a': set('b'), 'b': set()}
 
 
+def test_add_edge_cycle(empty_dag):
+    """Test add edge that would create a cycle."""
+    dag = empty_dag
+
+    for node in ['a', 'b', 'c']:
+        dag.add_node(node)
+    dag.add_edge('a', 'b')
+    dag.add_edge('b', 'c')
+    with pytest.raises(DAGValidationError):
+        dag.add_edge('c', 'a')
+    with pytest.raises(DAGValidationError):
+        dag.add_edge('a', 'a')
+    assert dag.graph == {'a': set('b'), 'b': set('c'), 'c': set()}
+
+
 def test_from_dict(empty_dag):
     """Test from dict."""
     dag = empty_dag
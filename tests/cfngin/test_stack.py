@@ -52,6 +52,18 @@ class TestStack(unittest.TestCase):
             stack.requires,
         )
 
+    def test_stack_requires_cached(self):
+        """Test stack requires is only calculated once."""
+        definition = generate_definition(
+            base_name="vpc",
+            stack_id=1,
+            variables={"Var1": "${output fakeStack::FakeOutput}"},
+        )
+        stack = Stack(definition=definition, context=self.context)
+        self.assertEqual(stack.requires, {"fakeStack"})
+        stack.variables = []
+        self.assertEqual(stack.requires, {"fakeStack"})
+
     def test_stack_requires_circular_ref(self):
         """Test stack requires circular ref."""
         definition = generate_definition(
@@ -1,4 +1,7 @@
 """Tests for runway.cfngin.stacker."""
+import os
+import shutil
+import tempfile
 import unittest
 
 from runway.cfngin.commands import Stacker
@@ -120,6 +123,44 @@ class TestStacker(unittest.TestCase):
             stacker.config.log_formats.get("debug")  # pylint: disable=no-member
         )
 
+    def test_stacker_build_merge_config(self):
+        """Test stacker build with merged configs."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        merge_config = os.path.join(tmp_dir, 'app.yaml')
+        with open(merge_config, 'w') as stream:
+            stream.write(
+                "stacks:\n"
+                "  - name: app\n"
+                "    class_path: tests.cfngin.fixtures.mock_blueprints.Dummy\n"
+                "    variables:\n"
+                "      VpcId: ${rxref vpc::VpcId}\n"
+                "      BastionSG: ${xref test-cfngin-bastion::SG}\n"
+                "      Other: ${rxref not-merged::Output}\n"
+                "  - name: worker\n"
+                "    class_path: tests.cfngin.fixtures.mock_blueprints.Dummy\n"
+                "    requires:\n"
+                "      - vpc\n"
+                "    variables:\n"
+                "      AppUrl: ${rxref app::Url}\n"
+            )
+        stacker = Stacker()
+        args = stacker.parse_args(
+            ["build",
+             "-r", "us-west-2",
+             "--merge-config", merge_config,
+             "tests/cfngin/fixtures/basic.env",
+             "tests/cfngin/fixtures/vpc-bastion-db-web.yaml"]
+        )
+        stacker.configure(args)
+        stacks = dict((stack.name, stack)
+                      for stack in args.context.get_stacks())
+        self.assertEqual(['vpc', 'bastion', 'app', 'worker'],
+                         [stack.name for stack in args.context.get_stacks()])
+        self.assertEqual(set(['vpc', 'bastion']), stacks['app'].requires)
+        # references within the same config are left as they are
+        self.assertEqual(set(['vpc']), stacks['worker'].requires)
+
 
 if __name__ == '__main__':
     unittest.main()
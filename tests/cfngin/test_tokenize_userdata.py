@@ -1,9 +1,11 @@
 """Tests for runway.cfngin.tokenize_userdata."""
+import hashlib
 import unittest
 
 import yaml
 
-from runway.cfngin.tokenize_userdata import cf_tokenize
+from runway.cfngin.tokenize_userdata import (CF_TOKENIZE_CACHE, cf_tokenize,
+                                              template_tokenize)
 
 
 class TestCfTokenize(unittest.TestCase):
@@ -24,3 +26,25 @@ class TestCfTokenize(unittest.TestCase):
         self.assertEqual(parts[1]["Ref"], "SshKey")
         self.assertEqual(parts[3]["Fn::GetAtt"], ["Blah", "Woot"])
         self.assertEqual(len(parts), 5)
+
+    def test_tokenize_cached(self):
+        """Test tokenize result is cached but not shared."""
+        user_data = "echo Ref(\"SshKey\") > /tmp/key"
+        parts = cf_tokenize(user_data)
+        self.assertEqual(parts, ["echo ", {"Ref": "SshKey"}, " > /tmp/key"])
+        parts[1]["Ref"] = "changed"
+        self.assertEqual(cf_tokenize(user_data)[1], {"Ref": "SshKey"})
+        self.assertIn(hashlib.md5(user_data.encode('utf-8')).hexdigest(),
+                      CF_TOKENIZE_CACHE)
+
+
+class TestTemplateTokenize(unittest.TestCase):
+    """Tests for runway.cfngin.tokenize_userdata.template_tokenize."""
+
+    def test_template_tokenize(self):
+        """Test template_tokenize."""
+        self.assertEqual(template_tokenize("a $b ${c} $$d"),
+                         ((False, "a "), (True, "b"), (False, " "),
+                          (True, "c"), (False, " "), (False, "$"),
+                          (False, "d")))
+        self.assertIsNone(template_tokenize("${a} ${100}"))
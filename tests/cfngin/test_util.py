@@ -1,9 +1,20 @@
 """Tests for runway.cfngin.util."""
 # pylint: disable=unused-argument,invalid-name
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import time
 import unittest
+import zipfile
 
 import boto3
 import mock
+import yaml
+from git import Actor, Repo
+from moto import mock_s3
+from yaml.constructor import ConstructorError
 
 from runway.cfngin.config import GitPackageSource
 from runway.cfngin.util import (Extractor, SourceProcessor, TarExtractor,
@@ -11,8 +22,10 @@ from runway.cfngin.util import (Extractor, SourceProcessor, TarExtractor,
                                 cf_safe_name, get_client_region,
                                 get_s3_endpoint, merge_map,
                                 parse_cloudformation_template,
+                                read_value_from_path,
                                 s3_bucket_location_constraint,
                                 yaml_to_ordered_dict)
+from runway.util import LRUCache
 
 AWS_REGIONS = ["us-east-1", "cn-north-1", "ap-northeast-1", "eu-west-1",
                "ap-southeast-1", "ap-southeast-2", "us-west-2", "us-gov-west-1",
@@ -98,6 +111,62 @@ class TestUtil(unittest.TestCase):
         self.assertEqual(list(config['pre_build'].keys())[0], 'hook2')
         self.assertEqual(config['pre_build']['hook2']['path'], 'foo.bar')
 
+    def test_yaml_to_ordered_dict_loaders(self):
+        """Test yaml to ordered dict is the same for all safe loaders."""
+        raw_config = """
+        stacks:
+          vpc:
+            variables: {b: 1, a: [2, 3]}
+          bastion:
+            requires: [vpc]
+        """
+        expected = yaml_to_ordered_dict(raw_config, loader=yaml.SafeLoader)
+        self.assertEqual(yaml_to_ordered_dict(raw_config), expected)
+        self.assertEqual(list(expected['stacks'].keys()), ['vpc', 'bastion'])
+        with self.assertRaises(ConstructorError):
+            yaml_to_ordered_dict("stacks:\n  vpc: {}\n  vpc: {}\n")
+
+    def test_read_value_from_path(self):
+        """Test read value from path."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        file_path = os.path.join(tmp_dir, 'test.txt')
+        with open(file_path, 'w') as file_:
+            file_.write('first')
+
+        with mock.patch('runway.cfngin.util.get_config_directory',
+                        return_value=tmp_dir):
+            self.assertEqual(read_value_from_path('not-a-path'), 'not-a-path')
+            self.assertEqual(read_value_from_path('file://test.txt'), 'first')
+            with mock.patch('runway.cfngin.util.open',
+                            side_effect=AssertionError, create=True):
+                # file is unchanged so it is not opened again
+                self.assertEqual(read_value_from_path('file://test.txt'),
+                                 'first')
+            with open(file_path, 'w') as file_:
+                file_.write('second')
+            self.assertEqual(read_value_from_path('file://test.txt'),
+                             'second')
+
+    def test_read_value_from_path_cache_size(self):
+        """Only the most recently read files are kept."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        for index in range(3):
+            with open(os.path.join(tmp_dir, '%d.txt' % index), 'w') as file_:
+                file_.write(str(index))
+
+        with mock.patch('runway.cfngin.util.get_config_directory',
+                        return_value=tmp_dir), \
+                mock.patch('runway.cfngin.util.FILE_CONTENT_CACHE',
+                           LRUCache(maxsize=2)) as cache:
+            for index in range(3):
+                self.assertEqual(
+                    read_value_from_path('file://%d.txt' % index), str(index)
+                )
+            self.assertEqual(len(cache), 2)
+            self.assertNotIn(os.path.join(tmp_dir, '0.txt'), cache)
+
     def test_get_client_region(self):
         """Test get client region."""
         regions = ["us-east-1", "us-west-1", "eu-west-1", "sa-east-1"]
@@ -174,6 +243,124 @@ Outputs:
             i.set_archive('/tmp/foo')
             self.assertEqual(i.archive.endswith(i.extension()), True)
 
+    def test_zip_extractor_stream(self):
+        """Test zip archives can be extracted from a stream."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zip_ref:
+            zip_ref.writestr('package/file.txt', 'content')
+        buffer.seek(0)
+
+        ZipExtractor().extract_stream(buffer, tmp_dir)
+        with open(os.path.join(tmp_dir, 'package', 'file.txt')) as file_:
+            self.assertEqual(file_.read(), 'content')
+
+    def test_SourceProcessor_get_package_sources(self):  # noqa: N802
+        """Test SourceProcessor get_package_sources keeps source order."""
+        def stage(config):
+            """Finish staging sources in the reverse order of definition."""
+            time.sleep(config['delay'])
+            return config['name'], '/cache'
+
+        sources = {
+            'local': [{'source': 'local', 'name': 'local', 'delay': 0.3,
+                       'configs': ['local.yml']}],
+            's3': [{'bucket': 'bucket', 'key': 'key.zip', 'name': 's3',
+                    'delay': 0.2,
+                    'configs': ['s3.yml']}],
+            'git': [{'uri': 'git@foo', 'name': 'git', 'delay': 0.1,
+                     'configs': ['git.yml']}]
+        }
+        with mock.patch.object(SourceProcessor,
+                               'create_cache_directories',
+                               new=mock_create_cache_directories), \
+                mock.patch.object(SourceProcessor, 'stage_local_package',
+                                  side_effect=stage), \
+                mock.patch.object(SourceProcessor, 'stage_s3_package',
+                                  side_effect=stage), \
+                mock.patch.object(SourceProcessor, 'stage_git_package',
+                                  side_effect=stage), \
+                mock.patch('sys.path', []) as mock_path:
+            sp = SourceProcessor(sources=sources)
+            start = time.time()
+            sp.get_package_sources()
+            self.assertLess(time.time() - start, 0.55)
+            self.assertEqual(mock_path, [os.path.join('/cache', 'local'),
+                                         os.path.join('/cache', 's3'),
+                                         os.path.join('/cache', 'git')])
+        self.assertEqual(sp.configs_to_merge,
+                         [os.path.join('/cache', 'local', 'local.yml'),
+                          os.path.join('/cache', 's3', 's3.yml'),
+                          os.path.join('/cache', 'git', 'git.yml')])
+
+    def test_SourceProcessor_stage_git_package(self):  # noqa: N802
+        """Test SourceProcessor stage_git_package from a mirror."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        remote_path = os.path.join(tmp_dir, 'remote')
+        remote = Repo.init(remote_path)
+        for name in ['blueprints', 'other']:
+            os.mkdir(os.path.join(remote_path, name))
+            with open(os.path.join(remote_path, name, '__init__.py'),
+                      'w') as file_:
+                file_.write('')
+            remote.index.add([os.path.join(name, '__init__.py')])
+        commit = remote.index.commit(
+            'init', author=Actor('test', 'test@example.com'),
+            committer=Actor('test', 'test@example.com')
+        ).hexsha
+
+        sp = SourceProcessor(sources={},
+                             cfngin_cache_dir=os.path.join(tmp_dir, 'cache'))
+        dir_name, _ = sp.stage_git_package({'uri': remote_path,
+                                            'commit': commit,
+                                            'paths': ['blueprints'],
+                                            'sparse': True})
+        cached_dir_path = os.path.join(sp.package_cache_dir, dir_name)
+        self.assertTrue(os.path.isfile(os.path.join(
+            cached_dir_path, 'blueprints', '__init__.py'
+        )))
+        self.assertFalse(os.path.isdir(os.path.join(cached_dir_path,
+                                                    'other')))
+
+    @mock_s3
+    def test_SourceProcessor_stage_s3_package(self):  # noqa: N802
+        """Test SourceProcessor stage_s3_package uses ETag and content."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket='bucket')
+
+        def upload(content):
+            """Upload a tar.gz archive containing one file."""
+            data = io.BytesIO()
+            with tarfile.open(fileobj=data, mode='w:gz') as tar:
+                info = tarfile.TarInfo('blueprints/__init__.py')
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+            client.put_object(Bucket='bucket', Key='archive.tar.gz',
+                              Body=data.getvalue())
+
+        upload(b'first')
+        sp = SourceProcessor(sources={},
+                             cfngin_cache_dir=os.path.join(tmp_dir, 'cache'))
+        config = {'bucket': 'bucket', 'key': 'archive.tar.gz'}
+        dir_name, _ = sp.stage_s3_package(config)
+        init_path = os.path.join(sp.package_cache_dir, dir_name,
+                                 'blueprints', '__init__.py')
+        with open(init_path) as init_file:
+            self.assertEqual(init_file.read(), 'first')
+
+        with mock.patch.object(TarGzipExtractor, 'extract_stream') as extract:
+            self.assertEqual(sp.stage_s3_package(config)[0], dir_name)
+        extract.assert_not_called()
+
+        upload(b'second')
+        self.assertEqual(sp.stage_s3_package(config)[0], dir_name)
+        with open(init_path) as init_file:
+            self.assertEqual(init_file.read(), 'second')
+
     def test_SourceProcessor_helpers(self):  # noqa: N802
         """Test SourceProcessor helpers."""
         with mock.patch.object(SourceProcessor,
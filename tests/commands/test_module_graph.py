@@ -0,0 +1,69 @@
+"""Tests runway/commands/module_graph.py."""
+import sys
+import threading
+
+import pytest
+
+from runway.cfngin.dag import DAG
+from runway.commands.module_graph import parallel_enabled, run_module_graph
+
+if sys.version_info[0] > 2:
+    import concurrent.futures
+
+
+@pytest.mark.skipif(sys.version_info[0] < 3,
+                    reason='concurrent.futures is only used with python 3')
+def test_parallel_enabled():
+    """Parallel execution requires CI or RUNWAY_PARALLEL."""
+    assert not parallel_enabled({})
+    assert not parallel_enabled({'RUNWAY_PARALLEL': 'false'})
+    assert parallel_enabled({'RUNWAY_PARALLEL': 'true'})
+    assert parallel_enabled({'CI': '1'})
+
+
+@pytest.mark.skipif(sys.version_info[0] < 3,
+                    reason='concurrent.futures is only used with python 3')
+class TestRunModuleGraph(object):
+    """Tests for run_module_graph."""
+
+    @staticmethod
+    def get_graph():
+        """Graph where c depends on a & b and d depends on c."""
+        graph = DAG()
+        for node in 'abcd':
+            graph.add_node(node)
+        graph.add_edge('a', 'c')
+        graph.add_edge('b', 'c')
+        graph.add_edge('c', 'd')
+        return graph
+
+    def test_concurrent(self):
+        """Nodes without dependencies between them run at the same time."""
+        barrier = threading.Barrier(2, timeout=5)
+        finished = []
+
+        def run(node):
+            if node in ['a', 'b']:
+                barrier.wait()  # fails unless a & b are running together
+            finished.append(node)
+
+        tasks = dict((node, (run, (node,))) for node in 'abcd')
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        run_module_graph(self.get_graph(), tasks, executor)
+        assert sorted(finished[:2]) == ['a', 'b']
+        assert finished[2:] == ['c', 'd']
+
+    def test_failure(self):
+        """Nodes that depend on a failed node are not run."""
+        finished = []
+
+        def run(node):
+            if node == 'a':
+                raise ValueError(node)
+            finished.append(node)
+
+        tasks = dict((node, (run, (node,))) for node in 'abcd')
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        with pytest.raises(ValueError):
+            run_module_graph(self.get_graph(), tasks, executor)
+        assert 'c' not in finished and 'd' not in finished
@@ -0,0 +1,138 @@
+"""Tests runway/commands/module_prefetch.py."""
+from mock import patch
+
+from runway.commands.module_prefetch import (local_module_paths,
+                                             prefetch_tool_versions,
+                                             prewarm_terraform_plugins)
+from runway.config import DeploymentDefinition
+from runway.context import Context
+
+MODULE = 'runway.commands.module_prefetch'
+
+
+def get_deployment(**kwargs):
+    """Create a deployment of the tf, k8s & cfn test modules."""
+    deployment = {'modules': ['app.tf', 'app.k8s', 'app.cfn'],
+                  'regions': ['us-east-1']}
+    deployment.update(kwargs)
+    return DeploymentDefinition.from_list([deployment])
+
+
+def get_context(tmpdir, command='deploy'):
+    """Create a context for the test environment."""
+    return Context(env_name='test', env_region='us-east-1',
+                   env_root=str(tmpdir), command=command)
+
+
+def write_modules(tmpdir):
+    """Write a Terraform, Kubernetes & CloudFormation module."""
+    tmpdir.join('app.tf', 'main.tf').write('', ensure=True)
+    tmpdir.join('app.tf', '.terraform-version').write('0.12.0')
+    tmpdir.join('app.k8s', 'overlays', 'prod',
+                'kustomization.yaml').write('', ensure=True)
+    tmpdir.join('app.cfn', 'stacks.yml').write('', ensure=True)
+
+
+def get_names(tmpdir, deployments):
+    """Return the names of the modules that will run."""
+    return sorted(
+        path.replace(str(tmpdir), '').strip('/\\')
+        for path, _ in local_module_paths(deployments, get_context(tmpdir),
+                                          str(tmpdir))
+    )
+
+
+class TestLocalModulePaths(object):
+    """Modules skipped for the environment are not prepared."""
+
+    def test_environment_files(self, tmpdir):
+        """Terraform needs tfvars or parameters, k8s needs an overlay."""
+        write_modules(tmpdir)
+        assert get_names(tmpdir, get_deployment()) == ['app.cfn']
+
+        tmpdir.join('app.tf', 'test-us-east-1.tfvars').write('')
+        tmpdir.join('app.k8s', 'overlays', 'test',
+                    'kustomization.yaml').write('', ensure=True)
+        assert get_names(tmpdir, get_deployment()) == [
+            'app.cfn', 'app.k8s', 'app.tf'
+        ]
+
+    def test_parameters(self, tmpdir):
+        """Terraform modules with parameters for the environment run."""
+        write_modules(tmpdir)
+        deployments = get_deployment(environments={'test': {'foo': 'bar'}})
+        assert get_names(tmpdir, deployments) == ['app.cfn', 'app.tf']
+
+        tmpdir.join('app.tf', 'runway.module.yml').write(
+            'environments:\n  test: false\n'
+        )
+        assert get_names(tmpdir, deployments) == ['app.cfn']
+
+    def test_disabled(self, tmpdir):
+        """Modules explicitly disabled for the environment are skipped."""
+        write_modules(tmpdir)
+        tmpdir.join('app.tf', 'test.tfvars').write('')
+        assert get_names(
+            tmpdir, get_deployment(environments={'test': False})
+        ) == []
+        # can't be checked without an AWS call
+        assert get_names(
+            tmpdir, get_deployment(environments={'test': '123/us-east-1'})
+        ) == ['app.cfn', 'app.tf']
+
+
+@patch(MODULE + '.prefetch_versions')
+def test_prefetch_tool_versions(mock_prefetch, tmpdir):
+    """Versions are only installed for modules that will run."""
+    write_modules(tmpdir)
+    prefetch_tool_versions(get_deployment(), get_context(tmpdir),
+                           str(tmpdir))
+    mock_prefetch.assert_not_called()
+
+    tmpdir.join('app.tf', 'test.tfvars').write('')
+    prefetch_tool_versions(get_deployment(), get_context(tmpdir),
+                           str(tmpdir))
+    installs = mock_prefetch.call_args[0][0]
+    assert [(manager.path, version) for manager, version in installs] == [
+        (str(tmpdir.join('app.tf')), None)
+    ]
+
+
+class TestPrewarmTerraformPlugins(object):
+    """Test prewarm_terraform_plugins."""
+
+    @staticmethod
+    def write_module(tmpdir):
+        """Write a Terraform module that will run."""
+        write_modules(tmpdir)
+        tmpdir.join('app.tf', 'test.tfvars').write('')
+
+    @patch(MODULE + '.prewarm_plugin_cache')
+    @patch(MODULE + '.find_tf_bin')
+    def test_install_error(self, mock_find, mock_prewarm, tmpdir):
+        """Terraform install errors don't stop the run."""
+        self.write_module(tmpdir)
+        mock_find.side_effect = SystemExit(1)
+        prewarm_terraform_plugins(get_deployment(), get_context(tmpdir),
+                                  str(tmpdir))
+        mock_prewarm.assert_not_called()
+
+        mock_find.side_effect = None
+        mock_find.return_value = 'terraform'
+        prewarm_terraform_plugins(get_deployment(), get_context(tmpdir),
+                                  str(tmpdir))
+        mock_prewarm.assert_called_once()
+        assert mock_prewarm.call_args[0][0] == [
+            ('terraform', str(tmpdir.join('app.tf')))
+        ]
+
+    @patch(MODULE + '.prewarm_plugin_cache')
+    @patch(MODULE + '.find_tf_bin')
+    def test_destroy(self, mock_find, mock_prewarm, tmpdir):
+        """Nothing is downloaded when destroying."""
+        self.write_module(tmpdir)
+        prewarm_terraform_plugins(get_deployment(),
+                                  get_context(tmpdir, 'destroy'),
+                                  str(tmpdir))
+        mock_find.assert_not_called()
+        mock_prewarm.assert_not_called()
@@ -8,8 +8,10 @@ import yaml
 from mock import patch
 from moto import mock_sts
 
-from runway.commands.modules_command import (select_modules_to_run,
+from runway.commands.modules_command import (ModulesCommand,
+                                             select_modules_to_run,
                                              validate_environment)
+from runway.context import Context
 
 
 def module_tag_config():
@@ -161,3 +163,116 @@ class TestValidateEnvironment(object):
         assert not validate_environment('test_module',
                                         self.MOCK_ACCOUNT_ID + '/us-east-2',
                                         os.environ)
+
+
+GRAPH_CONFIG = """
+deployments:
+  - name: first
+    modules:
+      - path: network.cfn
+        depends_on: []
+      - path: database.tf
+        depends_on: []
+      - path: app.cfn
+        depends_on:
+          - network.cfn
+          - database.tf
+      - path: web.sls
+    regions:
+      - us-east-1
+      - us-west-2
+  - name: second
+    modules:
+      - path: dns.cfn
+      - path: other.cfn
+        depends_on:
+          - app.cfn
+    parallel_regions:
+      - us-east-1
+      - eu-west-1
+"""
+
+
+class TestModuleGraph(object):
+    """Tests for processing modules using depends_on."""
+
+    @staticmethod
+    def get_command(tmpdir):
+        """Create a ModulesCommand using the graph config."""
+        tmpdir.join('runway.yml').write(GRAPH_CONFIG)
+        return ModulesCommand({}, env_root=str(tmpdir))
+
+    @staticmethod
+    def get_context(tmpdir, command='deploy'):
+        """Create a context."""
+        context = Context(env_name='test', env_region=None,
+                          env_root=str(tmpdir), command=command)
+        context.env_vars.pop('CI', None)
+        return context
+
+    def test_build_module_graph(self, tmpdir):
+        """Test edges of the module graph."""
+        command = self.get_command(tmpdir)
+        graph, nodes = command._build_module_graph(
+            command.runway_config.deployments, self.get_context(tmpdir)
+        )
+        assert len(nodes) == 12
+        assert set(graph.predecessors('first:network.cfn:us-east-1')) == set()
+        assert set(graph.predecessors('first:database.tf:us-west-2')) == set()
+        assert set(graph.predecessors('first:app.cfn:us-west-2')) == set(
+            ['first:network.cfn:us-west-2', 'first:database.tf:us-west-2']
+        )
+        # no depends_on - waits for the module before it
+        assert graph.predecessors('first:web.sls:us-east-1') == \
+            ['first:app.cfn:us-east-1']
+        # first module of a region waits for the previous region
+        # (network.cfn has depends_on so does not)
+        assert graph.predecessors('second:dns.cfn:eu-west-1') == \
+            ['first:web.sls:us-west-2']
+        # not deployed to eu-west-1 so depends on every region
+        assert set(graph.predecessors('second:other.cfn:eu-west-1')) == set(
+            ['first:app.cfn:us-east-1', 'first:app.cfn:us-west-2']
+        )
+        assert graph.predecessors('second:other.cfn:us-east-1') == \
+            ['first:app.cfn:us-east-1']
+
+    def test_build_module_graph_destroy(self, tmpdir):
+        """Dependencies are reversed when destroying."""
+        command = self.get_command(tmpdir)
+        graph, _ = command._build_module_graph(
+            command.reverse_deployments(command.runway_config.deployments),
+            self.get_context(tmpdir, 'destroy')
+        )
+        assert set(graph.predecessors('first:network.cfn:us-east-1')) == set(
+            ['first:app.cfn:us-east-1']
+        )
+        assert set(graph.predecessors('first:app.cfn:us-east-1')) == set(
+            ['first:web.sls:us-east-1', 'second:other.cfn:us-east-1',
+             'second:other.cfn:eu-west-1']
+        )
+        assert list(graph.graph)[0] == 'second:other.cfn:eu-west-1'
+
+    def test_process_deployments_sequential(self, tmpdir):
+        """Without CI, modules are processed one at a time in order."""
+        command = self.get_command(tmpdir)
+        processed = []
+        with patch.object(ModulesCommand, '_execute_module',
+                          side_effect=lambda deployment, module, _context,
+                          region: processed.append(
+                              (deployment.name, module.name, region))):
+            command._process_deployments(command.runway_config.deployments,
+                                         self.get_context(tmpdir))
+        assert processed == [
+            ('first', 'network.cfn', 'us-east-1'),
+            ('first', 'database.tf', 'us-east-1'),
+            ('first', 'app.cfn', 'us-east-1'),
+            ('first', 'web.sls', 'us-east-1'),
+            ('first', 'network.cfn', 'us-west-2'),
+            ('first', 'database.tf', 'us-west-2'),
+            ('first', 'app.cfn', 'us-west-2'),
+            ('first', 'web.sls', 'us-west-2'),
+            ('second', 'dns.cfn', 'us-east-1'),
+            ('second', 'other.cfn', 'us-east-1'),
+            ('second', 'dns.cfn', 'eu-west-1'),
+            ('second', 'other.cfn', 'eu-west-1'),
+        ]
@@ -0,0 +1,72 @@
+"""Tests runway/commands/output_multiplexer.py."""
+import pytest
+from six import StringIO
+
+from runway.commands.output_multiplexer import OutputMultiplexer
+
+
+class TestOutputMultiplexer(object):
+    """Test OutputMultiplexer."""
+
+    def test_prefix(self, tmpdir):
+        """Complete lines are shown with the name of their task."""
+        stream = StringIO()
+        output = OutputMultiplexer(str(tmpdir.join('logs')), stream=stream)
+        first = output.start('app:us-east-1')
+        second = output.start('app:us-west-2')
+
+        with open(first, 'a') as log_file:
+            log_file.write('one\ntw')
+        with open(second, 'a') as log_file:
+            log_file.write('three\n')
+        output.poll()
+        assert stream.getvalue() == ('[app:us-east-1] one\n'
+                                     '[app:us-west-2] three\n')
+
+        with open(first, 'a') as log_file:
+            log_file.write('o')
+        output.finish('app:us-east-1')
+        assert stream.getvalue().endswith('[app:us-east-1] two\n')
+
+    def test_status(self, tmpdir):
+        """The state of each task is shown when it changes."""
+        stream = StringIO()
+        output = OutputMultiplexer(str(tmpdir), mode='status', stream=stream)
+        with open(output.start('app:us-east-1'), 'a') as log_file:
+            log_file.write('one\n')
+        output.poll()
+        output.poll()
+        output.finish('app:us-east-1')
+        assert stream.getvalue() == ('running    app:us-east-1\n'
+                                     'done       app:us-east-1\n')
+
+    def test_close(self, tmpdir):
+        """The full output of failed tasks is shown again."""
+        stream = StringIO()
+        output = OutputMultiplexer(str(tmpdir), stream=stream)
+        with open(output.start('good'), 'a') as log_file:
+            log_file.write('fine\n')
+        with open(output.start('bad'), 'a') as log_file:
+            log_file.write('broken\n')
+        output.finish('good')
+        output.finish('bad', failed=True)
+        stream.truncate(0)
+        stream.seek(0)
+
+        output.close()
+        assert 'fine' not in stream.getvalue()
+        assert 'Output of failed task "bad"' in stream.getvalue()
+        assert 'broken\n' in stream.getvalue()
+
+    def test_old_logs_removed(self, tmpdir):
+        """Logs of a previous run are removed."""
+        tmpdir.join('old.log').write('old')
+        OutputMultiplexer(str(tmpdir))
+        assert not tmpdir.join('old.log').exists()
+
+    def test_interleaved(self, tmpdir):
+        """Output is not captured when interleaved."""
+        assert not OutputMultiplexer(str(tmpdir),
+                                     mode='interleaved').start('app')
+        with pytest.raises(ValueError):
+            OutputMultiplexer(str(tmpdir), mode='invalid')
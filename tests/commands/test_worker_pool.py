@@ -0,0 +1,175 @@
+"""Tests runway/commands/worker_pool.py."""
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from six import StringIO
+
+from runway.commands.output_multiplexer import OutputMultiplexer
+from runway.commands.worker_pool import ContextDelta, WorkerPool
+from runway.context import Context
+from runway.sources import git
+from runway.util import get_subprocess_output_kwargs
+
+
+class MockCommand(object):  # pylint: disable=too-few-public-methods
+    """Command with a method for the workers to run."""
+
+    @staticmethod
+    def describe(context, region=None):
+        """Return details of the context and the worker process."""
+        return (context.env_name, region or context.env_region,
+                context.env_vars.get('FOO'), 'BAR' in context.env_vars,
+                os.getpid())
+
+    @staticmethod
+    def echo(message, fail=False):
+        """Print a message from this process and a child process."""
+        print(message)
+        subprocess.check_call([sys.executable, '-c',
+                               'print("%s from child")' % message],
+                              **get_subprocess_output_kwargs())
+        if fail:
+            raise ValueError(message)
+
+    @staticmethod
+    def resolved_ref(uri, ref):
+        """Return a git ref resolved in this process."""
+        return git.RESOLVED_REFS.get((uri, ref))
+
+    @staticmethod
+    def modify(context):
+        """Change the context."""
+        context.env_vars['FOO'] = 'changed'
+        return context.env_vars['FOO']
+
+    @classmethod
+    def nested(cls):
+        """Submit a task to the pool from a task."""
+        thread = threading.current_thread()
+        return cls.pool.submit(threading.current_thread).result() is thread
+
+
+class TestContextDelta(object):
+    """Test ContextDelta."""
+
+    def test_apply(self):
+        """Changed attributes and environment variables are restored."""
+        base = Context(env_name='test', env_region=None, env_root='./',
+                       env_vars={'BAR': 'bar', 'UNCHANGED': 'value'})
+        context = Context(env_name='test', env_region='us-east-1',
+                          env_root='./',
+                          env_vars={'FOO': 'foo', 'UNCHANGED': 'value'})
+        delta = ContextDelta(base, context)
+
+        assert delta.attributes == {'env_region': 'us-east-1'}
+        assert delta.set_env_vars == {'FOO': 'foo'}
+        assert delta.unset_env_vars == ['BAR']
+
+        result = delta.apply(base)
+        assert vars(result) == vars(context)
+        assert base.env_vars == {'BAR': 'bar', 'UNCHANGED': 'value',
+                                 'DEPLOY_ENVIRONMENT': 'test'}
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason='workers are initialized on python 3.7+')
+class TestWorkerPool(object):
+    """Test WorkerPool."""
+
+    def test_submit(self):
+        """Tasks are run by the same workers until the pool is shut down."""
+        base = Context(env_name='test', env_region=None, env_root='./',
+                       env_vars={'BAR': 'bar'})
+        pool = WorkerPool(MockCommand(), base, max_workers=1)
+        context = Context(env_name='test', env_region='us-east-1',
+                          env_root='./', env_vars={'FOO': 'foo'})
+        try:
+            first = pool.submit(MockCommand.describe, context).result()
+            second = pool.submit(MockCommand.describe, context,
+                                 region='us-west-2').result()
+        finally:
+            pool.shutdown()
+
+        assert first[:4] == ('test', 'us-east-1', 'foo', False)
+        assert second[:4] == ('test', 'us-west-2', 'foo', False)
+        assert first[4] == second[4] != os.getpid()
+        assert pool._executor is None  # pylint: disable=protected-access
+
+    def test_resolved_refs(self, monkeypatch):
+        """Workers reuse git refs resolved by the main process."""
+        monkeypatch.setitem(git.RESOLVED_REFS, ('repo', 'HEAD'), 'abc123')
+        base = Context(env_name='test', env_region=None, env_root='./')
+        pool = WorkerPool(MockCommand(), base, max_workers=1)
+        try:
+            result = pool.submit(MockCommand.resolved_ref, 'repo',
+                                 'HEAD').result()
+        finally:
+            pool.shutdown()
+        assert result == 'abc123'
+
+    def test_submit_task_output(self, tmpdir):
+        """Output of the task and its child processes is captured."""
+        stream = StringIO()
+        output = OutputMultiplexer(str(tmpdir), stream=stream)
+        pool = WorkerPool(MockCommand(), max_workers=1, output=output)
+        try:
+            good = pool.submit_task('good', MockCommand.echo, 'hello')
+            bad = pool.submit_task('bad', MockCommand.echo, 'broken', True)
+            pool.wait([good, bad])
+        finally:
+            pool.shutdown()
+
+        assert '[good] hello\n' in stream.getvalue()
+        assert '[good] hello from child\n' in stream.getvalue()
+        assert 'Output of failed task "bad"' in stream.getvalue()
+        assert 'ValueError: broken' in stream.getvalue()
+
+
+class TestThreadWorkerPool(object):
+    """Test WorkerPool using threads."""
+
+    def test_submit_task_output(self, tmpdir):
+        """Output of each thread and its child processes is kept apart."""
+        stream = StringIO()
+        output = OutputMultiplexer(str(tmpdir), stream=stream)
+        pool = WorkerPool(MockCommand(), max_workers=2, output=output,
+                          use_threads=True)
+        saved_stdout = sys.stdout
+        try:
+            good = pool.submit_task('good', MockCommand.echo, 'hello')
+            bad = pool.submit_task('bad', MockCommand.echo, 'broken', True)
+            pool.wait([good, bad])
+        finally:
+            pool.shutdown()
+
+        assert sys.stdout is saved_stdout
+        assert '[good] hello\n' in stream.getvalue()
+        assert '[good] hello from child\n' in stream.getvalue()
+        assert '[bad] broken from child\n' in stream.getvalue()
+        assert '[good] broken' not in stream.getvalue()
+        assert 'ValueError: broken' in stream.getvalue()
+
+    def test_submit_copies_arguments(self):
+        """Tasks get a copy of their arguments."""
+        context = Context(env_name='test', env_region='us-east-1',
+                          env_root='./', env_vars={'FOO': 'foo'})
+        pool = WorkerPool(MockCommand(), use_threads=True)
+        try:
+            result = pool.submit(MockCommand.modify, context).result()
+        finally:
+            pool.shutdown()
+        assert result == 'changed'
+        assert context.env_vars['FOO'] == 'foo'
+
+    def test_nested_submit(self):
+        """Tasks submitted by a task are run in its thread."""
+        pool = WorkerPool(MockCommand(), max_workers=1, use_threads=True)
+        MockCommand.pool = pool
+        try:
+            assert pool.submit(MockCommand.nested).result(timeout=5)
+        finally:
+            pool.shutdown()
+            del MockCommand.pool
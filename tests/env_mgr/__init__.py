@@ -0,0 +1 @@
+"""Empty file for python import traversal."""
@@ -0,0 +1,115 @@
+"""Tests for runway/env_mgr/__init__.py."""
+import hashlib
+import sys
+import threading
+import time
+
+import pytest
+from mock import MagicMock, patch
+from six import BytesIO
+
+from runway.env_mgr import download_file, prefetch_versions, version_lock
+
+MODULE = 'runway.env_mgr'
+
+
+def mock_response(data, code=200):
+    """Create a response to a request."""
+    response = MagicMock()
+    stream = BytesIO(data)
+    response.read.side_effect = stream.read
+    response.getcode.return_value = code
+    return response
+
+
+class TestDownloadFile(object):
+    """Test download_file."""
+
+    @patch(MODULE + '.urlopen')
+    def test_download(self, mock_urlopen, tmpdir):
+        """The file is saved and its hash returned."""
+        mock_urlopen.return_value = mock_response(b'content')
+        path = tmpdir.join('file')
+        assert download_file('https://example.com/file', str(path),
+                             'sha256') == \
+            hashlib.sha256(b'content').hexdigest()
+        assert path.read() == 'content'
+        assert not tmpdir.join('file.part').exists()
+        assert not mock_urlopen.call_args[0][0].has_header('Range')
+
+    @patch(MODULE + '.urlopen')
+    def test_resume(self, mock_urlopen, tmpdir):
+        """A partial download is resumed or started over."""
+        tmpdir.join('file.part').write('cont')
+        mock_urlopen.return_value = mock_response(b'ent', 206)
+        path = tmpdir.join('file')
+        assert download_file('https://example.com/file', str(path),
+                             'md5') == hashlib.md5(b'content').hexdigest()
+        assert path.read() == 'content'
+        assert mock_urlopen.call_args[0][0].get_header('Range') == \
+            'bytes=4-'
+
+        tmpdir.join('file.part').write('old')
+        mock_urlopen.return_value = mock_response(b'content', 200)
+        assert download_file('https://example.com/file', str(path),
+                             'md5') == hashlib.md5(b'content').hexdigest()
+        assert path.read() == 'content'
+
+
+def test_version_lock(tmpdir):
+    """Only one thread holds the lock of a version at a time."""
+    active = []
+    overlaps = []
+
+    def install():
+        """Hold the lock for a moment."""
+        with version_lock(str(tmpdir), '1.0.0'):
+            if active:
+                overlaps.append(True)
+            active.append(True)
+            time.sleep(0.05)
+            active.pop()
+
+    threads = [threading.Thread(target=install) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not overlaps
+
+
+def test_prefetch_versions():
+    """Each version is installed and errors are ignored."""
+    good = MagicMock(path='good')
+    bad = MagicMock(path='bad')
+    bad.install.side_effect = SystemExit(1)
+    prefetch_versions([(good, '1.0.0'), (bad, None)])
+    good.install.assert_called_once_with('1.0.0')
+    bad.install.assert_called_once_with(None)
+
+
+@pytest.mark.skipif(sys.version_info[0] < 3,
+                    reason='versions are installed serially on python 2')
+def test_prefetch_versions_bounded():
+    """No more than MAX_PREFETCH_WORKERS versions are installed at once."""
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def install(_version):
+        """Record the number of installs running at the same time."""
+        with lock:
+            active.append(True)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+
+    managers = [MagicMock(path=str(i)) for i in range(6)]
+    for manager in managers:
+        manager.install.side_effect = install
+    with patch(MODULE + '.MAX_PREFETCH_WORKERS', 2):
+        prefetch_versions([(manager, None) for manager in managers])
+    assert max(peak) == 2
+    for manager in managers:
+        manager.install.assert_called_once_with(None)
@@ -0,0 +1,75 @@
+"""Tests for runway/env_mgr/tfenv.py."""
+import json
+import os
+import time
+
+import pytest
+import requests
+from mock import MagicMock, patch
+
+from runway.env_mgr.tfenv import (TF_RELEASES_CACHE_FILENAME,
+                                  get_required_version, get_tf_releases)
+
+MODULE = 'runway.env_mgr.tfenv'
+
+
+class TestGetTfReleases(object):
+    """Test get_tf_releases."""
+
+    @staticmethod
+    def write_cache(cache_dir, versions, age):
+        """Write a cached list of releases."""
+        cache_dir.join(TF_RELEASES_CACHE_FILENAME).write(json.dumps(
+            {'time': time.time() - age, 'versions': versions}
+        ))
+
+    @patch(MODULE + '.requests.get')
+    def test_cached(self, mock_get, tmpdir):
+        """The list is downloaded again once it expires."""
+        mock_get.return_value = MagicMock(text=json.dumps(
+            {'terraform': {'versions': {'0.12.1': {}, '0.12.10': {},
+                                        '0.13.0-beta1': {}}}}
+        ))
+        assert get_tf_releases(str(tmpdir)) == ['0.13.0-beta1', '0.12.10',
+                                                '0.12.1']
+        assert get_tf_releases(str(tmpdir)) == ['0.13.0-beta1', '0.12.10',
+                                                '0.12.1']
+        mock_get.assert_called_once()
+
+        self.write_cache(tmpdir, ['0.12.0'], 7200)
+        assert get_tf_releases(str(tmpdir))[0] == '0.13.0-beta1'
+
+    @patch(MODULE + '.requests.get')
+    def test_offline(self, mock_get, tmpdir):
+        """The cached list is used when offline or the site is down."""
+        self.write_cache(tmpdir, ['0.12.0'], 7200)
+        with patch.dict(os.environ, {'RUNWAY_OFFLINE': 'true'}):
+            assert get_tf_releases(str(tmpdir)) == ['0.12.0']
+            mock_get.assert_not_called()
+            with pytest.raises(SystemExit):
+                get_tf_releases(str(tmpdir.join('empty')))
+
+        mock_get.side_effect = requests.exceptions.ConnectionError
+        assert get_tf_releases(str(tmpdir)) == ['0.12.0']
+
+
+class TestGetRequiredVersion(object):
+    """Test get_required_version."""
+
+    @patch(MODULE + '.hcl.load')
+    def test_cached(self, mock_load, tmpdir):
+        """Files are only parsed again after they change."""
+        mock_load.return_value = {
+            'terraform': {'required_version': '>= 0.12.0'}
+        }
+        module = tmpdir.join('module')
+        module.join('main.tf').write('', ensure=True)
+        cache_dir = str(tmpdir.join('cache').ensure(dir=True))
+
+        assert get_required_version(str(module), cache_dir) == '>= 0.12.0'
+        assert get_required_version(str(module), cache_dir) == '>= 0.12.0'
+        mock_load.assert_called_once()
+
+        module.join('main.tf').write('changed')
+        mock_load.return_value = {}
+        assert get_required_version(str(module), cache_dir) == ''
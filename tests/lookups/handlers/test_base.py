@@ -36,6 +36,14 @@ class TestLookupHandler(TestCase):
         self.assertEqual(result_query, expected_query)
         self.assertEqual(result_args, expected_args)
 
+    def test_parse_args_cached(self):
+        """Cached args should not be modified by the caller."""
+        _, result_args = LookupHandler.parse('my_query::key1=val1, key2=val2')
+        result_args.pop('key1')
+        _, result_args = LookupHandler.parse('my_query::key1=val1, key2=val2')
+
+        self.assertEqual(result_args, {'key1': 'val1', 'key2': 'val2'})
+
     def test_transform_bool_to_bool(self):
         """Bool should be returned as is."""
         result_true = LookupHandler.transform(True, to_type='bool')
@@ -0,0 +1,170 @@
+"""Tests for cloudformation module."""
+import logging
+import os
+import sys
+
+import pytest
+from mock import MagicMock, patch
+
+from runway.cfngin.lookups.registry import (CFNGIN_LOOKUP_HANDLERS,
+                                            register_lookup_handler)
+from runway.cfngin.providers.aws.default import get_output_store
+from runway.context import Context
+from runway.module.cloudformation import (CloudFormation,
+                                          run_stacker_in_process)
+from runway.util import WORKER_THREAD
+
+MODULE = 'runway.module.cloudformation'
+
+
+class TestRunStackerInProcess(object):
+    """Test run_stacker_in_process."""
+
+    @patch(MODULE + '.Stacker')
+    def test_environment(self, mock_stacker, tmpdir):
+        """Run uses the provided environment & directory then restores them."""
+        seen = {}
+
+        def run(_args):
+            seen['env'] = dict(os.environ)
+            seen['argv'] = list(sys.argv)
+            seen['cwd'] = os.getcwd()
+
+        mock_stacker.return_value.parse_args.return_value.run = run
+        saved_environ = dict(os.environ)
+        saved_handlers = list(logging.root.handlers)
+
+        saved_cwd = os.getcwd()
+        run_stacker_in_process(['build', 'test.yml'], {'FOO': 'bar'},
+                               str(tmpdir))
+
+        assert seen['env'] == {'FOO': 'bar'}
+        assert seen['cwd'] == str(tmpdir)
+        assert os.getcwd() == saved_cwd
+        assert seen['argv'] == ['stacker', 'build', 'test.yml']
+        mock_stacker.return_value.parse_args.assert_called_once_with(
+            ['build', 'test.yml']
+        )
+        assert dict(os.environ) == saved_environ
+        assert logging.root.handlers == saved_handlers
+
+    @patch(MODULE + '.Stacker')
+    def test_system_exit(self, mock_stacker):
+        """A successful exit is ignored, an unsuccessful exit is raised."""
+        mock_run = MagicMock(side_effect=SystemExit(0))
+        mock_stacker.return_value.parse_args.return_value.run = mock_run
+        run_stacker_in_process(['build'], dict(os.environ))
+
+        mock_run.side_effect = SystemExit(2)
+        with pytest.raises(SystemExit) as excinfo:
+            run_stacker_in_process(['build'], dict(os.environ))
+        assert excinfo.value.code == 2
+
+    @patch(MODULE + '.Stacker')
+    def test_sys_path(self, mock_stacker, tmpdir):
+        """Modules imported from an added sys.path entry are removed."""
+        tmpdir.join('cfn_inproc_blueprint.py').write('VALUE = 1\n')
+
+        def run(_args):
+            sys.path.append(str(tmpdir))
+            __import__('cfn_inproc_blueprint')
+
+        mock_stacker.return_value.parse_args.return_value.run = run
+        saved_path = list(sys.path)
+
+        run_stacker_in_process(['build'], dict(os.environ))
+
+        assert sys.path == saved_path
+        assert 'cfn_inproc_blueprint' not in sys.modules
+
+    @patch(MODULE + '.Stacker')
+    def test_shared_state(self, mock_stacker):
+        """Lookups, the runway log level & stack outputs don't leak."""
+        runway_logger = logging.getLogger('runway')
+        saved_level = runway_logger.level
+        saved_lookups = dict(CFNGIN_LOOKUP_HANDLERS)
+
+        def run(_args):
+            runway_logger.setLevel(logging.DEBUG
+                                   if saved_level != logging.DEBUG
+                                   else logging.INFO)
+            register_lookup_handler('inproc_test', MagicMock)
+            CFNGIN_LOOKUP_HANDLERS.pop('output')
+            get_output_store('us-east-1')['stack'] = {'VpcId': 'vpc-1'}
+
+        mock_stacker.return_value.parse_args.return_value.run = run
+        run_stacker_in_process(['build'], dict(os.environ))
+
+        assert runway_logger.level == saved_level
+        assert CFNGIN_LOOKUP_HANDLERS == saved_lookups
+        assert 'stack' not in get_output_store('us-east-1')
+
+
+class TestCloudFormation(object):
+    """Test CloudFormation module."""
+
+    @patch(MODULE + '.run_module_command')
+    @patch(MODULE + '.run_stacker_in_process')
+    def test_execute_stacker_cmd(self, mock_in_process, mock_command):
+        """In-process by default, child process with process_isolation."""
+        context = Context(env_name='test', env_region='us-east-1',
+                          env_root='./')
+        module = CloudFormation(context, './')
+        module.execute_stacker_cmd(['build', 'test.yml'])
+        mock_in_process.assert_called_once_with(['build', 'test.yml'],
+                                                context.env_vars, './')
+        mock_command.assert_not_called()
+
+        mock_in_process.reset_mock()
+        module = CloudFormation(context, './',
+                                {'options': {'process_isolation': True}})
+        module.execute_stacker_cmd(['build', 'test.yml'])
+        mock_in_process.assert_not_called()
+        mock_command.assert_called_once()
+        assert mock_command.call_args[1]['env_vars'] == context.env_vars
+        assert mock_command.call_args[1]['cwd'] == './'
+
+    @patch(MODULE + '.run_module_command')
+    @patch(MODULE + '.run_stacker_in_process')
+    def test_execute_stacker_cmd_worker_thread(self, mock_in_process,
+                                               mock_command):
+        """Worker threads never swap the state of the process."""
+        context = Context(env_name='test', env_region='us-east-1',
+                          env_root='./')
+        module = CloudFormation(context, './')
+        WORKER_THREAD.active = True
+        try:
+            module.execute_stacker_cmd(['build', 'test.yml'])
+        finally:
+            WORKER_THREAD.active = False
+        mock_in_process.assert_not_called()
+        mock_command.assert_called_once()
+        assert mock_command.call_args[1]['env_vars'] == context.env_vars
+
+    @patch(MODULE + '.CloudFormation.execute_stacker_cmd')
+    def test_run_stacker_merge_configs(self, mock_execute, tmpdir):
+        """With merge_configs, all configs are run as a single command."""
+        for name in ['01-network.yaml', '02-app.yaml', 'test.env',
+                     'runway.module.yml']:
+            tmpdir.join(name).write('namespace: test\n')
+        context = Context(env_name='test', env_region='us-east-1',
+                          env_root='./')
+        context.env_vars.pop('CI', None)
+        context.env_vars.pop('DEBUG', None)
+        module = CloudFormation(context, str(tmpdir),
+                                {'environment': False,
+                                 'options': {'merge_configs': True},
+                                 'parameters': {}})
+        module.run_stacker('build')
+        mock_execute.assert_called_once_with(
+            ['build', '--merge-config', '02-app.yaml',
+             '--region=us-east-1', '--interactive', 'test.env',
+             '01-network.yaml']
+        )
+
+        mock_execute.reset_mock()
+        module.run_stacker('destroy')
+        mock_execute.assert_called_once_with(
+            ['destroy', '--merge-config', '01-network.yaml',
+             '--region=us-east-1', '--force', 'test.env', '02-app.yaml']
+        )
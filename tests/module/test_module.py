@@ -0,0 +1,94 @@
+"""Tests for runway/module/__init__.py."""
+import json
+
+from mock import patch
+
+from runway.context import Context
+from runway.module import (NPM_BIN, NPM_INSTALL_STAMP_FILENAME, NPX_BIN,
+                           find_node_bin, generate_node_command,
+                           get_npm_probe, run_npm_install)
+
+MODULE = 'runway.module'
+
+
+@patch(MODULE + '.subprocess.check_output')
+def test_get_npm_probe(mock_output):
+    """Each command is only run once."""
+    mock_output.return_value = b'6.13.4\n'
+    with patch.dict(MODULE + '.NPM_PROBES', clear=True):
+        assert get_npm_probe([NPM_BIN, '--version']) == (0, '6.13.4')
+        assert get_npm_probe([NPM_BIN, '--version']) == (0, '6.13.4')
+    mock_output.assert_called_once()
+
+
+@patch(MODULE + '.platform.system', return_value='Linux')
+def test_find_node_bin(_mock_system, tmpdir):
+    """Executables are found in the module or a parent directory."""
+    module_dir = tmpdir.mkdir('app').mkdir('module')
+    assert find_node_bin('sls', str(module_dir)) is None
+
+    hoisted = tmpdir.join('app', 'node_modules', '.bin', 'sls')
+    hoisted.write('', ensure=True)
+    assert find_node_bin('sls', str(module_dir)) == str(hoisted)
+
+    local = module_dir.join('node_modules', '.bin', 'sls')
+    local.write('', ensure=True)
+    assert find_node_bin('sls', str(module_dir)) == str(local)
+
+
+@patch(MODULE + '.platform.system', return_value='Linux')
+@patch(MODULE + '.which', return_value=NPX_BIN)
+def test_generate_node_command(_mock_which, _mock_system, tmpdir):
+    """Installed executables are run directly instead of through npx."""
+    assert generate_node_command('sls', ['deploy'], str(tmpdir)) == [
+        NPX_BIN, '-c', "''sls deploy''"
+    ]
+    bin_path = tmpdir.join('node_modules', '.bin', 'sls')
+    bin_path.write('', ensure=True)
+    assert generate_node_command('sls', ['deploy'], str(tmpdir)) == [
+        str(bin_path), 'deploy'
+    ]
+
+
+class TestRunNpmInstall(object):
+    """Test run_npm_install."""
+
+    @patch(MODULE + '.use_npm_ci')
+    @patch(MODULE + '.get_npm_probe')
+    @patch(MODULE + '.subprocess.check_call')
+    def test_stamp(self, mock_call, mock_probe, mock_use_npm_ci, tmpdir):
+        """Installation is skipped while the stamp matches."""
+        def install(cmd_list, cwd, **_kwargs):
+            """Create node_modules like npm."""
+            tmpdir.join('node_modules').ensure(dir=True)
+            calls.append((cmd_list, cwd))
+
+        calls = []
+        mock_call.side_effect = install
+        mock_probe.return_value = (0, 'v1')
+        mock_use_npm_ci.return_value = True
+        tmpdir.join('package.json').write('{}')
+        tmpdir.join('package-lock.json').write('{}')
+        context = Context(env_name='test', env_region='us-east-1',
+                          env_root=str(tmpdir), env_vars={'CI': '1'})
+        options = {'options': {'shared_npm_cache': True}}
+
+        run_npm_install(str(tmpdir), options, context)
+        assert calls == [([NPM_BIN, 'ci', '--prefer-offline'], str(tmpdir))]
+        assert mock_call.call_args[1]['env']['npm_config_cache'] == \
+            str(tmpdir.join('.runway_cache', 'npm'))
+        stamp = json.loads(
+            tmpdir.join('node_modules', NPM_INSTALL_STAMP_FILENAME).read()
+        )
+        assert stamp['npm'] == 'v1'
+
+        run_npm_install(str(tmpdir), options, context)
+        assert len(calls) == 1
+
+        tmpdir.join('package-lock.json').write('{"changed": true}')
+        run_npm_install(str(tmpdir), options, context)
+        assert len(calls) == 2
+
+        mock_probe.return_value = (0, 'v2')
+        run_npm_install(str(tmpdir), options, context)
+        assert len(calls) == 3
@@ -0,0 +1,105 @@
+"""Tests for runway/module/serverless.py."""
+from mock import patch
+
+from runway.context import Context
+from runway.module.serverless import (get_sls_config, get_sls_config_key,
+                                      get_src_hash)
+
+MODULE = 'runway.module.serverless'
+
+
+class TestSlsConfigCache(object):
+    """Test caching the resolved config."""
+
+    @staticmethod
+    def get_context(tmpdir, region='us-east-1'):
+        """Return a context for the module."""
+        return Context(env_name='test', env_region=region,
+                       env_root=str(tmpdir), env_vars={'FOO': 'foo'})
+
+    def test_key(self, tmpdir):
+        """Included files & referenced environment variables are hashed."""
+        module_dir = tmpdir.mkdir('app.sls')
+        module_dir.join('serverless.yml').write(
+            'service: app\n'
+            'custom: ${file(./custom.yml)}\n'
+            'provider:\n  environment:\n    FOO: ${env:FOO}\n'
+        )
+        module_dir.join('custom.yml').write('a: 1\n')
+        path = str(module_dir)
+        key = get_sls_config_key(path, 'test', 'us-east-1', {'FOO': 'foo'})
+
+        assert key == get_sls_config_key(path, 'test', 'us-east-1',
+                                         {'FOO': 'foo', 'BAR': 'bar'})
+        assert key != get_sls_config_key(path, 'test', 'us-west-2',
+                                         {'FOO': 'foo'})
+        assert key != get_sls_config_key(path, 'test', 'us-east-1',
+                                         {'FOO': 'changed'})
+        module_dir.join('custom.yml').write('a: 2\n')
+        assert key != get_sls_config_key(path, 'test', 'us-east-1',
+                                         {'FOO': 'foo'})
+        module_dir.join('custom.yml').write('a: 1\n')
+        module_dir.join('config-test.json').write('{}')
+        assert key != get_sls_config_key(path, 'test', 'us-east-1',
+                                         {'FOO': 'foo'})
+
+    def test_key_not_cacheable(self, tmpdir):
+        """Configs with inputs that can't be found are not cached."""
+        module_dir = tmpdir.mkdir('app.sls')
+        module_dir.join('serverless.yml').write(
+            'service: app\ncustom: ${file(./${opt:stage}.yml)}\n'
+        )
+        assert not get_sls_config_key(str(module_dir), 'test', 'us-east-1',
+                                      {})
+        module_dir.join('serverless.yml').remove()
+        module_dir.join('serverless.js').write('module.exports = {};')
+        assert not get_sls_config_key(str(module_dir), 'test', 'us-east-1',
+                                      {})
+
+    @patch(MODULE + '.run_sls_print')
+    def test_get_sls_config(self, mock_print, tmpdir):
+        """sls print is only run when the inputs of the config change."""
+        module_dir = tmpdir.mkdir('app.sls')
+        module_dir.join('serverless.yml').write('service: app\n')
+        mock_print.return_value = {
+            'service': 'app',
+            'provider': {'environment': {'SECRET': 'value'}},
+            'functions': {'hello': {'handler': 'src/handler.hello',
+                                    'environment': {'SECRET': 'value'}}}
+        }
+        expected = {'service': 'app',
+                    'functions': {'hello': {'handler': 'src/handler.hello'}}}
+        context = self.get_context(tmpdir)
+
+        assert get_sls_config(['deploy'], context, str(module_dir)) == expected
+        assert get_sls_config(['deploy'], context, str(module_dir)) == expected
+        assert mock_print.call_count == 1
+        assert 'value' not in ''.join(
+            cache_file.read()
+            for cache_file in tmpdir.join('.runway_cache',
+                                          'serverless').listdir()
+        )
+
+        get_sls_config(['deploy'], self.get_context(tmpdir, 'us-west-2'),
+                       str(module_dir))
+        assert mock_print.call_count == 2
+        module_dir.join('serverless.yml').write('service: changed\n')
+        get_sls_config(['deploy'], context, str(module_dir))
+        assert mock_print.call_count == 3
+
+
+def test_get_src_hash(tmpdir):
+    """Functions packaged individually get the hash of their directory."""
+    tmpdir.join('one', 'handler.py').write('one', ensure=True)
+    tmpdir.join('two', 'handler.py').write('two', ensure=True)
+    sls_config = {
+        'service': 'app',
+        'package': {'individually': True},
+        'functions': {'a': {'handler': 'one/handler.a'},
+                      'b': {'handler': 'one/handler.b'},
+                      'c': {'handler': 'two/handler.c'}}
+    }
+    hashes = get_src_hash(sls_config, str(tmpdir))
+
+    assert sorted(hashes) == ['a', 'b', 'c']
+    assert hashes['a'] == hashes['b'] != hashes['c']
@@ -1,7 +1,21 @@
 """Tests for terraform module."""
+import json
+import os
 import unittest
 
-from runway.module.terraform import update_env_vars_with_tf_var_values
+from mock import patch
+
+from runway.context import Context
+from runway.module.terraform import (INIT_STAMP_FILENAME, SavedPlan,
+                                     Terraform,
+                                     get_init_hashes, get_required_providers,
+                                     is_provider_cached, link_plugin_cache,
+                                     prewarm_plugin_cache, providers_changed,
+                                     run_terraform_init, version_matches,
+                                     write_init_stamp,
+                                     update_env_vars_with_tf_var_values)
+
+MODULE = 'runway.module.terraform'
 
 
 class TerraformFunctionTester(unittest.TestCase):
@@ -28,3 +42,312 @@ class TerraformFunctionTester(unittest.TestCase):
         self.assertTrue(env_vars['TF_VAR_list'] == '[test1,test2,test3]')
         self.assertRegexpMatches(env_vars['TF_VAR_map'], r'one = "two"')  # noqa pylint: disable=deprecated-method
         self.assertRegexpMatches(env_vars['TF_VAR_map'], r'three = "four"')  # noqa pylint: disable=deprecated-method
+
+
+class TestInitStamp(object):
+    """Test skipping init, workspace & get steps using the init stamp."""
+
+    @staticmethod
+    def write_config(path, provider_region='us-east-1'):
+        """Write a configuration with a remote & local module."""
+        path.join('main.tf').write(
+            'provider "aws" { region = "%s" }\n'
+            'module "remote" { source = "git::https://example.com/x.git" }\n'
+            'module "local" { source = "./modules/local" }\n'
+            'resource "null_resource" "x" {}\n' % provider_region
+        )
+        path.join('modules', 'local', 'main.tf').write(
+            'resource "null_resource" "y" {}\n', ensure=True
+        )
+
+    def test_get_init_hashes(self, tmpdir):
+        """Only blocks used by init & get change the hashes."""
+        self.write_config(tmpdir)
+        backend = {'filename': 'backend.tfvars'}
+        original = get_init_hashes('terraform', str(tmpdir), backend)
+
+        tmpdir.join('main.tf').write('resource "null_resource" "z" {}\n',
+                                     mode='a')
+        assert get_init_hashes('terraform', str(tmpdir), backend) == original
+
+        tmpdir.join('modules', 'local', 'main.tf').write(
+            'module "child" { source = "../child" }\n', mode='a'
+        )
+        changed = get_init_hashes('terraform', str(tmpdir), backend)
+        assert changed['init'] != original['init']
+        assert changed['modules'] != original['modules']
+
+        self.write_config(tmpdir, provider_region='us-west-2')
+        tmpdir.join('backend.tfvars').write('bucket = "test"\n')
+        changed = get_init_hashes('terraform', str(tmpdir), backend)
+        assert changed['init'] != original['init']
+        assert changed['modules'] == original['modules']
+
+    @patch(MODULE + '.subprocess.check_output')
+    @patch(MODULE + '.run_module_command')
+    @patch(MODULE + '.run_terraform_init')
+    @patch(MODULE + '.which')
+    def test_run_terraform(self, mock_which, mock_init, mock_command,
+                           mock_output, tmpdir):
+        """Steps are skipped when the module state is current."""
+        def init(**kwargs):
+            """Create the data directory like terraform init."""
+            tmpdir.join('.terraform', 'environment').write(
+                workspace['name'], ensure=True
+            )
+
+        def select_workspace(cmd_list, **_kwargs):
+            """Select a workspace like terraform workspace."""
+            if cmd_list[1] == 'workspace':
+                workspace['name'] = cmd_list[3]
+                tmpdir.join('.terraform', 'environment').write(cmd_list[3])
+
+        workspace = {'name': 'default'}
+        mock_which.return_value = '/bin/terraform'
+        mock_init.side_effect = init
+        mock_command.side_effect = select_workspace
+        mock_output.side_effect = lambda cmd, **_: (
+            workspace['name'].encode() if cmd[2] == 'show' else b'* default\n'
+        )
+        self.write_config(tmpdir)
+        tmpdir.join('test.tfvars').write('foo = "bar"\n')
+        context = Context(env_name='test', env_region='us-east-1',
+                          env_root=str(tmpdir))
+        for key in ['CI', 'TF_DATA_DIR', 'TF_WORKSPACE']:
+            context.env_vars.pop(key, None)
+
+        def run(options=None):
+            """Run terraform plan & return the commands that were run."""
+            mock_init.reset_mock()
+            mock_command.reset_mock()
+            mock_output.reset_mock()
+            Terraform(context, str(tmpdir),
+                      {'options': options or {},
+                       'parameters': {}}).run_terraform('plan')
+            return (mock_init.call_count,
+                    [call[1]['cmd_list'][1]
+                     for call in mock_command.call_args_list],
+                    mock_output.call_count)
+
+        assert run() == (2, ['workspace', 'get', 'plan'], 2)
+        assert tmpdir.join('.terraform', INIT_STAMP_FILENAME).exists()
+        assert run() == (0, ['plan'], 0)
+
+        self.write_config(tmpdir, provider_region='us-west-2')
+        assert run() == (1, ['plan'], 0)
+        assert run({'terraform_force_init': True}) == (1, ['get', 'plan'], 1)
+
+
+class TestPluginCache(object):
+    """Test the shared plugin cache."""
+
+    def test_link_plugin_cache(self, tmpdir):
+        """Missing files are linked and existing files are kept."""
+        source = tmpdir.join('source')
+        source.join('linux_amd64', 'terraform-provider-aws').write(
+            'new', ensure=True
+        )
+        source.join('linux_amd64', 'terraform-provider-null').write(
+            'new', ensure=True
+        )
+        source.join('.prewarm-123', 'main.tf.json').write('{}', ensure=True)
+        target = tmpdir.join('target')
+        target.join('linux_amd64', 'terraform-provider-null').write(
+            'old', ensure=True
+        )
+
+        link_plugin_cache(str(source), str(target))
+        assert target.join('linux_amd64',
+                           'terraform-provider-aws').read() == 'new'
+        assert target.join('linux_amd64',
+                           'terraform-provider-null').read() == 'old'
+        assert not target.join('.prewarm-123').exists()
+        assert [i.basename for i in target.join('linux_amd64').listdir()
+                if i.ext == '.tmp'] == []
+
+    def test_get_required_providers(self, tmpdir):
+        """Requirements are found in required_providers & provider blocks."""
+        tmpdir.join('main.tf').write(
+            'provider "aws" { version = "~> 2.0" }\n'
+            'provider "null" {}\n'
+            'provider "random" { version = "~> 2.0" }\n'
+            'terraform { required_providers { random = "~> 3.0" } }\n'
+        )
+        assert get_required_providers(str(tmpdir)) == {
+            'aws': '~> 2.0', 'null': None, 'random': '~> 3.0'
+        }
+
+    @patch(MODULE + '.subprocess.check_output')
+    def test_prewarm_plugin_cache(self, mock_output, tmpdir):
+        """Each provider is installed once and linked into the cache."""
+        def init(cmd, cwd, env, **_kwargs):
+            """Install the provider of the configuration like init."""
+            with open(os.path.join(cwd, 'main.tf.json')) as stream:
+                name = list(json.load(stream)['provider'])[0]
+            with open(os.path.join(env['TF_PLUGIN_CACHE_DIR'],
+                                   'terraform-provider-' + name), 'w'):
+                pass
+            return b''
+
+        mock_output.side_effect = init
+        for name in ['one', 'two']:
+            tmpdir.join(name, 'main.tf').write(
+                'provider "aws" {}\nprovider "%s" {}\n' % name, ensure=True
+            )
+        cache_dir = tmpdir.join('cache')
+        prewarm_plugin_cache(
+            [('terraform', str(tmpdir.join(name))) for name in ['one', 'two']],
+            str(cache_dir), {}
+        )
+        assert mock_output.call_count == 3
+        assert sorted(i.basename for i in cache_dir.listdir()) == [
+            'terraform-provider-aws', 'terraform-provider-one',
+            'terraform-provider-two'
+        ]
+
+        prewarm_plugin_cache(
+            [('terraform', str(tmpdir.join(name))) for name in ['one', 'two']],
+            str(cache_dir), {}
+        )
+        assert mock_output.call_count == 3
+
+    @patch(MODULE + '.subprocess.check_output')
+    def test_prewarm_plugin_cache_offline(self, mock_output, tmpdir,
+                                          monkeypatch):
+        """Nothing is downloaded when Runway is offline."""
+        monkeypatch.setenv('RUNWAY_OFFLINE', '1')
+        tmpdir.join('main.tf').write('provider "aws" {}\n')
+        prewarm_plugin_cache([('terraform', str(tmpdir))],
+                             str(tmpdir.join('cache')), {})
+        mock_output.assert_not_called()
+
+    def test_is_provider_cached(self, tmpdir):
+        """Cached versions are found in both plugin cache layouts."""
+        tmpdir.join('registry.terraform.io', 'hashicorp', 'aws', '3.1.0',
+                    'linux_amd64', 'terraform-provider-aws_v3.1.0_x5').write(
+                        '', ensure=True)
+        tmpdir.join('linux_amd64', 'terraform-provider-null_v2.1.2_x4').write(
+            '', ensure=True)
+        cache_dir = str(tmpdir)
+
+        assert is_provider_cached(cache_dir, 'aws', None)
+        assert is_provider_cached(cache_dir, 'aws', '~> 3.0')
+        assert is_provider_cached(cache_dir, 'aws', {'source': 'hashicorp/aws',
+                                                     'version': '>= 3.1'})
+        assert not is_provider_cached(cache_dir, 'aws', '~> 2.0')
+        assert is_provider_cached(cache_dir, 'null', '2.1.2')
+        assert not is_provider_cached(cache_dir, 'null', '> 2.1.2')
+        assert not is_provider_cached(cache_dir, 'random', None)
+
+    def test_version_matches(self):
+        """Terraform version constraints are supported."""
+        assert version_matches('2.1.0', None)
+        assert version_matches('2.1.0', '>= 2.0, < 3.0')
+        assert not version_matches('3.0.0', '>= 2.0, < 3.0')
+        assert version_matches('2.9.0', '~> 2.1')
+        assert not version_matches('3.0.0', '~> 2.1')
+        assert version_matches('2.1.5', '~> 2.1.0')
+        assert not version_matches('2.2.0', '~> 2.1.0')
+        assert not version_matches('2.1.0', '!= 2.1.0')
+        assert not version_matches(None, '2.1.0')
+
+    def test_providers_changed(self, tmpdir):
+        """Modules are checked against the stamp of their last init."""
+        tmpdir.join('main.tf').write('provider "aws" {}\n')
+        path = str(tmpdir)
+        assert providers_changed('terraform', path, {}, {})
+
+        tmpdir.mkdir('.terraform')
+        write_init_stamp(path, get_init_hashes('terraform', path,
+                                               {'config': {'bucket': 'a'}}))
+        assert not providers_changed('terraform', path, {}, {})
+        assert providers_changed('terraform', path,
+                                 {'terraform_force_init': True}, {})
+        assert providers_changed('terraform', path, {}, {'TF_DATA_DIR': 'x'})
+
+        tmpdir.join('main.tf').write('provider "null" {}\n')
+        assert providers_changed('terraform', path, {}, {})
+
+    @patch(MODULE + '.run_module_command')
+    def test_run_terraform_init(self, mock_command, tmpdir):
+        """Init populates a view of the cache that is linked back."""
+        def init(env_vars, **_kwargs):
+            """Install a provider like init."""
+            view_dir = env_vars['TF_PLUGIN_CACHE_DIR']
+            assert os.path.isfile(os.path.join(view_dir, 'cached'))
+            with open(os.path.join(view_dir, 'downloaded'), 'w'):
+                pass
+
+        mock_command.side_effect = init
+        cache_dir = tmpdir.join('cache')
+        cache_dir.join('cached').write('', ensure=True)
+        run_terraform_init('terraform', str(tmpdir.join('module')),
+                           {'filename': 'backend.tfvars'}, 'test',
+                           'us-east-1', {}, plugin_cache_dir=str(cache_dir))
+        assert cache_dir.join('downloaded').exists()
+
+
+class TestSavedPlan(object):
+    """Test reusing plans saved by runway plan."""
+
+    @patch(MODULE + '.get_state_version')
+    @patch(MODULE + '.subprocess.check_output')
+    @patch(MODULE + '.run_module_command')
+    @patch(MODULE + '.run_terraform_init')
+    @patch(MODULE + '.which')
+    def test_run_terraform(self, mock_which, _mock_init, mock_command,
+                           mock_output, mock_state, tmpdir):
+        """A saved plan is applied while the inputs & state are unchanged."""
+        def run_command(cmd_list, **_kwargs):
+            """Write the plan like terraform plan -out."""
+            for arg in cmd_list:
+                if arg.startswith('-out='):
+                    with open(arg[5:], 'w') as stream:
+                        stream.write('plan')
+
+        mock_which.return_value = '/bin/terraform'
+        mock_command.side_effect = run_command
+        mock_output.return_value = b'test'
+        mock_state.return_value = [1, 'lineage']
+        tmpdir.join('main.tf').write('resource "null_resource" "x" {}\n')
+        tmpdir.join('test.tfvars').write('foo = "bar"\n')
+        tmpdir.join('.terraform', 'environment').write('test', ensure=True)
+        context = Context(env_name='test', env_region='us-east-1',
+                          env_root=str(tmpdir))
+        for key in ['CI', 'TF_DATA_DIR', 'TF_PLUGIN_CACHE_DIR',
+                    'TF_WORKSPACE']:
+            context.env_vars.pop(key, None)
+        module = Terraform(context, str(tmpdir),
+                           {'options': {'terraform_save_plan': True},
+                            'parameters': {}})
+        plan = SavedPlan(str(tmpdir), 'test', 'us-east-1')
+
+        def last_command():
+            """Return the last terraform command that was run."""
+            return mock_command.call_args[1]['cmd_list'][1:]
+
+        # without CI, apply asks for approval instead of using the plan
+        module.run_terraform('plan')
+        assert last_command() == ['plan', '-var-file=test.tfvars',
+                                  '-out=' + plan.plan_path]
+        module.run_terraform('apply')
+        assert last_command() == ['apply', '-auto-approve=false',
+                                  '-var-file=test.tfvars']
+
+        context.env_vars['CI'] = '1'
+        module.run_terraform('plan')
+        module.run_terraform('apply')
+        assert last_command() == ['apply', plan.plan_path]
+        assert not os.path.exists(plan.plan_path)
+
+        module.run_terraform('plan')
+        mock_state.return_value = [2, 'lineage']
+        module.run_terraform('apply')
+        assert last_command() == ['apply', '-auto-approve=true',
+                                  '-var-file=test.tfvars']
+
+        mock_state.return_value = [1, 'lineage']
+        module.run_terraform('plan')
+        tmpdir.join('test.tfvars').write('foo = "baz"\n')
+        module.run_terraform('apply')
+        assert last_command()[0:2] == ['apply', '-auto-approve=true']
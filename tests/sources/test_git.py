@@ -1,8 +1,15 @@
 """Tests for the Source type object."""
 import logging
+import os
+import shutil
+import tempfile
 import unittest
 
-from runway.sources.git import Git
+import mock
+from git import Actor, Repo
+
+from runway.sources import git
+from runway.sources.git import Git, get_mirror_path, resolve_git_ref
 
 LOGGER = logging.getLogger('runway')
 
@@ -19,6 +26,120 @@ class GitTester(unittest.TestCase):
         }).fetch()
         self.assertEqual(fetched, '/')
 
+    def test_fetch_from_mirror(self):
+        """Ensure refs are checked out from a mirror of the remote repo."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        remote_path = os.path.join(tmp_dir, 'remote')
+        cache_dir = os.path.join(tmp_dir, 'cache')
+        os.mkdir(cache_dir)
+
+        remote = Repo.init(remote_path)
+        commits = []
+        for name in ['first', 'second']:
+            for directory in ['module', 'other']:
+                if not os.path.isdir(os.path.join(remote_path, directory)):
+                    os.mkdir(os.path.join(remote_path, directory))
+                with open(os.path.join(remote_path, directory, name),
+                          'w') as file_:
+                    file_.write(name)
+                remote.index.add([os.path.join(directory, name)])
+            commits.append(remote.index.commit(
+                name, author=Actor('test', 'test@example.com'),
+                committer=Actor('test', 'test@example.com')
+            ).hexsha)
+
+            fetched = Git(uri=remote_path, location='module',
+                          options={'commit': commits[-1],
+                                   'sparse': 'true',
+                                   'shallow': 'true'},
+                          cache_dir=cache_dir).fetch()
+            self.assertEqual(sorted(os.listdir(fetched)), sorted(
+                ['first', 'second'][:len(commits)]
+            ))
+            self.assertFalse(os.path.isdir(os.path.join(fetched, '..',
+                                                        'other')))
+
+        mirror = Repo(get_mirror_path(remote_path, cache_dir))
+        self.assertTrue(mirror.bare)
+        self.assertEqual(mirror.git.rev_parse('HEAD'), commits[-1])
+
+        fetched = Git(uri=remote_path, location='',
+                      options={'commit': commits[0]},
+                      cache_dir=cache_dir).fetch()
+        self.assertEqual(os.listdir(os.path.join(fetched, 'other')),
+                         ['first'])
+
+    def test_mirror_keeps_borrowed_objects(self):
+        """Ensure objects of deleted branches stay in the mirror."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        remote_path = os.path.join(tmp_dir, 'remote')
+        cache_dir = os.path.join(tmp_dir, 'cache')
+        os.mkdir(cache_dir)
+        remote = Repo.init(remote_path)
+        author = Actor('test', 'test@example.com')
+        with open(os.path.join(remote_path, 'file'), 'w') as file_:
+            file_.write('main')
+        remote.index.add(['file'])
+        remote.index.commit('main', author=author, committer=author)
+        remote.git.checkout('-b', 'feature')
+        with open(os.path.join(remote_path, 'file'), 'w') as file_:
+            file_.write('feature')
+        remote.index.add(['file'])
+        feature = remote.index.commit('feature', author=author,
+                                      committer=author).hexsha
+
+        fetched = Git(uri=remote_path, location='',
+                      options={'commit': feature},
+                      cache_dir=cache_dir).fetch()
+        remote.git.checkout('-')
+        remote.git.branch('-D', 'feature')
+        git.update_mirror(remote_path, get_mirror_path(remote_path,
+                                                       cache_dir))
+        mirror = Repo(get_mirror_path(remote_path, cache_dir))
+        self.assertEqual(mirror.git.config('gc.auto'), '0')
+        mirror.git.gc('--prune=now')
+
+        checkout = Repo(fetched)
+        self.assertEqual(checkout.git.cat_file('-t', feature), 'commit')
+        checkout.git.fsck()
+
+    def test_resolve_git_ref(self):
+        """Ensure resolved refs are cached with a TTL and used offline."""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        ls_remote = mock.MagicMock(side_effect=[b'1234', '5678'])
+
+        with mock.patch.dict(git.RESOLVED_REFS, clear=True), \
+                mock.patch.dict(os.environ, {git.GIT_REF_TTL_ENV_VAR: '0'}):
+            self.assertEqual(resolve_git_ref('git@foo', 'HEAD', cache_dir,
+                                             ls_remote), '1234')
+            # only resolved once per process
+            self.assertEqual(resolve_git_ref('git@foo', 'HEAD', cache_dir,
+                                             ls_remote), '1234')
+            ls_remote.assert_called_once_with('git@foo', 'HEAD')
+
+        with mock.patch.dict(git.RESOLVED_REFS, clear=True), \
+                mock.patch.dict(os.environ, {git.GIT_REF_TTL_ENV_VAR: '600'}):
+            self.assertEqual(resolve_git_ref('git@foo', 'HEAD', cache_dir,
+                                             ls_remote), '1234')
+            ls_remote.assert_called_once_with('git@foo', 'HEAD')
+
+        with mock.patch.dict(git.RESOLVED_REFS, clear=True):
+            self.assertEqual(resolve_git_ref('git@foo', 'HEAD', cache_dir,
+                                             ls_remote), '5678')
+            self.assertEqual(ls_remote.call_count, 2)
+
+        with mock.patch.dict(git.RESOLVED_REFS, clear=True), \
+                mock.patch.dict(os.environ, {git.OFFLINE_ENV_VAR: 'true'}):
+            self.assertEqual(resolve_git_ref('git@foo', 'HEAD', cache_dir,
+                                             ls_remote), '5678')
+            with self.assertRaises(ValueError):
+                resolve_git_ref('git@foo', 'refs/heads/other', cache_dir,
+                                ls_remote)
+            self.assertEqual(ls_remote.call_count, 2)
+
     def test_sanitize_git_path(self):
         """Ensure git path is property sanitized"""
         path = Git().sanitize_git_path('git://github.com/onicagroup/runway.git')
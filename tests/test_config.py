@@ -91,8 +91,8 @@ class TestDeploymentDefinition(object):
 class TestModuleDefinition(object):
     """Test ModuleDefinition."""
 
-    ATTRS = ['child_modules', '_class_path', '_env_vars', '_environments',
-             'name', '_options', '_path', 'tags']
+    ATTRS = ['child_modules', '_class_path', 'depends_on', '_env_vars',
+             '_environments', 'name', '_options', '_path', 'tags']
 
     def test_from_list(self, yaml_fixtures):
         """Test init of a module from a list."""
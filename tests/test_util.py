@@ -1,9 +1,16 @@
 """Test Runway utils."""
 # pylint: disable=no-self-use
 import os.path
+import pickle
 import string
+import sys
 
-from runway.util import MutableMap, load_object_from_string
+from mock import MagicMock, patch
+
+from runway.util import (LRUCache, MutableMap, file_lock, get_task_output,
+                         load_object_from_string, run_commands, task_output)
+
+MODULE = 'runway.util'
 
 VALUE = {
     'bool_val': False,
@@ -67,13 +74,78 @@ class TestMutableMap:
 
         mute_map.str_val = 'new_val'
 
-        assert mute_map.find('str_val') == VALUE['str_val']
+        assert mute_map.find('str_val') == 'new_val'
         assert mute_map.find('str_val', ignore_cache=True) == 'new_val'
 
         mute_map.clear_found_cache()
 
         assert mute_map.find('str_val') == 'new_val'
 
+    def test_find_nested(self):
+        """Validate `find` of nested and falsy values."""
+        mute_map = MutableMap(**VALUE)
+
+        assert mute_map.find('bool_val', 'default_val') is False
+        assert mute_map.find('nested_val.dict_val.test') == 'success'
+        assert mute_map.find('nested_val.dict_val').data == \
+            VALUE['nested_val']['dict_val']
+        assert mute_map.find('str_val.test', 'default_val') == 'default_val'
+        assert mute_map.find('nested_val.missing', 'default_val') == \
+            'default_val'
+
+        # writes to nested maps invalidate the index of the parent
+        mute_map.nested_val.dict_val['test'] = ''
+        assert mute_map.find('nested_val.dict_val.test', 'default_val') == ''
+        del mute_map['nested_val']
+        assert mute_map.find('nested_val.dict_val.test', 'default_val') == \
+            'default_val'
+
+    def test_find_index_per_map(self):
+        """Validate writes only invalidate the index of affected maps."""
+        mute_map = MutableMap(**VALUE)
+        other_map = MutableMap(**VALUE)
+        assert mute_map.find('nested_val.dict_val.test') == 'success'
+        index = mute_map._found_queries  # pylint: disable=protected-access
+
+        other_map.nested_val.dict_val['test'] = 'changed'
+        assert mute_map.find('nested_val.dict_val.test') == 'success'
+        assert mute_map._found_queries is index  # pylint: disable=protected-access
+
+        copied = pickle.loads(pickle.dumps(mute_map))
+        copied.nested_val.dict_val['test'] = 'changed'
+        assert copied.find('nested_val.dict_val.test') == 'changed'
+        assert mute_map.find('nested_val.dict_val.test') == 'success'
+
+    def test_keys(self):
+        """Validate find index bookkeeping is not one of the keys."""
+        mute_map = MutableMap()
+        mute_map['x'] = 1
+        mute_map['nested'] = {'y': 2}
+        assert mute_map.find('nested.y') == 2
+        mute_map['z'] = 3
+
+        assert len(mute_map) == 3
+        assert sorted(mute_map) == ['nested', 'x', 'z']
+        assert list(mute_map.nested) == ['y']
+        assert mute_map.data == {'nested': {'y': 2}, 'x': 1, 'z': 3}
+        assert len(pickle.loads(pickle.dumps(mute_map))) == 3
+
+    def test_find_large(self):
+        """Validate `find` against a map with 5k keys."""
+        value = {
+            'env{}'.format(env): {
+                'key{}'.format(key): '{}-{}'.format(env, key)
+                for key in range(500)
+            } for env in range(10)
+        }
+        mute_map = MutableMap(**value)
+
+        for env in range(10):
+            for key in range(500):
+                assert mute_map.find('env{}.key{}'.format(env, key)) == \
+                    '{}-{}'.format(env, key)
+        assert len(mute_map._found_queries) == 5010  # pylint: disable=protected-access
+
     def test_find_default(self):
         """Validate default value functionality."""
         mute_map = MutableMap(**VALUE)
@@ -84,6 +156,33 @@ class TestMutableMap:
             VALUE['str_val'], 'default should be ignored'
 
 
+def test_lru_cache():
+    """The least recently used item is removed when the cache is full."""
+    cache = LRUCache(maxsize=2)
+    cache['a'] = 1
+    cache['b'] = 2
+    assert cache.get('a') == 1
+    cache['c'] = 3
+    assert len(cache) == 2
+    assert 'b' not in cache
+    assert cache.get('a') == 1
+    assert cache.get('b', 'default') == 'default'
+
+
+def test_file_lock_windows(tmpdir):
+    """Locking is retried until it succeeds on windows."""
+    mock_msvcrt = MagicMock(LK_NBLCK='nb', LK_UNLCK='unlock')
+    mock_msvcrt.locking.side_effect = [OSError(), IOError(), None, None]
+    with patch(MODULE + '.fcntl', None), \
+            patch(MODULE + '.msvcrt', mock_msvcrt, create=True), \
+            patch(MODULE + '.FILE_LOCK_RETRY_INTERVAL', 0):
+        with file_lock(str(tmpdir.join('.lock'))):
+            assert mock_msvcrt.locking.call_count == 3
+    assert [i[0][1] for i in mock_msvcrt.locking.call_args_list] == [
+        'nb', 'nb', 'nb', 'unlock'
+    ]
+
+
 def test_load_object_from_string():
     """Test load object from string."""
     tests = (
@@ -93,3 +192,30 @@ def test_load_object_from_string():
     )
     for test in tests:
         assert load_object_from_string(test[0]) is test[1]
+
+
+def test_run_commands(tmpdir):
+    """Commands run in their directory without changing the current one."""
+    tmpdir.mkdir('sub')
+    cwd = os.getcwd()
+    run_commands([[sys.executable, '-c',
+                   'open("out.txt", "w").write("top")'],
+                  {'command': [sys.executable, '-c',
+                               'open("out.txt", "w").write("sub")'],
+                   'cwd': 'sub'}],
+                 str(tmpdir))
+    assert os.getcwd() == cwd
+    assert tmpdir.join('out.txt').read() == 'top'
+    assert tmpdir.join('sub', 'out.txt').read() == 'sub'
+
+
+def test_task_output(tmpdir):
+    """Commands of the current thread write to its task output."""
+    assert get_task_output() is None
+    with open(str(tmpdir.join('task.log')), 'w') as stream:
+        with task_output(stream):
+            assert get_task_output() is stream
+            run_commands([[sys.executable, '-c', 'print("from child")']],
+                         str(tmpdir))
+        assert get_task_output() is None
+    assert tmpdir.join('task.log').read().strip() == 'from child'
@@ -10,6 +10,7 @@ from runway.cfngin.exceptions import UnresolvedVariable
 from runway.cfngin.lookups import register_lookup_handler
 from runway.cfngin.stack import Stack
 from runway.util import MutableMap
+from runway import variables
 from runway.variables import Variable
 
 from .cfngin.factories import generate_definition
@@ -290,3 +291,27 @@ class TestRunwayVariables(TestCase):
 
         with self.assertRaises(UnresolvedVariable):
             print(var.value)
+
+    def test_value_parse_cached(self):
+        """Parsed values should be cached without sharing resolved state."""
+        first = Variable('test', 'the ${env what} was ${env test}', 'runway')
+        first.resolve(CONTEXT)
+        second = Variable('test', 'the ${env what} was ${env test}', 'runway')
+
+        self.assertIn(('the ${env what} was ${env test}', 'runway'),
+                      variables.PARSE_CACHE)
+        self.assertTrue(first.resolved)
+        self.assertFalse(second.resolved)
+        second.resolve(CONTEXT)
+        self.assertEqual(second.value, first.value)
+
+    def test_value_unmatched_opener(self):
+        """Lookups before an opener without a closer are not parsed."""
+        var = Variable('test', '${env test} ${', 'runway')
+
+        self.assertTrue(var.resolved)
+        self.assertEqual(var.value, '${env test} ${')
+
+        var = Variable('test', '${ ${env test}', 'runway')
+        var.resolve(CONTEXT)
+        self.assertEqual(var.value, '${ ' + VALUE['test'])